@@ -1,49 +1,84 @@
 import logging
 from typing import Dict, List
 
+from analyzers.resource_classifier import ensure_classified
+from utils.serialization import freeze
+
 logger = logging.getLogger(__name__)
 
+CLOUD_SERVICES = freeze({
+    "aws": {
+        "compute": ["EC2", "ECS", "EKS", "Lambda"],
+        "database": ["RDS", "Aurora", "DynamoDB"],
+        "storage": ["S3", "EBS", "EFS"],
+        "networking": ["VPC", "ALB", "CloudFront"]
+    },
+    "azure": {
+        "compute": ["Virtual Machines", "AKS", "Functions"],
+        "database": ["Azure SQL", "Cosmos DB"],
+        "storage": ["Blob Storage", "Disk Storage"],
+        "networking": ["VNet", "Load Balancer", "CDN"]
+    },
+    "gcp": {
+        "compute": ["Compute Engine", "GKE", "Cloud Functions"],
+        "database": ["Cloud SQL", "Firestore"],
+        "storage": ["Cloud Storage", "Persistent Disk"],
+        "networking": ["VPC", "Load Balancing", "Cloud CDN"]
+    }
+})
+TARGET_CONFIGURATIONS = freeze({
+    "compute": "t3.medium or equivalent",
+    "database": "db.t3.medium or equivalent",
+    "storage": "Standard storage class"
+})
+
 class ArchitectureAgent:
     def __init__(self):
-        self.cloud_services = {
-            "aws": {
-                "compute": ["EC2", "ECS", "EKS", "Lambda"],
-                "database": ["RDS", "Aurora", "DynamoDB"],
-                "storage": ["S3", "EBS", "EFS"],
-                "networking": ["VPC", "ALB", "CloudFront"]
-            },
-            "azure": {
-                "compute": ["Virtual Machines", "AKS", "Functions"],
-                "database": ["Azure SQL", "Cosmos DB"],
-                "storage": ["Blob Storage", "Disk Storage"],
-                "networking": ["VNet", "Load Balancer", "CDN"]
-            },
-            "gcp": {
-                "compute": ["Compute Engine", "GKE", "Cloud Functions"],
-                "database": ["Cloud SQL", "Firestore"],
-                "storage": ["Cloud Storage", "Persistent Disk"],
-                "networking": ["VPC", "Load Balancing", "Cloud CDN"]
-            }
-        }
+        self.cloud_services = CLOUD_SERVICES
     
     def design(self, infra_results: Dict, target_cloud: str = "aws") -> Dict:
         logger.info(f"Architecture agent designing for {target_cloud}")
         
+        return self.compare(infra_results, [target_cloud])[target_cloud]
+    
+    def compare(self, infra_results: Dict, clouds: List[str]) -> Dict:
+        if len(clouds) > 1:
+            logger.info(f"Architecture agent comparing {', '.join(clouds)}")
+        
         resources = infra_results.get("resources", [])
         
-        target_architecture = self.map_to_cloud_services(resources, target_cloud)
-        modernization_opportunities = self.identify_modernization(resources)
+        classified = self.classify_resources(resources, ensure_classified(infra_results))
+        modernization_opportunities = self.identify_modernization(classified)
         architecture_patterns = self.recommend_patterns(resources)
         
-        return {
-            "target_architecture": target_architecture,
-            "modernization_opportunities": modernization_opportunities,
-            "recommended_patterns": architecture_patterns,
-            "infrastructure_as_code": self.generate_iac_template(target_architecture, target_cloud)
-        }
+        designs = {}
+        for cloud in clouds:
+            target_architecture = self.map_to_cloud_services(classified, cloud)
+            designs[cloud] = {
+                "target_architecture": target_architecture,
+                "modernization_opportunities": modernization_opportunities,
+                "recommended_patterns": architecture_patterns,
+                "infrastructure_as_code": self.generate_iac_template(target_architecture, cloud)
+            }
+        
+        return designs
     
-    def map_to_cloud_services(self, resources: List[Dict], cloud: str) -> Dict:
+    def classify_resources(self, resources: List[Dict], classification: Dict) -> Dict:
+        """
+        Pick the mappable resources out of the shared classification index
+        """
+        by_category = classification["by_category"]
+        mapped = [
+            (category, resources[position].get("name", "unknown"))
+            for category in ("compute", "database", "storage")
+            for position in by_category[category]
+        ]
+        
+        return {"mapped": mapped, "vm_count": classification["counts"]["compute"]}
+    
+    def map_to_cloud_services(self, classified: Dict, cloud: str) -> Dict:
         services = self.cloud_services.get(cloud, self.cloud_services["aws"])
+        configurations = TARGET_CONFIGURATIONS
         mapping = {
             "compute": [],
             "database": [],
@@ -51,27 +86,12 @@ class ArchitectureAgent:
             "networking": []
         }
         
-        for resource in resources:
-            resource_type = resource.get("type", "").lower()
-            
-            if "compute" in resource_type or "instance" in resource_type:
-                mapping["compute"].append({
-                    "source": resource.get("name", "unknown"),
-                    "target": services["compute"][0],
-                    "configuration": "t3.medium or equivalent"
-                })
-            elif "database" in resource_type:
-                mapping["database"].append({
-                    "source": resource.get("name", "unknown"),
-                    "target": services["database"][0],
-                    "configuration": "db.t3.medium or equivalent"
-                })
-            elif "storage" in resource_type:
-                mapping["storage"].append({
-                    "source": resource.get("name", "unknown"),
-                    "target": services["storage"][0],
-                    "configuration": "Standard storage class"
-                })
+        for category, name in classified["mapped"]:
+            mapping[category].append({
+                "source": name,
+                "target": services[category][0],
+                "configuration": configurations[category]
+            })
         
         if not mapping["networking"]:
             mapping["networking"].append({
@@ -81,10 +101,10 @@ class ArchitectureAgent:
         
         return mapping
     
-    def identify_modernization(self, resources: List[Dict]) -> List[Dict]:
+    def identify_modernization(self, classified: Dict) -> List[Dict]:
         opportunities = []
         
-        vm_count = sum(1 for r in resources if "instance" in r.get("type", "").lower())
+        vm_count = classified["vm_count"]
         
         if vm_count > 0:
             opportunities.append({
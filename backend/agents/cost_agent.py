@@ -1,24 +1,66 @@
 import logging
 from typing import Dict, List
 
+from analyzers.resource_classifier import ensure_classified
+from utils.serialization import freeze
+
 logger = logging.getLogger(__name__)
 
+COMPUTE_COSTS = freeze({
+    "aws": {"ec2_per_hour": 0.10, "rds_per_hour": 0.15, "lambda_per_million": 0.20},
+    "azure": {"vm_per_hour": 0.12, "sql_per_hour": 0.18, "functions_per_million": 0.20},
+    "gcp": {"compute_per_hour": 0.09, "sql_per_hour": 0.14, "functions_per_million": 0.18}
+})
+PRICE_KEYS = freeze({
+    "aws": {"compute": "ec2_per_hour", "database": "rds_per_hour"},
+    "azure": {"compute": "vm_per_hour", "database": "sql_per_hour"},
+    "gcp": {"compute": "compute_per_hour", "database": "sql_per_hour"}
+})
+
 class CostAgent:
     def __init__(self):
-        self.compute_costs = {
-            "aws": {"ec2_per_hour": 0.10, "rds_per_hour": 0.15, "lambda_per_million": 0.20},
-            "azure": {"vm_per_hour": 0.12, "sql_per_hour": 0.18, "functions_per_million": 0.20},
-            "gcp": {"compute_per_hour": 0.09, "sql_per_hour": 0.14, "functions_per_million": 0.18}
-        }
+        self.compute_costs = COMPUTE_COSTS
+        self.price_keys = PRICE_KEYS
     
     def estimate(self, infra_results: Dict, target_cloud: str = "aws") -> Dict:
         logger.info(f"Cost agent estimating for {target_cloud}")
         
-        resources = infra_results.get("resources", [])
+        profile = self.profile_resources(ensure_classified(infra_results))
+        return self.estimate_from_profile(profile, target_cloud)
+    
+    def compare(self, infra_results: Dict, clouds: List[str]) -> Dict:
+        logger.info(f"Cost agent comparing {', '.join(clouds)}")
         
-        migration_cost = self.calculate_migration_cost(resources)
-        operational_cost = self.calculate_operational_cost(resources, target_cloud)
-        optimization_opportunities = self.identify_optimizations(resources)
+        profile = self.profile_resources(ensure_classified(infra_results))
+        return {cloud: self.estimate_from_profile(profile, cloud) for cloud in clouds}
+    
+    def profile_resources(self, classification: Dict) -> Dict:
+        """
+        Reduce the shared classification index to the counts the cost model needs
+        """
+        counts = classification["counts"]
+        
+        return {
+            "total": classification["total"],
+            "complexity_cost": (
+                counts["database"] * 5000
+                + counts["network"] * 2000
+                + (counts["compute"] + counts["storage"] + counts["other"]) * 1000
+            ),
+            "compute_count": counts["compute"],
+            "database_count": counts["database"],
+            "operational": {
+                "compute": counts["compute"],
+                "database": counts["database"],
+                "storage": counts["storage"],
+                "other": counts["network"] + counts["other"]
+            }
+        }
+    
+    def estimate_from_profile(self, profile: Dict, target_cloud: str) -> Dict:
+        migration_cost = self.calculate_migration_cost(profile)
+        operational_cost = self.calculate_operational_cost(profile, target_cloud)
+        optimization_opportunities = self.identify_optimizations(profile)
         
         return {
             "migration_cost": migration_cost,
@@ -30,45 +72,35 @@ class CostAgent:
             "cost_breakdown": self.create_breakdown(migration_cost, operational_cost)
         }
     
-    def calculate_migration_cost(self, resources: List[Dict]) -> float:
+    def calculate_migration_cost(self, profile: Dict) -> float:
         base_cost = 50000
         
-        resource_multiplier = len(resources) * 1000
-        complexity_cost = 0
-        
-        for resource in resources:
-            if "database" in resource.get("type", "").lower():
-                complexity_cost += 5000
-            elif "network" in resource.get("type", "").lower():
-                complexity_cost += 2000
-            else:
-                complexity_cost += 1000
+        resource_multiplier = profile["total"] * 1000
+        complexity_cost = profile["complexity_cost"]
         
         return base_cost + resource_multiplier + complexity_cost
     
-    def calculate_operational_cost(self, resources: List[Dict], cloud: str) -> float:
-        monthly_cost = 0
-        pricing = self.compute_costs.get(cloud, self.compute_costs["aws"])
+    def calculate_operational_cost(self, profile: Dict, cloud: str) -> float:
+        if cloud not in self.compute_costs:
+            cloud = "aws"
+        pricing = self.compute_costs[cloud]
+        keys = self.price_keys[cloud]
+        counts = profile["operational"]
         
-        for resource in resources:
-            resource_type = resource.get("type", "").lower()
-            
-            if "compute" in resource_type or "instance" in resource_type:
-                monthly_cost += pricing.get("ec2_per_hour", 0.10) * 730
-            elif "database" in resource_type:
-                monthly_cost += pricing.get("rds_per_hour", 0.15) * 730
-            elif "storage" in resource_type:
-                monthly_cost += 100
-            else:
-                monthly_cost += 50
+        monthly_cost = (
+            counts["compute"] * pricing[keys["compute"]] * 730
+            + counts["database"] * pricing[keys["database"]] * 730
+            + counts["storage"] * 100
+            + counts["other"] * 50
+        )
         
         return round(monthly_cost, 2)
     
-    def identify_optimizations(self, resources: List[Dict]) -> List[Dict]:
+    def identify_optimizations(self, profile: Dict) -> List[Dict]:
         optimizations = []
         
-        compute_count = sum(1 for r in resources if "compute" in r.get("type", "").lower())
-        db_count = sum(1 for r in resources if "database" in r.get("type", "").lower())
+        compute_count = profile["compute_count"]
+        db_count = profile["database_count"]
         
         if compute_count > 5:
             optimizations.append({
@@ -2,18 +2,78 @@ import logging
 from typing import Dict, List
 from datetime import datetime, timedelta
 
+from utils.serialization import freeze
+
 logger = logging.getLogger(__name__)
 
+PHASE_TEMPLATES = freeze({
+    "discovery": {"duration_weeks": 2, "effort_days": 10},
+    "planning": {"duration_weeks": 2, "effort_days": 10},
+    "poc": {"duration_weeks": 3, "effort_days": 15},
+    "execution": {"duration_weeks": 8, "effort_days": 40},
+    "testing": {"duration_weeks": 3, "effort_days": 15},
+    "cutover": {"duration_weeks": 2, "effort_days": 10}
+})
+COMPLEXITY_MULTIPLIERS = freeze({"low": 1.0, "medium": 1.3, "high": 1.6})
+PHASE_DELIVERABLES = freeze({
+    "discovery": ["Infrastructure inventory", "Application dependencies", "Risk assessment"],
+    "planning": ["Migration strategy", "Resource plan", "Timeline"],
+    "poc": ["Proof of concept", "Performance baseline", "Cost validation"],
+    "execution": ["Migrated infrastructure", "Configuration documentation", "Security validation"],
+    "testing": ["Test results", "Performance reports", "Security audit"],
+    "cutover": ["Production deployment", "Cutover checklist", "Monitoring setup"]
+})
+PHASE_DEPENDENCIES = freeze({
+    "discovery": [],
+    "planning": ["Discovery complete"],
+    "poc": ["Planning approved"],
+    "execution": ["POC validated"],
+    "testing": ["Execution complete"],
+    "cutover": ["Testing passed"]
+})
+BASE_TEAM = freeze({
+    "lead_architect": 1,
+    "cloud_engineers": 2,
+    "security_engineer": 1,
+    "devops_engineer": 1,
+    "qa_engineer": 1
+})
+TEAM_ADJUSTMENTS = freeze({
+    "high": {"cloud_engineers": 4, "security_engineer": 2},
+    "medium": {"cloud_engineers": 3}
+})
+ROLLBACK_PROCEDURES = ("Document current state", "Create backup", "Execute rollback", "Verify rollback")
+SUCCESS_CRITERIA = freeze([
+    {"metric": "Zero data loss", "target": "100%"},
+    {"metric": "Uptime during migration", "target": "99.9%"},
+    {"metric": "Performance degradation", "target": "<5%"},
+    {"metric": "Security posture", "target": "Equal or better"},
+    {"metric": "Cost within budget", "target": "+/-10%"}
+])
+RISK_MITIGATION = freeze([
+    {
+        "risk": "Data loss during migration",
+        "probability": "Low",
+        "impact": "Critical",
+        "mitigation": "Comprehensive backup strategy, validation checkpoints"
+    },
+    {
+        "risk": "Downtime exceeds window",
+        "probability": "Medium",
+        "impact": "High",
+        "mitigation": "Phased migration, blue-green deployment"
+    },
+    {
+        "risk": "Security vulnerabilities introduced",
+        "probability": "Medium",
+        "impact": "High",
+        "mitigation": "Security scanning at each phase, compliance validation"
+    }
+])
+
 class MigrationAgent:
     def __init__(self):
-        self.phase_templates = {
-            "discovery": {"duration_weeks": 2, "effort_days": 10},
-            "planning": {"duration_weeks": 2, "effort_days": 10},
-            "poc": {"duration_weeks": 3, "effort_days": 15},
-            "execution": {"duration_weeks": 8, "effort_days": 40},
-            "testing": {"duration_weeks": 3, "effort_days": 15},
-            "cutover": {"duration_weeks": 2, "effort_days": 10}
-        }
+        self.phase_templates = PHASE_TEMPLATES
     
     def create_plan(self, infra_results: Dict, security_assessment: Dict, 
                    cost_estimate: Dict, arch_recommendations: Dict) -> Dict:
@@ -49,8 +109,7 @@ class MigrationAgent:
             return "low"
     
     def generate_phases(self, complexity: str) -> List[Dict]:
-        multiplier = {"low": 1.0, "medium": 1.3, "high": 1.6}
-        factor = multiplier.get(complexity, 1.0)
+        factor = COMPLEXITY_MULTIPLIERS.get(complexity, 1.0)
         
         phases = []
         start_date = datetime.now()
@@ -77,19 +136,8 @@ class MigrationAgent:
         return sum(phase["duration_weeks"] for phase in phases)
     
     def estimate_resources(self, complexity: str) -> Dict:
-        base_team = {
-            "lead_architect": 1,
-            "cloud_engineers": 2,
-            "security_engineer": 1,
-            "devops_engineer": 1,
-            "qa_engineer": 1
-        }
-        
-        if complexity == "high":
-            base_team["cloud_engineers"] = 4
-            base_team["security_engineer"] = 2
-        elif complexity == "medium":
-            base_team["cloud_engineers"] = 3
+        base_team = dict(BASE_TEAM)
+        base_team.update(TEAM_ADJUSTMENTS.get(complexity, {}))
         
         return {
             "team_composition": base_team,
@@ -110,26 +158,10 @@ class MigrationAgent:
         return runbook
     
     def get_phase_deliverables(self, phase: str) -> List[str]:
-        deliverables_map = {
-            "discovery": ["Infrastructure inventory", "Application dependencies", "Risk assessment"],
-            "planning": ["Migration strategy", "Resource plan", "Timeline"],
-            "poc": ["Proof of concept", "Performance baseline", "Cost validation"],
-            "execution": ["Migrated infrastructure", "Configuration documentation", "Security validation"],
-            "testing": ["Test results", "Performance reports", "Security audit"],
-            "cutover": ["Production deployment", "Cutover checklist", "Monitoring setup"]
-        }
-        return deliverables_map.get(phase, [])
+        return list(PHASE_DELIVERABLES.get(phase, ()))
     
     def get_phase_dependencies(self, phase: str) -> List[str]:
-        dependencies_map = {
-            "discovery": [],
-            "planning": ["Discovery complete"],
-            "poc": ["Planning approved"],
-            "execution": ["POC validated"],
-            "testing": ["Execution complete"],
-            "cutover": ["Testing passed"]
-        }
-        return dependencies_map.get(phase, [])
+        return list(PHASE_DEPENDENCIES.get(phase, ()))
     
     def get_phase_steps(self, phase: str) -> List[str]:
         return [f"Step 1 for {phase}", f"Step 2 for {phase}", f"Step 3 for {phase}"]
@@ -138,35 +170,10 @@ class MigrationAgent:
         return [f"Checkpoint 1 for {phase}", f"Checkpoint 2 for {phase}"]
     
     def get_rollback_procedures(self, phase: str) -> List[str]:
-        return ["Document current state", "Create backup", "Execute rollback", "Verify rollback"]
+        return list(ROLLBACK_PROCEDURES)
     
     def define_success_criteria(self) -> List[Dict]:
-        return [
-            {"metric": "Zero data loss", "target": "100%"},
-            {"metric": "Uptime during migration", "target": "99.9%"},
-            {"metric": "Performance degradation", "target": "<5%"},
-            {"metric": "Security posture", "target": "Equal or better"},
-            {"metric": "Cost within budget", "target": "+/-10%"}
-        ]
+        return [dict(criterion) for criterion in SUCCESS_CRITERIA]
     
     def create_risk_mitigation_plan(self, security_assessment: Dict) -> List[Dict]:
-        return [
-            {
-                "risk": "Data loss during migration",
-                "probability": "Low",
-                "impact": "Critical",
-                "mitigation": "Comprehensive backup strategy, validation checkpoints"
-            },
-            {
-                "risk": "Downtime exceeds window",
-                "probability": "Medium",
-                "impact": "High",
-                "mitigation": "Phased migration, blue-green deployment"
-            },
-            {
-                "risk": "Security vulnerabilities introduced",
-                "probability": "Medium",
-                "impact": "High",
-                "mitigation": "Security scanning at each phase, compliance validation"
-            }
-        ]
+        return [dict(risk) for risk in RISK_MITIGATION]
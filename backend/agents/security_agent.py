@@ -2,31 +2,47 @@ import json
 from typing import Dict, List
 import logging
 
+from analyzers.findings_table import FindingsTable, mean_severity_score
+from utils.serialization import freeze
+
 logger = logging.getLogger(__name__)
 
+PRIORITY_MATRIX = freeze({
+    "critical": {"score": 90, "weight": 1.0},
+    "high": {"score": 70, "weight": 0.7},
+    "medium": {"score": 50, "weight": 0.4},
+    "low": {"score": 30, "weight": 0.2}
+})
+SEVERITY_SCORES = freeze({severity: entry["score"] for severity, entry in PRIORITY_MATRIX.items()})
+FIX_TIME_ESTIMATES = freeze({
+    "critical": "1-2 days",
+    "high": "2-4 hours",
+    "medium": "1-2 hours",
+    "low": "30-60 minutes"
+})
+
 class SecurityAgent:
     def __init__(self):
-        self.priority_matrix = {
-            "critical": {"score": 90, "weight": 1.0},
-            "high": {"score": 70, "weight": 0.7},
-            "medium": {"score": 50, "weight": 0.4},
-            "low": {"score": 30, "weight": 0.2}
-        }
+        self.priority_matrix = PRIORITY_MATRIX
     
     def assess(self, security_results: Dict) -> Dict:
         logger.info("Security agent assessing findings")
         
         findings = security_results.get("findings", [])
+        aggregates = security_results.get("aggregates")
+        if aggregates is None or aggregates.get("total") != len(findings):
+            aggregates = FindingsTable(findings).aggregate({})
+        histogram = aggregates["severity_histogram"]
         
         categorized_findings = self.categorize_findings(findings)
-        risk_score = self.calculate_risk_score(categorized_findings)
-        recommendations = self.generate_recommendations(categorized_findings)
+        risk_score = self.calculate_risk_score(histogram)
+        recommendations = self.generate_recommendations(histogram)
         
         return {
             "risk_score": risk_score,
             "findings": categorized_findings,
             "recommendations": recommendations,
-            "summary": self.create_summary(categorized_findings, risk_score)
+            "summary": self.create_summary(histogram, risk_score)
         }
     
     def categorize_findings(self, findings: List[Dict]) -> List[Dict]:
@@ -44,35 +60,21 @@ class SecurityAgent:
                 "compliance_impact": finding.get("compliance_impact", [])
             })
         
-        return sorted(categorized, key=lambda x: self.priority_matrix[x["severity"]]["score"], reverse=True)
+        return sorted(categorized, key=lambda x: SEVERITY_SCORES[x["severity"]], reverse=True)
     
-    def calculate_risk_score(self, findings: List[Dict]) -> int:
-        if not findings:
-            return 0
-        
-        total_score = 0
-        for finding in findings:
-            severity = finding.get("severity", "medium")
-            total_score += self.priority_matrix[severity]["score"]
-        
-        avg_score = total_score / len(findings)
+    def calculate_risk_score(self, severity_histogram: Dict[str, int]) -> int:
+        avg_score = mean_severity_score(severity_histogram, SEVERITY_SCORES)
         
         return min(100, int(avg_score))
     
     def estimate_fix_time(self, severity: str) -> str:
-        time_estimates = {
-            "critical": "1-2 days",
-            "high": "2-4 hours",
-            "medium": "1-2 hours",
-            "low": "30-60 minutes"
-        }
-        return time_estimates.get(severity, "1 hour")
+        return FIX_TIME_ESTIMATES.get(severity, "1 hour")
     
-    def generate_recommendations(self, findings: List[Dict]) -> List[Dict]:
+    def generate_recommendations(self, severity_histogram: Dict[str, int]) -> List[Dict]:
         recommendations = []
         
-        critical_count = sum(1 for f in findings if f["severity"] == "critical")
-        high_count = sum(1 for f in findings if f["severity"] == "high")
+        critical_count = severity_histogram.get("critical", 0)
+        high_count = severity_histogram.get("high", 0)
         
         if critical_count > 0:
             recommendations.append({
@@ -99,14 +101,15 @@ class SecurityAgent:
         
         return recommendations
     
-    def create_summary(self, findings: List[Dict], risk_score: int) -> str:
-        critical = sum(1 for f in findings if f["severity"] == "critical")
-        high = sum(1 for f in findings if f["severity"] == "high")
+    def create_summary(self, severity_histogram: Dict[str, int], risk_score: int) -> str:
+        critical = severity_histogram.get("critical", 0)
+        high = severity_histogram.get("high", 0)
+        total = sum(severity_histogram.values())
         
         risk_level = "Low" if risk_score < 40 else "Medium" if risk_score < 70 else "High"
         
         summary = f"Security Assessment: {risk_level} Risk (Score: {risk_score}/100). "
-        summary += f"Identified {len(findings)} findings: {critical} critical, {high} high priority. "
+        summary += f"Identified {total} findings: {critical} critical, {high} high priority. "
         
         if critical > 0:
             summary += "Immediate action required on critical issues before migration."
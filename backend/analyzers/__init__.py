@@ -1,9 +1,11 @@
 from .infrastructure_analyzer import InfrastructureAnalyzer
 from .code_analyzer import CodeAnalyzer
 from .security_scanner import SecurityScanner
+from .resource_classifier import ResourceClassifier
 
 __all__ = [
     "InfrastructureAnalyzer",
     "CodeAnalyzer",
-    "SecurityScanner"
+    "SecurityScanner",
+    "ResourceClassifier"
 ]
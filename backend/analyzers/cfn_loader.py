@@ -0,0 +1,292 @@
+import os
+import re
+import json
+import mmap
+import logging
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(rb"[ \t\r\n]*")
+# Unrolled string pattern: runs of plain characters between escapes. The
+# quantifiers are possessive so a string without its closing quote fails in
+# one pass instead of backtracking through every split of its contents
+_STRING = re.compile(rb'"[^"\\]*+(?:\\.[^"\\]*+)*+"', re.DOTALL)
+# Everything up to and including the next bracket outside a string, so the
+# Python loop below only runs once per bracket. Matched anchored at the
+# current offset (never searched), so a truncated value costs one linear scan
+_NEXT_BRACKET = re.compile(rb'(?:[^"{}\[\]]++|"[^"\\]*+(?:\\.[^"\\]*+)*+")*+([{}\[\]])', re.DOTALL)
+_SCALAR = re.compile(rb"[^,:}\]\s]+")
+# Fast path for the common case of a member name without escapes
+_PLAIN_KEY = re.compile(rb'"([^"\\]*)"[ \t\r\n]*:[ \t\r\n]*')
+
+_OPEN_OBJECT = ord("{")
+_CLOSE_OBJECT = ord("}")
+_OPEN_ARRAY = ord("[")
+_QUOTE = ord('"')
+_COLON = ord(":")
+_COMMA = ord(",")
+
+DECODE_CACHE_SIZE = 256
+
+
+class TemplateFormatError(ValueError):
+    pass
+
+
+class MappedTemplate:
+    """
+    A read-only memory map of a JSON template; values are decoded from
+    byte spans on demand. Close it (or use it as a context manager) once
+    its resources have been read, which also drops the decode cache.
+    """
+
+    def __init__(self, file_path: str, cache_size: int = DECODE_CACHE_SIZE):
+        self.file_path = file_path
+        self.cache_size = cache_size
+        self._decoded: "OrderedDict[Tuple[int, int], Dict]" = OrderedDict()
+        with open(file_path, "rb") as f:
+            self.size = os.fstat(f.fileno()).st_size
+            if self.size == 0:
+                raise TemplateFormatError("Template is empty")
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            self.buffer.madvise(mmap.MADV_SEQUENTIAL)
+
+    def decode(self, start: int, end: int):
+        return json.loads(self.buffer[start:end])
+
+    def decode_cached(self, start: int, end: int) -> Dict:
+        """
+        decode() for object spans, keeping the most recently used results
+        """
+        key = (start, end)
+        value = self._decoded.get(key)
+        if value is not None:
+            self._decoded.move_to_end(key)
+            return value
+        value = self.decode(start, end)
+        self._decoded[key] = value
+        if len(self._decoded) > self.cache_size:
+            self._decoded.popitem(last=False)
+        return value
+
+    def decode_string(self, start: int, end: int):
+        raw = self.buffer[start:end]
+        if len(raw) >= 2 and raw[0] == _QUOTE and b"\\" not in raw:
+            return raw[1:-1].decode()
+        return json.loads(raw)
+
+    @property
+    def closed(self) -> bool:
+        return self.buffer.closed
+
+    def close(self):
+        self._decoded.clear()
+        self.buffer.close()
+
+    def __enter__(self) -> "MappedTemplate":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+class LazyProperties(Mapping):
+    """
+    Read-only view of a resource's Properties object inside a mapped
+    template. Nothing is decoded until a consumer reads it, and only the
+    most recently used views are kept decoded. Only valid while the
+    template is open; pickles (e.g. across a process pool) as a plain dict.
+    """
+
+    __slots__ = ("_template", "_start", "_end")
+
+    def __init__(self, template: MappedTemplate, start: int, end: int):
+        self._template = template
+        self._start = start
+        self._end = end
+
+    def materialize(self) -> Dict:
+        # A fresh dict the caller owns; it bypasses the view cache
+        return self._template.decode(self._start, self._end)
+
+    def __getitem__(self, key):
+        return self._template.decode_cached(self._start, self._end)[key]
+
+    def __iter__(self):
+        return iter(self._template.decode_cached(self._start, self._end))
+
+    def __len__(self) -> int:
+        return len(self._template.decode_cached(self._start, self._end))
+
+    def __repr__(self) -> str:
+        return f"LazyProperties({self._template.file_path}[{self._start}:{self._end}])"
+
+    def __reduce__(self):
+        return dict, (self.materialize(),)
+
+
+def materialized(resource: Dict) -> Dict:
+    """
+    The resource with LazyProperties replaced by a plain dict, so it stays
+    usable after the template is closed
+    """
+    properties = resource.get("properties")
+    if isinstance(properties, LazyProperties):
+        resource["properties"] = properties.materialize()
+    return resource
+
+
+def _skip_whitespace(buffer, pos: int) -> int:
+    return _WHITESPACE.match(buffer, pos).end()
+
+
+def _expect(buffer, pos: int, char: int, what: str):
+    if pos >= len(buffer) or buffer[pos] != char:
+        raise TemplateFormatError(f"Expected {what} at byte {pos}")
+
+
+def skip_value(buffer, pos: int) -> int:
+    """
+    Return the end offset of the JSON value starting at pos, without
+    decoding it
+    """
+    first = buffer[pos]
+
+    if first == _QUOTE:
+        match = _STRING.match(buffer, pos)
+        if match is None:
+            raise TemplateFormatError(f"Unterminated string at byte {pos}")
+        return match.end()
+
+    if first == _OPEN_OBJECT or first == _OPEN_ARRAY:
+        depth = 0
+        end = pos
+        while True:
+            match = _NEXT_BRACKET.match(buffer, end)
+            if match is None:
+                raise TemplateFormatError(f"Unterminated value starting at byte {pos}")
+            end = match.end()
+            char = buffer[end - 1]
+            if char == _OPEN_OBJECT or char == _OPEN_ARRAY:
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return end
+
+    match = _SCALAR.match(buffer, pos)
+    if match is None:
+        raise TemplateFormatError(f"Unexpected character at byte {pos}")
+    return match.end()
+
+
+class ObjectCursor:
+    """
+    Walks the members of one JSON object in a buffer. The caller reports
+    where each member's value ends (after skipping or descending into it),
+    so nested objects are scanned once
+    """
+
+    def __init__(self, buffer, pos: int):
+        _expect(buffer, pos, _OPEN_OBJECT, "'{'")
+        self.buffer = buffer
+        self.pos = pos + 1
+        self.end: Optional[int] = None
+        self._first = True
+
+    def next_member(self) -> Optional[Tuple[str, int]]:
+        """
+        Return (key, value_start) of the next member, or None once the
+        closing brace is reached (end is then set)
+        """
+        buffer = self.buffer
+        pos = _skip_whitespace(buffer, self.pos)
+        if pos < len(buffer) and buffer[pos] == _CLOSE_OBJECT:
+            self.end = pos + 1
+            return None
+
+        if not self._first:
+            _expect(buffer, pos, _COMMA, "',' or '}'")
+            pos = _skip_whitespace(buffer, pos + 1)
+        self._first = False
+
+        plain = _PLAIN_KEY.match(buffer, pos)
+        if plain is not None:
+            key = plain.group(1).decode()
+            value_start = plain.end()
+        else:
+            _expect(buffer, pos, _QUOTE, "a member name")
+            key_end = skip_value(buffer, pos)
+            key = json.loads(buffer[pos:key_end])
+            pos = _skip_whitespace(buffer, key_end)
+            _expect(buffer, pos, _COLON, "':'")
+            value_start = _skip_whitespace(buffer, pos + 1)
+        if value_start >= len(buffer):
+            raise TemplateFormatError(f"Missing value at byte {value_start}")
+        self.pos = value_start
+        return key, value_start
+
+    def value_ends(self, end: int):
+        self.pos = end
+
+    def skip_value(self, start: int) -> int:
+        end = skip_value(self.buffer, start)
+        self.pos = end
+        return end
+
+
+def _document_start(buffer) -> int:
+    pos = 3 if buffer[:3] == b"\xef\xbb\xbf" else 0
+    return _skip_whitespace(buffer, pos)
+
+
+def iter_cloudformation_resources(template: MappedTemplate) -> Iterator[Dict]:
+    """
+    Yield {type, name, properties} for each entry of the template's
+    Resources object, one at a time; properties are LazyProperties views
+    """
+    buffer = template.buffer
+    document = ObjectCursor(buffer, _document_start(buffer))
+
+    while True:
+        member = document.next_member()
+        if member is None:
+            return
+        key, start = member
+        if key != "Resources":
+            document.skip_value(start)
+            continue
+        if buffer[start] != _OPEN_OBJECT:
+            raise TemplateFormatError("Resources is not an object")
+
+        resources = ObjectCursor(buffer, start)
+        while True:
+            entry = resources.next_member()
+            if entry is None:
+                return
+            name, resource_start = entry
+
+            resource_type = "Unknown"
+            properties = {}
+            if buffer[resource_start] != _OPEN_OBJECT:
+                resources.skip_value(resource_start)
+            else:
+                fields = ObjectCursor(buffer, resource_start)
+                while True:
+                    field = fields.next_member()
+                    if field is None:
+                        break
+                    field_name, value_start = field
+                    value_end = fields.skip_value(value_start)
+                    if field_name == "Type":
+                        resource_type = template.decode_string(value_start, value_end)
+                    elif field_name == "Properties" and buffer[value_start] == _OPEN_OBJECT:
+                        properties = LazyProperties(template, value_start, value_end)
+                resources.value_ends(fields.end)
+
+            yield {"type": resource_type, "name": name, "properties": properties}
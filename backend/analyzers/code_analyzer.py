@@ -1,13 +1,153 @@
+import heapq
 import logging
+import multiprocessing
 import os
-from typing import Dict, List
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional
+
+from .dependency_manifests import collect_dependencies, is_manifest
 
 logger = logging.getLogger(__name__)
 
+try:
+    from radon.complexity import cc_visit
+    from radon.raw import analyze as raw_metrics
+except ImportError:  # radon is optional outside the full backend install
+    cc_visit = raw_metrics = None
+
+LANGUAGES = {
+    ".py": "Python",
+    ".java": "Java",
+    ".cs": "C#",
+    ".js": "JavaScript",
+    ".ts": "TypeScript"
+}
+SKIPPED_DIRECTORIES = {".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv",
+                       "bin", "obj", "target", "dist", "build", ".tox", ".mypy_cache"}
+# Below this many files the process pool start-up costs more than it saves
+PARALLEL_MIN_FILES = 64
+MAX_CHUNKSIZE = 256
+HIGH_COMPLEXITY_FILES_LIMIT = 100
+
+# Decision points for languages radon cannot parse; each adds one path
+_C_STYLE_COMMENTS_AND_STRINGS = re.compile(
+    r'//[^\n]*|/\*.*?\*/|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|`(?:\\.|[^`\\])*`', re.DOTALL
+)
+_PYTHON_COMMENTS_AND_STRINGS = re.compile(
+    r'#[^\n]*|"""(?:\\.|[^\\])*?"""|\'\'\'(?:\\.|[^\\])*?\'\'\'|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'',
+    re.DOTALL
+)
+_C_STYLE_DECISIONS = re.compile(r"\b(?:if|for|foreach|while|case|catch)\b|&&|\|\||\?\?")
+_PYTHON_DECISIONS = re.compile(r"\b(?:if|elif|for|while|except|and|or)\b")
+_FUNCTIONS = {
+    "Python": re.compile(r"^\s*(?:async\s+)?def\s", re.MULTILINE),
+    "JavaScript": re.compile(r"\bfunction\b|=>"),
+    "TypeScript": re.compile(r"\bfunction\b|=>"),
+    "Java": re.compile(r"^\s*(?:(?:public|private|protected|static|final|synchronized|abstract)\s+)+"
+                       r"[\w<>\[\],\s]+\s+\w+\s*\([^;{]*\)\s*(?:throws[^{]*)?\{", re.MULTILINE),
+    "C#": re.compile(r"^\s*(?:(?:public|private|protected|internal|static|virtual|override|async|sealed)\s+)+"
+                     r"[\w<>\[\],?\s]+\s+\w+\s*\([^;{]*\)\s*\{", re.MULTILINE)
+}
+
+
+def _line_counts(source: str, language: str) -> Dict:
+    comment_prefixes = ("#",) if language == "Python" else ("//", "/*", "*")
+    loc = blank = comments = 0
+    for line in source.splitlines():
+        loc += 1
+        stripped = line.strip()
+        if not stripped:
+            blank += 1
+        elif stripped.startswith(comment_prefixes):
+            comments += 1
+    return {"loc": loc, "sloc": loc - blank - comments, "comments": comments}
+
+
+def _estimate_complexity(source: str, language: str) -> Dict:
+    """
+    Approximate cyclomatic complexity by counting decision points once
+    comments and string literals are removed, spread over the functions
+    found in the file
+    """
+    if language == "Python":
+        code = _PYTHON_COMMENTS_AND_STRINGS.sub('""', source)
+        decisions = len(_PYTHON_DECISIONS.findall(code))
+    else:
+        code = _C_STYLE_COMMENTS_AND_STRINGS.sub('""', source)
+        decisions = len(_C_STYLE_DECISIONS.findall(code))
+
+    functions = len(_FUNCTIONS[language].findall(code)) or 1
+    average = 1 + decisions / functions
+    return {
+        "functions": functions,
+        "total_complexity": functions + decisions,
+        "max_complexity": round(average),
+        "method": "estimate"
+    }
+
+
+def _python_metrics(source: str) -> Optional[Dict]:
+    if cc_visit is None:
+        return None
+    try:
+        raw = raw_metrics(source)
+        # cc_visit lists methods on their own as well as inside their class
+        blocks = [block for block in cc_visit(source) if not hasattr(block, "methods")]
+    except (SyntaxError, ValueError):
+        return None
+
+    complexities = [block.complexity for block in blocks] or [1]
+    return {
+        "loc": raw.loc,
+        "sloc": raw.sloc,
+        "comments": raw.comments + raw.multi,
+        "functions": len(blocks),
+        "total_complexity": sum(complexities),
+        "max_complexity": max(complexities),
+        "method": "radon"
+    }
+
+
+def analyze_source_file(file_path: str, max_bytes: Optional[int] = None) -> Dict:
+    """
+    Process pool entry point: lines of code and cyclomatic complexity for
+    one source file (radon for Python, a decision-point estimate otherwise)
+    """
+    language = LANGUAGES.get(os.path.splitext(file_path)[1], "Unknown")
+    result = {"path": file_path, "language": language}
+
+    try:
+        if max_bytes and os.path.getsize(file_path) > max_bytes:
+            # Minified bundles and generated code would dominate the averages
+            result["skipped"] = "too_large"
+            return result
+        with open(file_path, encoding="utf-8", errors="replace") as f:
+            source = f.read()
+    except OSError as e:
+        result["skipped"] = str(e)
+        return result
+
+    metrics = _python_metrics(source) if language == "Python" else None
+    if metrics is None:
+        metrics = _line_counts(source, language)
+        metrics.update(_estimate_complexity(source, language))
+
+    result.update(metrics)
+    return result
+
+
+def _analyze_chunk_entry(args) -> Dict:
+    file_path, max_bytes = args
+    return analyze_source_file(file_path, max_bytes)
+
+
 class CodeAnalyzer:
-    def __init__(self):
-        self.supported_languages = [".py", ".java", ".cs", ".js", ".ts"]
+    def __init__(self, max_workers: Optional[int] = None, max_file_bytes: Optional[int] = None):
+        self.supported_languages = list(LANGUAGES)
         self.complexity_thresholds = {"low": 10, "medium": 20, "high": 30}
+        self.max_workers = max_workers or int(os.getenv("CODE_ANALYZER_WORKERS", os.cpu_count() or 1))
+        self.max_file_bytes = max_file_bytes or int(os.getenv("CODE_ANALYZER_MAX_FILE_BYTES", 2 * 1024 * 1024))
     
     def analyze_codebase(self, directory_path: str) -> Dict:
         logger.info(f"Analyzing codebase: {directory_path}")
@@ -15,10 +155,11 @@ class CodeAnalyzer:
         if not os.path.exists(directory_path):
             return self.create_sample_results()
         
-        files_analyzed = self.scan_directory(directory_path)
+        files_found = self.scan_directory(directory_path)
+        files_analyzed = [path for path in files_found if self.is_source_file(path)]
         language_breakdown = self.detect_languages(files_analyzed)
         complexity = self.analyze_complexity(files_analyzed)
-        dependencies = self.extract_dependencies(files_analyzed)
+        dependencies = self.extract_dependencies(files_found)
         
         return {
             "total_files": len(files_analyzed),
@@ -28,13 +169,22 @@ class CodeAnalyzer:
             "recommendations": self.generate_recommendations(complexity, dependencies)
         }
     
+    def is_source_file(self, file_path: str) -> bool:
+        return os.path.splitext(file_path)[1] in LANGUAGES
+    
     def scan_directory(self, directory: str) -> List[str]:
+        """
+        Source files and dependency manifests in one walk, skipping VCS,
+        dependency and build output directories
+        """
         files = []
         try:
             for root, dirs, filenames in os.walk(directory):
-                for filename in filenames:
-                    if any(filename.endswith(ext) for ext in self.supported_languages):
-                        files.append(os.path.join(root, filename))
+                dirs[:] = sorted(d for d in dirs if d not in SKIPPED_DIRECTORIES)
+                for filename in sorted(filenames):
+                    path = os.path.join(root, filename)
+                    if self.is_source_file(path) or is_manifest(path):
+                        files.append(path)
         except Exception as e:
             logger.error(f"Error scanning directory: {e}")
         
@@ -44,22 +194,55 @@ class CodeAnalyzer:
         languages = {}
         
         for file in files:
-            ext = os.path.splitext(file)[1]
-            lang_map = {
-                ".py": "Python",
-                ".java": "Java",
-                ".cs": "C#",
-                ".js": "JavaScript",
-                ".ts": "TypeScript"
-            }
-            language = lang_map.get(ext, "Unknown")
+            language = LANGUAGES.get(os.path.splitext(file)[1], "Unknown")
             languages[language] = languages.get(language, 0) + 1
         
         return languages
     
+    def iter_file_metrics(self, files: List[str]) -> Iterator[Dict]:
+        """
+        Per-file metrics in input order, streamed back from a process pool
+        chunk by chunk as workers finish them
+        """
+        if len(files) < PARALLEL_MIN_FILES or self.max_workers <= 1:
+            for path in files:
+                yield analyze_source_file(path, self.max_file_bytes)
+            return
+        
+        workers = min(self.max_workers, len(files))
+        chunksize = max(1, min(MAX_CHUNKSIZE, len(files) // (workers * 4)))
+        context = multiprocessing.get_context(
+            "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        )
+        tasks = ((path, self.max_file_bytes) for path in files)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            yield from executor.map(_analyze_chunk_entry, tasks, chunksize=chunksize)
+    
     def analyze_complexity(self, files: List[str]) -> Dict:
-        total_lines = len(files) * 100
-        avg_complexity = 15
+        total_lines = 0
+        total_complexity = 0
+        functions = 0
+        skipped = 0
+        threshold = self.complexity_thresholds["medium"]
+        # Bounded min-heap so a 200k-file tree keeps only the worst offenders
+        worst: List = []
+        
+        for position, metrics in enumerate(self.iter_file_metrics(files)):
+            if "skipped" in metrics:
+                skipped += 1
+                continue
+            total_lines += metrics["loc"]
+            total_complexity += metrics["total_complexity"]
+            functions += metrics["functions"]
+        
+            if metrics["max_complexity"] > threshold:
+                entry = (metrics["max_complexity"], -position, metrics)
+                if len(worst) < HIGH_COMPLEXITY_FILES_LIMIT:
+                    heapq.heappush(worst, entry)
+                else:
+                    heapq.heappushpop(worst, entry)
+        
+        avg_complexity = round(total_complexity / functions, 2) if functions else 0
         
         complexity_level = "low"
         if avg_complexity > self.complexity_thresholds["high"]:
@@ -67,25 +250,36 @@ class CodeAnalyzer:
         elif avg_complexity > self.complexity_thresholds["medium"]:
             complexity_level = "medium"
         
+        high_complexity_files = [
+            {
+                "file": metrics["path"],
+                "language": metrics["language"],
+                "max_complexity": metrics["max_complexity"],
+                "lines_of_code": metrics["loc"]
+            }
+            for _, _, metrics in sorted(worst, reverse=True)
+        ]
+        
         return {
             "total_lines_of_code": total_lines,
             "average_cyclomatic_complexity": avg_complexity,
             "complexity_level": complexity_level,
-            "high_complexity_files": []
+            "high_complexity_files": high_complexity_files,
+            "files_skipped": skipped
         }
     
     def extract_dependencies(self, files: List[str]) -> List[Dict]:
-        return [
-            {"package": "express", "version": "4.18.0", "category": "web_framework"},
-            {"package": "react", "version": "18.2.0", "category": "frontend"},
-            {"package": "postgresql", "version": "14.0", "category": "database"}
-        ]
+        return collect_dependencies(path for path in files if is_manifest(path))
     
     def generate_recommendations(self, complexity: Dict, dependencies: List[Dict]) -> List[str]:
         recommendations = []
         
         if complexity["complexity_level"] == "high":
             recommendations.append("Refactor high-complexity modules before migration")
+        elif complexity["high_complexity_files"]:
+            recommendations.append(
+                f"Review the {len(complexity['high_complexity_files'])} highest-complexity files before migration"
+            )
         
         if len(dependencies) > 20:
             recommendations.append("Review and consolidate dependencies")
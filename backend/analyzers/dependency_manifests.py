@@ -0,0 +1,192 @@
+import os
+import re
+import json
+import logging
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAMES = {"requirements.txt", "package.json", "pom.xml"}
+MANIFEST_EXTENSIONS = (".csproj",)
+
+NPM_SECTIONS = {
+    "dependencies": "runtime",
+    "devDependencies": "development",
+    "optionalDependencies": "optional",
+    "peerDependencies": "peer"
+}
+
+# Name prefixes, matched against the lower-cased package (or Maven artifact)
+# name; the first match wins and anything else is a plain library
+PACKAGE_CATEGORIES = [
+    (("django", "flask", "fastapi", "starlette", "tornado", "express", "koa", "fastify", "@nestjs/",
+      "spring-boot", "spring-web", "microsoft.aspnetcore", "jersey"), "web_framework"),
+    (("react", "vue", "@angular/", "angular", "svelte", "next", "nuxt", "jquery"), "frontend"),
+    (("psycopg", "pymysql", "mysql", "sqlalchemy", "pg", "mongoose", "mongodb", "pymongo", "redis",
+      "ioredis", "hibernate", "postgresql", "ojdbc", "microsoft.entityframeworkcore", "npgsql",
+      "dapper", "sequelize", "typeorm", "prisma"), "database"),
+    (("pandas", "numpy", "scipy", "pyspark", "spark-", "dask", "polars"), "data_processing"),
+    (("boto3", "botocore", "aws-sdk", "@aws-sdk/", "awssdk", "software.amazon", "azure",
+      "@azure/", "google-cloud", "@google-cloud/", "com.google.cloud"), "cloud_sdk"),
+    (("pytest", "jest", "mocha", "junit", "xunit", "nunit", "mockito", "moq"), "testing"),
+]
+
+_REQUIREMENT = re.compile(r"^([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*(.*)$")
+_PINNED = re.compile(r"^===?\s*([^,\s]+)$")
+_MAVEN_PROPERTY = re.compile(r"\$\{([^}]+)\}")
+
+
+def is_manifest(file_path: str) -> bool:
+    filename = os.path.basename(file_path)
+    if filename in MANIFEST_FILENAMES or filename.endswith(MANIFEST_EXTENSIONS):
+        return True
+    # requirements-dev.txt, requirements/prod.txt style splits
+    return filename.startswith("requirements") and filename.endswith(".txt")
+
+
+def categorize_package(name: str) -> str:
+    lowered = name.lower()
+    for prefixes, category in PACKAGE_CATEGORIES:
+        if lowered.startswith(prefixes):
+            return category
+    return "library"
+
+
+def _dependency(package: str, version: Optional[str], ecosystem: str, manifest: str,
+                scope: str = "runtime") -> Dict:
+    return {
+        "package": package,
+        "version": version or "*",
+        "category": categorize_package(package),
+        "ecosystem": ecosystem,
+        "scope": scope,
+        "manifest": manifest
+    }
+
+
+def parse_requirements(file_path: str) -> List[Dict]:
+    dependencies = []
+    scope = "development" if re.search(r"dev|test", os.path.basename(file_path)) else "runtime"
+
+    with open(file_path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.split(" #", 1)[0].strip()
+            # Includes, editable installs, index options and bare URLs carry no name
+            if not line or line.startswith(("#", "-", "git+", "http:", "https:")):
+                continue
+            match = _REQUIREMENT.match(line.split(";", 1)[0].strip())
+            if match is None:
+                continue
+            specifier = match.group(2).strip()
+            pinned = _PINNED.match(specifier)
+            version = pinned.group(1) if pinned else specifier
+            dependencies.append(_dependency(match.group(1), version, "pypi", file_path, scope))
+
+    return dependencies
+
+
+def parse_package_json(file_path: str) -> List[Dict]:
+    with open(file_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    dependencies = []
+    for section, scope in NPM_SECTIONS.items():
+        for package, version in (manifest.get(section) or {}).items():
+            dependencies.append(_dependency(package, str(version), "npm", file_path, scope))
+    return dependencies
+
+
+def _local_name(tag: str) -> str:
+    # Drop the {namespace} prefix ElementTree puts on every tag
+    return tag.rsplit("}", 1)[-1]
+
+
+def _children(element) -> Dict[str, str]:
+    return {_local_name(child.tag): (child.text or "").strip() for child in element}
+
+
+def parse_pom(file_path: str) -> List[Dict]:
+    root = ET.parse(file_path).getroot()
+    properties: Dict[str, str] = {}
+    dependencies = []
+
+    for element in root:
+        name = _local_name(element.tag)
+        if name == "properties":
+            properties.update(_children(element))
+        elif name == "version":
+            properties["project.version"] = (element.text or "").strip()
+
+    def resolve(value: Optional[str]) -> Optional[str]:
+        if not value:
+            return value
+        return _MAVEN_PROPERTY.sub(lambda m: properties.get(m.group(1), m.group(0)), value)
+
+    for element in root.iter():
+        if _local_name(element.tag) != "dependency":
+            continue
+        fields = _children(element)
+        if not fields.get("artifactId"):
+            continue
+        scope = fields.get("scope") or "runtime"
+        if scope == "test":
+            scope = "development"
+        package = f"{fields.get('groupId', '')}:{fields['artifactId']}".lstrip(":")
+        dependency = _dependency(package, resolve(fields.get("version")), "maven", file_path, scope)
+        dependency["category"] = categorize_package(fields["artifactId"])
+        if dependency["category"] == "library":
+            dependency["category"] = categorize_package(fields.get("groupId", ""))
+        dependencies.append(dependency)
+
+    return dependencies
+
+
+def parse_csproj(file_path: str) -> List[Dict]:
+    root = ET.parse(file_path).getroot()
+    dependencies = []
+
+    for element in root.iter():
+        if _local_name(element.tag) != "PackageReference":
+            continue
+        package = element.get("Include") or element.get("Update")
+        if not package:
+            continue
+        version = element.get("Version") or _children(element).get("Version")
+        dependencies.append(_dependency(package, version, "nuget", file_path))
+
+    return dependencies
+
+
+def parse_manifest(file_path: str) -> List[Dict]:
+    filename = os.path.basename(file_path)
+    try:
+        if filename == "package.json":
+            return parse_package_json(file_path)
+        if filename == "pom.xml":
+            return parse_pom(file_path)
+        if filename.endswith(".csproj"):
+            return parse_csproj(file_path)
+        return parse_requirements(file_path)
+    except (OSError, ValueError, ET.ParseError) as e:
+        logger.warning(f"Skipping unreadable manifest {file_path}: {e}")
+        return []
+
+
+def collect_dependencies(manifests: Iterable[str]) -> List[Dict]:
+    """
+    Parse every manifest and de-duplicate by ecosystem and package name,
+    keeping the first declaration seen
+    """
+    seen = set()
+    dependencies = []
+
+    for manifest in manifests:
+        for dependency in parse_manifest(manifest):
+            key = (dependency["ecosystem"], dependency["package"].lower())
+            if key in seen:
+                continue
+            seen.add(key)
+            dependencies.append(dependency)
+
+    return dependencies
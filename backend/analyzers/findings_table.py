@@ -0,0 +1,69 @@
+import logging
+from typing import Dict, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SEVERITIES = ("critical", "high", "medium", "low")
+SEVERITY_CODES = {severity: code for code, severity in enumerate(SEVERITIES)}
+DEFAULT_SEVERITY_CODE = SEVERITY_CODES["medium"]
+
+
+class FindingsTable:
+    """
+    Columnar view of security findings: one integer code per finding for
+    the rule id and for the severity, so counts and compliance checks are
+    batched array operations instead of repeated passes over the dicts
+    """
+
+    def __init__(self, findings: List[Dict]):
+        self.size = len(findings)
+
+        rule_ids = np.array([f.get("id", "") for f in findings], dtype=str)
+        self.rule_vocabulary, self.rule_codes = np.unique(rule_ids, return_inverse=True)
+
+        self.severity_codes = np.fromiter(
+            (SEVERITY_CODES.get(f.get("severity"), DEFAULT_SEVERITY_CODE) for f in findings),
+            dtype=np.int8,
+            count=self.size
+        )
+
+    def severity_histogram(self) -> Dict[str, int]:
+        counts = np.bincount(self.severity_codes, minlength=len(SEVERITIES))
+        return {severity: int(counts[code]) for code, severity in enumerate(SEVERITIES)}
+
+    def compliance(self, frameworks: Dict[str, List[str]]) -> Dict:
+        status = {}
+
+        for framework, required_rules in frameworks.items():
+            violations = int(np.isin(np.array(required_rules, dtype=str), self.rule_vocabulary).sum())
+            # A framework left without rules (custom rule files) has nothing to violate
+            percentage = ((len(required_rules) - violations) / len(required_rules)) * 100 if required_rules else 100.0
+            status[framework] = {
+                "compliant": violations == 0,
+                "violations": violations,
+                "compliance_percentage": percentage
+            }
+
+        return status
+
+    def aggregate(self, frameworks: Dict[str, List[str]]) -> Dict:
+        """
+        All per-scan aggregates in one place, for the scanner and the agent
+        """
+        return {
+            "total": self.size,
+            "severity_histogram": self.severity_histogram(),
+            "compliance_status": self.compliance(frameworks)
+        }
+
+
+def mean_severity_score(histogram: Dict[str, int], scores: Dict[str, int]) -> float:
+    counts = np.array([histogram.get(severity, 0) for severity in SEVERITIES], dtype=np.int64)
+    total = counts.sum()
+    if total == 0:
+        return 0.0
+
+    weights = np.array([scores[severity] for severity in SEVERITIES], dtype=np.float64)
+    return float(counts @ weights / total)
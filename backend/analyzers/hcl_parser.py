@@ -0,0 +1,372 @@
+import re
+import textwrap
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+TERRAFORM_BLOCKS = ("resource", "data", "module", "variable")
+
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>[ \t\r\f]+)
+  | (?P<comment>\#|//)
+  | (?P<block_comment>/\*)
+  | (?P<heredoc><<-?)(?P<marker>[A-Za-z_]\w*)
+  | (?P<string>")
+  | (?P<number>\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+  | (?P<ident>[A-Za-z_][\w-]*)
+  | (?P<op>=>|==|!=|<=|>=|&&|\|\||\.\.\.|[{}\[\]()=,:.?!<>+\-*/%])
+""", re.VERBOSE)
+
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", '"': '"', "\\": "\\"}
+_OPENERS = {"{": "}", "[": "]", "(": ")"}
+_CLOSERS = {"}", "]", ")"}
+
+Token = Tuple[str, object]
+NEWLINE: Token = ("newline", "\n")
+
+
+class HCLParseError(ValueError):
+    pass
+
+
+def _scan_string(line: str, pos: int) -> Tuple[str, int]:
+    """
+    Scan a quoted string starting just after the opening quote, keeping
+    ${...} / %{...} interpolations (and any strings nested in them) verbatim
+    """
+    out = []
+    depth = 0
+    i = pos
+    length = len(line)
+
+    while i < length:
+        ch = line[i]
+        if ch == "\\" and i + 1 < length:
+            nxt = line[i + 1]
+            out.append(_ESCAPES.get(nxt, ch + nxt))
+            i += 2
+        elif ch == '"' and depth == 0:
+            return "".join(out), i + 1
+        elif ch == '"':
+            inner, i = _scan_string(line, i + 1)
+            out.append(f'"{inner}"')
+        elif ch in "$%" and line.startswith("{", i + 1):
+            depth += 1
+            out.append(line[i:i + 2])
+            i += 2
+        else:
+            if depth and ch == "{":
+                depth += 1
+            elif depth and ch == "}":
+                depth -= 1
+            out.append(ch)
+            i += 1
+
+    return "".join(out), i
+
+
+def tokenize(lines: Iterable[str]) -> Iterator[Token]:
+    """
+    Turn an iterable of HCL source lines into a token stream.
+
+    Lines are consumed lazily, so a file object can be passed directly and
+    never has to be read into memory as a whole.
+    """
+    lines = iter(lines)
+    in_comment = False
+
+    for line in lines:
+        pos = 0
+        length = len(line.rstrip("\n"))
+
+        if in_comment:
+            end = line.find("*/")
+            if end < 0:
+                continue
+            in_comment = False
+            pos = end + 2
+
+        while pos < length:
+            match = _TOKEN_RE.match(line, pos)
+            if match is None:
+                yield ("op", line[pos])
+                pos += 1
+                continue
+
+            kind = match.lastgroup
+            pos = match.end()
+
+            if kind == "ws":
+                continue
+            elif kind == "comment":
+                pos = length
+            elif kind == "block_comment":
+                end = line.find("*/", pos)
+                if end < 0:
+                    in_comment = True
+                    pos = length
+                else:
+                    pos = end + 2
+            elif kind == "marker":
+                yield ("string", _read_heredoc(lines, match.group("marker"), match.group("heredoc") == "<<-"))
+                pos = length
+            elif kind == "string":
+                value, pos = _scan_string(line, pos)
+                yield ("string", value)
+            elif kind == "number":
+                text = match.group(kind)
+                yield ("number", float(text) if any(c in text for c in ".eE") else int(text))
+            else:
+                yield (kind, match.group(kind))
+
+        yield NEWLINE
+
+
+def _read_heredoc(lines: Iterator[str], marker: str, indented: bool) -> str:
+    body = []
+    for line in lines:
+        if line.strip() == marker:
+            break
+        body.append(line)
+
+    text = "".join(body)
+    return textwrap.dedent(text) if indented else text
+
+
+class _TokenStream:
+    def __init__(self, tokens: Iterator[Token]):
+        self._tokens = tokens
+        self._pushed: List[Token] = []
+
+    def next(self) -> Optional[Token]:
+        if self._pushed:
+            return self._pushed.pop()
+        return next(self._tokens, None)
+
+    def next_significant(self) -> Optional[Token]:
+        token = self.next()
+        while token == NEWLINE:
+            token = self.next()
+        return token
+
+    def push_back(self, token: Token):
+        self._pushed.append(token)
+
+
+def iter_blocks(lines: Iterable[str]) -> Iterator[Tuple[str, List[str], Dict]]:
+    """
+    Yield (block_type, labels, body) for every top-level block, one at a time
+    """
+    stream = _TokenStream(tokenize(lines))
+
+    while True:
+        token = stream.next_significant()
+        if token is None:
+            return
+
+        kind, value = token
+        if kind not in ("ident", "string"):
+            raise HCLParseError(f"Unexpected token {value!r} at top level")
+
+        nxt = stream.next()
+        if nxt is not None and nxt[0] == "op" and nxt[1] in ("=", ":"):
+            _collect_expression(stream)
+            continue
+
+        labels = []
+        while nxt is not None and nxt[0] in ("ident", "string"):
+            labels.append(str(nxt[1]))
+            nxt = stream.next()
+
+        if nxt != ("op", "{"):
+            raise HCLParseError(f"Expected '{{' after block header {value!r}")
+
+        yield str(value), labels, _parse_body(stream)
+
+
+def iter_terraform_blocks(lines: Iterable[str]) -> Iterator[Dict]:
+    """
+    Yield one record per resource, data, module and variable block
+    """
+    for block_type, labels, body in iter_blocks(lines):
+        if block_type not in TERRAFORM_BLOCKS:
+            continue
+
+        if block_type in ("resource", "data"):
+            resource_type = labels[0] if labels else "unknown"
+            name = labels[1] if len(labels) > 1 else "unknown"
+        else:
+            resource_type = block_type
+            name = labels[0] if labels else "unknown"
+
+        yield {
+            "type": resource_type,
+            "name": name,
+            "block": block_type,
+            "properties": body
+        }
+
+
+def _parse_body(stream: _TokenStream) -> Dict:
+    body: Dict = {}
+
+    while True:
+        token = stream.next_significant()
+        if token is None:
+            raise HCLParseError("Unexpected end of file inside block")
+
+        kind, value = token
+        if value == "}" and kind == "op":
+            return body
+        if kind not in ("ident", "string"):
+            raise HCLParseError(f"Unexpected token {value!r} in block body")
+
+        key = str(value)
+        nxt = stream.next()
+
+        if nxt is not None and nxt[0] == "op" and nxt[1] in ("=", ":"):
+            body[key] = _to_value(_collect_expression(stream))
+            continue
+
+        labels = []
+        while nxt is not None and nxt[0] in ("ident", "string"):
+            labels.append(str(nxt[1]))
+            nxt = stream.next()
+
+        if nxt != ("op", "{"):
+            raise HCLParseError(f"Expected '{{' after nested block {key!r}")
+
+        child = _parse_body(stream)
+        for label in reversed(labels):
+            child = {label: child}
+        body.setdefault(key, []).append(child)
+
+
+def _collect_expression(stream: _TokenStream) -> List[Token]:
+    """
+    Collect the tokens of one attribute value. Newlines end the expression
+    only outside brackets; a closing brace at depth zero belongs to the
+    enclosing block and is pushed back.
+    """
+    span: List[Token] = []
+    depth = 0
+
+    while True:
+        token = stream.next()
+        if token is None:
+            return span
+
+        kind, value = token
+        if depth == 0 and token == NEWLINE:
+            return span
+        if kind == "op" and value in _OPENERS:
+            depth += 1
+        elif kind == "op" and value in _CLOSERS:
+            if depth == 0:
+                stream.push_back(token)
+                return span
+            depth -= 1
+
+        span.append(token)
+
+
+def _split_top_level(span: List[Token], separators: Tuple[str, ...]) -> List[List[Token]]:
+    parts: List[List[Token]] = [[]]
+    depth = 0
+
+    for token in span:
+        kind, value = token
+        if kind == "op" and value in _OPENERS:
+            depth += 1
+        elif kind == "op" and value in _CLOSERS:
+            depth -= 1
+        elif depth == 0 and (token == NEWLINE or (kind == "op" and value in separators)):
+            parts.append([])
+            continue
+        parts[-1].append(token)
+
+    return [part for part in parts if part]
+
+
+def _is_wrapped(span: List[Token], opener: str) -> bool:
+    if len(span) < 2 or span[0] != ("op", opener) or span[-1] != ("op", _OPENERS[opener]):
+        return False
+
+    depth = 0
+    for index, (kind, value) in enumerate(span):
+        if kind == "op" and value in _OPENERS:
+            depth += 1
+        elif kind == "op" and value in _CLOSERS:
+            depth -= 1
+            if depth == 0 and index != len(span) - 1:
+                return False
+    return True
+
+
+def _to_value(span: List[Token]):
+    span = _strip_newlines(span)
+    if not span:
+        return None
+
+    if len(span) == 1:
+        kind, value = span[0]
+        if kind in ("string", "number"):
+            return value
+        if kind == "ident" and value in ("true", "false"):
+            return value == "true"
+        if kind == "ident" and value == "null":
+            return None
+    elif len(span) == 2 and span[0] == ("op", "-") and span[1][0] == "number":
+        return -span[1][1]
+
+    inner = span[1:-1]
+    is_for = bool(inner) and _first_significant(inner) == ("ident", "for")
+
+    if _is_wrapped(span, "[") and not is_for:
+        return [_to_value(item) for item in _split_top_level(inner, (",",))]
+
+    if _is_wrapped(span, "{") and not is_for:
+        obj = {}
+        for entry in _split_top_level(inner, (",",)):
+            entry = _strip_newlines(entry)
+            if len(entry) >= 2 and entry[1] in (("op", "="), ("op", ":")):
+                obj[str(entry[0][1])] = _to_value(entry[2:])
+            else:
+                return _to_text(span)
+        return obj
+
+    return _to_text(span)
+
+
+def _strip_newlines(span: List[Token]) -> List[Token]:
+    start, end = 0, len(span)
+    while start < end and span[start] == NEWLINE:
+        start += 1
+    while end > start and span[end - 1] == NEWLINE:
+        end -= 1
+    return span[start:end]
+
+
+def _first_significant(span: List[Token]) -> Optional[Token]:
+    for token in span:
+        if token != NEWLINE:
+            return token
+    return None
+
+
+def _to_text(span: List[Token]) -> str:
+    """
+    Render a non-literal expression back to compact source text
+    """
+    parts: List[str] = []
+    previous = None
+
+    for kind, value in span:
+        if (kind, value) == NEWLINE:
+            continue
+        text = f'"{value}"' if kind == "string" else str(value)
+        glue = previous in (".", "(", "[", "!") or text in (".", ",", ")", "]", "(", "[")
+        if parts and not glue:
+            parts.append(" ")
+        parts.append(text)
+        previous = text
+
+    return "".join(parts)
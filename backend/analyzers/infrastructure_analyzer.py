@@ -1,17 +1,48 @@
-import json
+import io
 import logging
-from typing import Dict, List
+import multiprocessing
+import tarfile
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, TextIO, Union
 import os
 
+from .hcl_parser import iter_terraform_blocks
+from .cfn_loader import MappedTemplate, iter_cloudformation_resources, materialized
+from .yaml_loader import load_infrastructure_yaml
+
 logger = logging.getLogger(__name__)
 
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2")
+SKIPPED_DIRECTORIES = {".git", ".terraform", "node_modules", "__pycache__"}
+
+
+def _analyze_single_file(file_path: str) -> Dict:
+    """
+    Process pool entry point: parse one file without sample fallbacks
+    """
+    return InfrastructureAnalyzer(sample_fallback=False).analyze_file(file_path)
+
+
+def is_archive(file_path: str) -> bool:
+    return file_path.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
 class InfrastructureAnalyzer:
-    def __init__(self):
+    def __init__(self, sample_fallback: bool = True, max_workers: Optional[int] = None):
         self.supported_formats = [".tf", ".json", ".yaml", ".yml"]
+        self.sample_fallback = sample_fallback
+        self.max_workers = max_workers or int(os.getenv("PARSER_WORKERS", os.cpu_count() or 1))
     
     def analyze_file(self, file_path: str) -> Dict:
         logger.info(f"Analyzing infrastructure file: {file_path}")
         
+        if os.path.isdir(file_path):
+            return self.analyze_directory(file_path)
+        if is_archive(file_path):
+            return self.analyze_archive(file_path)
+        
         file_extension = os.path.splitext(file_path)[1]
         
         if file_extension == ".tf":
@@ -21,84 +52,199 @@ class InfrastructureAnalyzer:
         elif file_extension in [".yaml", ".yml"]:
             return self.analyze_yaml(file_path)
         else:
+            return self.fallback_results(f"Unsupported file type: {file_extension}")
+    
+    def analyze_directory(self, directory: str) -> Dict:
+        files = self.discover_files(directory)
+        logger.info(f"Analyzing {len(files)} infrastructure files under {directory}")
+        
+        if len(files) > 1 and self.max_workers > 1:
+            workers = min(self.max_workers, len(files))
+            chunksize = max(1, len(files) // (workers * 4))
+            context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            )
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                results = list(executor.map(_analyze_single_file, files, chunksize=chunksize))
+        else:
+            results = [_analyze_single_file(path) for path in files]
+        
+        merged = self.merge_results(directory, files, results)
+        
+        if not merged["resources"] and self.sample_fallback:
             return self.create_sample_results()
+        
+        return merged
+    
+    def analyze_archive(self, archive_path: str) -> Dict:
+        try:
+            with tempfile.TemporaryDirectory(prefix="migrationgpt_") as extract_dir:
+                self.extract_archive(archive_path, extract_dir)
+                results = self.analyze_directory(extract_dir)
+            
+            results["metadata"]["root"] = os.path.basename(archive_path)
+            return results
+        except Exception as e:
+            logger.error(f"Error analyzing archive: {e}")
+            return self.fallback_results(str(e))
+    
+    def discover_files(self, directory: str) -> List[str]:
+        files = []
+        for root, dirs, filenames in os.walk(directory):
+            dirs[:] = sorted(d for d in dirs if d not in SKIPPED_DIRECTORIES)
+            for filename in sorted(filenames):
+                if os.path.splitext(filename)[1] in self.supported_formats:
+                    files.append(os.path.join(root, filename))
+        return files
+    
+    def extract_archive(self, archive_path: str, destination: str):
+        """
+        Extract only supported infrastructure files, rejecting members that
+        would escape the destination directory
+        """
+        root = os.path.realpath(destination)
+        
+        def is_wanted(member_name: str) -> bool:
+            target = os.path.realpath(os.path.join(root, member_name))
+            if not target.startswith(root + os.sep):
+                logger.warning(f"Skipping archive member outside extraction root: {member_name}")
+                return False
+            return os.path.splitext(member_name)[1] in self.supported_formats
+        
+        if archive_path.lower().endswith(".zip"):
+            with zipfile.ZipFile(archive_path) as archive:
+                for member in archive.infolist():
+                    if not member.is_dir() and is_wanted(member.filename):
+                        archive.extract(member, root)
+        else:
+            with tarfile.open(archive_path) as archive:
+                members = [m for m in archive.getmembers() if m.isfile() and is_wanted(m.name)]
+                archive.extractall(root, members=members)
+    
+    def merge_results(self, root: str, files: List[str], results: List[Dict]) -> Dict:
+        merged = {
+            "file_type": "multi",
+            "resources": [],
+            "total_resources": 0,
+            "data_sources": [],
+            "modules": [],
+            "variables": [],
+            "metadata": {
+                "root": root,
+                "total_files": len(files),
+                "file_types": {},
+                "files": []
+            }
+        }
+        
+        for path, result in zip(files, results):
+            relative_path = os.path.relpath(path, root)
+            metadata = result.get("metadata", {})
+            
+            for key in ("resources", "data_sources", "modules", "variables"):
+                for item in result.get(key, []):
+                    item["source_file"] = relative_path
+                    merged[key].append(item)
+            
+            file_type = result.get("file_type", "unknown")
+            merged["metadata"]["file_types"][file_type] = merged["metadata"]["file_types"].get(file_type, 0) + 1
+            
+            breakdown = {
+                "file_path": relative_path,
+                "file_type": file_type,
+                "total_resources": result.get("total_resources", 0)
+            }
+            if "error" in metadata:
+                breakdown["error"] = metadata["error"]
+            merged["metadata"]["files"].append(breakdown)
+        
+        merged["total_resources"] = len(merged["resources"])
+        return merged
     
     def analyze_terraform(self, file_path: str) -> Dict:
         try:
             with open(file_path, 'r') as f:
-                content = f.read()
+                blocks = self.extract_terraform_resources(f)
             
-            resources = self.extract_terraform_resources(content)
+            resources = [b for b in blocks if b["block"] == "resource"]
+            block_counts = {}
+            for block in blocks:
+                block_counts[block["block"]] = block_counts.get(block["block"], 0) + 1
             
             return {
                 "file_type": "terraform",
                 "resources": resources,
                 "total_resources": len(resources),
+                "data_sources": [b for b in blocks if b["block"] == "data"],
+                "modules": [b for b in blocks if b["block"] == "module"],
+                "variables": [b for b in blocks if b["block"] == "variable"],
                 "metadata": {
                     "file_path": file_path,
-                    "file_size": len(content)
+                    "file_size": os.path.getsize(file_path),
+                    "block_counts": block_counts
                 }
             }
         except Exception as e:
             logger.error(f"Error analyzing Terraform: {e}")
-            return self.create_sample_results()
+            return self.fallback_results(str(e))
     
-    def extract_terraform_resources(self, content: str) -> List[Dict]:
-        resources = []
-        
-        if "aws_instance" in content:
-            resources.append({
-                "type": "aws_instance",
-                "name": "web_server",
-                "properties": {"instance_type": "t3.medium"}
-            })
+    def extract_terraform_resources(self, source: Union[str, TextIO]) -> List[Dict]:
+        if isinstance(source, str):
+            source = io.StringIO(source)
         
-        if "aws_db_instance" in content:
-            resources.append({
-                "type": "aws_db_instance",
-                "name": "database",
-                "properties": {"engine": "mysql"}
-            })
+        resources = list(iter_terraform_blocks(source))
         
-        if "aws_s3_bucket" in content:
-            resources.append({
-                "type": "aws_s3_bucket",
-                "name": "storage",
-                "properties": {"versioning": "enabled"}
-            })
-        
-        if not resources:
+        if not resources and self.sample_fallback:
             resources = self.create_sample_resources()
+            for resource in resources:
+                resource["block"] = "resource"
         
         return resources
     
     def analyze_cloudformation(self, file_path: str) -> Dict:
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-            
-            resources = []
-            cf_resources = data.get("Resources", {})
-            
-            for name, config in cf_resources.items():
-                resources.append({
-                    "type": config.get("Type", "Unknown"),
-                    "name": name,
-                    "properties": config.get("Properties", {})
-                })
+            with MappedTemplate(file_path) as template:
+                # Properties are read while the map is open; results outlive it
+                resources = [materialized(resource) for resource in iter_cloudformation_resources(template)]
+                size = template.size
             
             return {
                 "file_type": "cloudformation",
                 "resources": resources,
                 "total_resources": len(resources),
-                "metadata": {"file_path": file_path}
+                "metadata": {
+                    "file_path": file_path,
+                    "file_size": size
+                }
             }
         except Exception as e:
             logger.error(f"Error analyzing CloudFormation: {e}")
-            return self.create_sample_results()
+            return self.fallback_results(str(e))
     
     def analyze_yaml(self, file_path: str) -> Dict:
-        return self.create_sample_results()
+        try:
+            with open(file_path, 'r') as f:
+                parsed = load_infrastructure_yaml(f)
+            
+            resources = parsed["resources"]
+            if not resources:
+                return self.fallback_results("No CloudFormation or Kubernetes resources found")
+            
+            return {
+                "file_type": parsed["file_type"],
+                "resources": resources,
+                "total_resources": len(resources),
+                "metadata": {
+                    "file_path": file_path,
+                    "file_size": os.path.getsize(file_path),
+                    "format": "yaml",
+                    "documents": parsed["documents"],
+                    "kinds": parsed["kinds"]
+                }
+            }
+        except Exception as e:
+            logger.error(f"Error analyzing YAML: {e}")
+            return self.fallback_results(str(e))
     
     def create_sample_resources(self) -> List[Dict]:
         return [
@@ -124,6 +270,17 @@ class InfrastructureAnalyzer:
             }
         ]
     
+    def fallback_results(self, error: str) -> Dict:
+        if self.sample_fallback:
+            return self.create_sample_results()
+        
+        return {
+            "file_type": "unknown",
+            "resources": [],
+            "total_resources": 0,
+            "metadata": {"error": error}
+        }
+    
     def create_sample_results(self) -> Dict:
         return {
             "file_type": "generic",
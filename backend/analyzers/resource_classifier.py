@@ -0,0 +1,207 @@
+import logging
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ("compute", "database", "storage", "network", "other")
+
+TYPE_CATEGORIES = {
+    # Generic types emitted by the sample results
+    "compute_instance": "compute",
+    "database": "database",
+    "storage": "storage",
+    "network": "network",
+
+    # AWS (Terraform)
+    "aws_instance": "compute",
+    "aws_launch_template": "compute",
+    "aws_autoscaling_group": "compute",
+    "aws_lambda_function": "compute",
+    "aws_ecs_service": "compute",
+    "aws_ecs_cluster": "compute",
+    "aws_eks_cluster": "compute",
+    "aws_db_instance": "database",
+    "aws_rds_cluster": "database",
+    "aws_rds_cluster_instance": "database",
+    "aws_dynamodb_table": "database",
+    "aws_elasticache_cluster": "database",
+    "aws_s3_bucket": "storage",
+    "aws_s3_bucket_acl": "other",
+    "aws_s3_bucket_policy": "other",
+    "aws_s3_bucket_versioning": "other",
+    "aws_s3_bucket_public_access_block": "other",
+    "aws_s3_bucket_server_side_encryption_configuration": "other",
+    "aws_ebs_volume": "storage",
+    "aws_efs_file_system": "storage",
+    "aws_vpc": "network",
+    "aws_subnet": "network",
+    "aws_security_group": "network",
+    "aws_security_group_rule": "network",
+    "aws_lb": "network",
+    "aws_alb": "network",
+    "aws_lb_listener": "network",
+    "aws_route_table": "network",
+    "aws_internet_gateway": "network",
+    "aws_nat_gateway": "network",
+    "aws_cloudfront_distribution": "network",
+
+    # AWS (CloudFormation)
+    "aws::ec2::instance": "compute",
+    "aws::autoscaling::autoscalinggroup": "compute",
+    "aws::lambda::function": "compute",
+    "aws::ecs::service": "compute",
+    "aws::eks::cluster": "compute",
+    "aws::rds::dbinstance": "database",
+    "aws::rds::dbcluster": "database",
+    "aws::dynamodb::table": "database",
+    "aws::s3::bucket": "storage",
+    "aws::s3::bucketpolicy": "other",
+    "aws::ec2::volume": "storage",
+    "aws::efs::filesystem": "storage",
+    "aws::ec2::vpc": "network",
+    "aws::ec2::subnet": "network",
+    "aws::ec2::securitygroup": "network",
+    "aws::elasticloadbalancingv2::loadbalancer": "network",
+    "aws::elasticloadbalancingv2::listener": "network",
+
+    # Azure
+    "azurerm_virtual_machine": "compute",
+    "azurerm_linux_virtual_machine": "compute",
+    "azurerm_windows_virtual_machine": "compute",
+    "azurerm_kubernetes_cluster": "compute",
+    "azurerm_function_app": "compute",
+    "azurerm_mssql_database": "database",
+    "azurerm_sql_database": "database",
+    "azurerm_postgresql_server": "database",
+    "azurerm_cosmosdb_account": "database",
+    "azurerm_storage_account": "storage",
+    "azurerm_managed_disk": "storage",
+    "azurerm_virtual_network": "network",
+    "azurerm_subnet": "network",
+    "azurerm_network_security_group": "network",
+    "azurerm_lb": "network",
+
+    # GCP
+    "google_compute_instance": "compute",
+    "google_container_cluster": "compute",
+    "google_cloudfunctions_function": "compute",
+    "google_sql_database_instance": "database",
+    "google_spanner_instance": "database",
+    "google_storage_bucket": "storage",
+    "google_compute_disk": "storage",
+    "google_compute_network": "network",
+    "google_compute_subnetwork": "network",
+    "google_compute_firewall": "network",
+
+    # Kubernetes (manifests and the Terraform kubernetes provider)
+    "kubernetes_deployment": "compute",
+    "kubernetes_stateful_set": "compute",
+    "kubernetes_daemon_set": "compute",
+    "kubernetes_replica_set": "compute",
+    "kubernetes_replication_controller": "compute",
+    "kubernetes_pod": "compute",
+    "kubernetes_job": "compute",
+    "kubernetes_cron_job": "compute",
+    "kubernetes_horizontal_pod_autoscaler": "compute",
+    "kubernetes_service": "network",
+    "kubernetes_ingress": "network",
+    "kubernetes_ingress_class": "network",
+    "kubernetes_network_policy": "network",
+    "kubernetes_endpoints": "network",
+    "kubernetes_persistent_volume": "storage",
+    "kubernetes_persistent_volume_claim": "storage",
+    "kubernetes_storage_class": "storage",
+    "kubernetes_config_map": "other",
+    "kubernetes_secret": "other",
+    "kubernetes_namespace": "other",
+    "kubernetes_service_account": "other",
+    "kubernetes_role": "other",
+    "kubernetes_role_binding": "other",
+    "kubernetes_cluster_role": "other",
+    "kubernetes_cluster_role_binding": "other",
+}
+
+# Substring fallbacks for types missing from TYPE_CATEGORIES, checked in order
+_HEURISTICS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("database", ("database", "db_", "rds", "sql", "dynamodb", "cosmos")),
+    ("storage", ("storage", "s3", "bucket", "volume", "disk", "efs", "filesystem")),
+    ("network", ("network", "vpc", "subnet", "security_group", "securitygroup", "firewall",
+                 "loadbalancer", "_lb", "gateway", "route")),
+    ("compute", ("compute", "instance", "virtual_machine", "lambda", "function", "container", "cluster")),
+)
+
+_PROVIDER_PREFIXES = (
+    ("aws_", "aws"),
+    ("aws::", "aws"),
+    ("azurerm_", "azure"),
+    ("google_", "gcp"),
+    ("kubernetes_", "kubernetes"),
+)
+
+# Resource types come from uploads, so the memo has to be bounded
+LOOKUP_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=LOOKUP_CACHE_SIZE)
+def lookup_type(resource_type: str) -> Tuple[str, str, str]:
+    """
+    Return (category, provider, normalized_type) for a raw resource type
+    """
+    normalized = resource_type.strip().lower()
+    category = TYPE_CATEGORIES.get(normalized)
+    if category is None:
+        category = "other"
+        for candidate, needles in _HEURISTICS:
+            if any(needle in normalized for needle in needles):
+                category = candidate
+                break
+
+    provider = "generic"
+    for prefix, name in _PROVIDER_PREFIXES:
+        if normalized.startswith(prefix):
+            provider = name
+            break
+
+    return category, provider, normalized
+
+
+class ResourceClassifier:
+    """
+    Tags each resource with category, provider and normalized type in a
+    single pass and indexes resources by category for the agents
+    """
+
+    def classify(self, infra_results: Dict) -> Dict:
+        resources = infra_results.get("resources", [])
+        by_category: Dict[str, List[int]] = {category: [] for category in CATEGORIES}
+
+        for position, resource in enumerate(resources):
+            category, provider, normalized = lookup_type(resource.get("type", ""))
+            resource["category"] = category
+            resource["provider"] = provider
+            resource["normalized_type"] = normalized
+            by_category[category].append(position)
+
+        classification = {
+            "total": len(resources),
+            "counts": {category: len(positions) for category, positions in by_category.items()},
+            "by_category": by_category
+        }
+        infra_results["classification"] = classification
+        return classification
+
+
+def ensure_classified(infra_results: Dict) -> Dict:
+    """
+    Return the classification index, computing it only if it is missing or stale
+    """
+    classification = infra_results.get("classification")
+    if classification and classification.get("total") == len(infra_results.get("resources", [])):
+        return classification
+    return ResourceClassifier().classify(infra_results)
+
+
+def resources_in(infra_results: Dict, category: str) -> List[Dict]:
+    resources = infra_results.get("resources", [])
+    return [resources[position] for position in ensure_classified(infra_results)["by_category"][category]]
@@ -0,0 +1,318 @@
+import os
+import re
+import json
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SEVERITIES = ("critical", "high", "medium", "low")
+
+# Rule definitions. A rule applies to a resource when the resource's
+# normalized type is listed in selector.types or its category is listed in
+# selector.categories; it fires when the predicate holds for the resource's
+# properties. Property names are matched case- and underscore-insensitively
+# so one rule covers Terraform (storage_encrypted) and CloudFormation
+# (StorageEncrypted) spellings.
+DEFAULT_RULES: List[Dict] = [
+    {
+        "id": "SEC-001",
+        "family": "encryption",
+        "check": "storage_encryption",
+        "type": "Unencrypted Storage",
+        "severity": "critical",
+        "frameworks": ["SOC2", "HIPAA", "PCI-DSS"],
+        "selector": {"categories": ["storage", "database"]},
+        "predicate": {"none_truthy": [
+            "server_side_encryption_configuration", "bucket_encryption", "encryption",
+            "encrypted", "storage_encrypted", "kms_key_id", "kms_key_name"
+        ]},
+        "description": "Storage resource is not encrypted at rest",
+        "remediation": "Enable encryption using AWS KMS or equivalent"
+    },
+    {
+        "id": "SEC-002",
+        "family": "encryption",
+        "check": "transmission_encryption",
+        "type": "Unencrypted Transmission",
+        "severity": "high",
+        "frameworks": ["SOC2", "HIPAA", "PCI-DSS"],
+        "selector": {"types": [
+            "aws_lb_listener", "aws_alb_listener", "aws::elasticloadbalancingv2::listener"
+        ]},
+        "predicate": {"any_of": {"protocol": ["HTTP"]}},
+        "description": "Listener accepts unencrypted HTTP traffic",
+        "remediation": "Terminate TLS on the listener and redirect HTTP to HTTPS"
+    },
+    {
+        "id": "SEC-003",
+        "family": "access_control",
+        "check": "public_access",
+        "type": "Public Access Enabled",
+        "severity": "critical",
+        "frameworks": ["SOC2", "HIPAA", "PCI-DSS"],
+        "selector": {
+            "categories": ["storage", "database"],
+            "types": ["aws_s3_bucket_public_access_block", "aws_s3_bucket_acl"]
+        },
+        "predicate": {"any": [
+            {"any_of": {
+                "publicly_accessible": [True],
+                "acl": ["public-read", "public-read-write"],
+                "access_control": ["PublicRead", "PublicReadWrite"],
+                "block_public_acls": [False],
+                "block_public_policy": [False],
+                "ignore_public_acls": [False],
+                "restrict_public_buckets": [False]
+            }},
+            {"pattern": {"public_access_block_configuration": r'":\s*false'}}
+        ]},
+        "description": "Resource allows public access",
+        "remediation": "Restrict access to authorized users/services only"
+    },
+    {
+        "id": "SEC-004",
+        "family": "access_control",
+        "check": "iam_policies",
+        "type": "Overly Permissive IAM Policy",
+        "severity": "high",
+        "frameworks": ["SOC2", "PCI-DSS"],
+        "selector": {"types": [
+            "aws_iam_policy", "aws_iam_role_policy", "aws_iam_user_policy", "aws_iam_group_policy",
+            "aws::iam::policy", "aws::iam::managedpolicy"
+        ]},
+        "predicate": {"pattern": {
+            "policy": r'"Action"\s*:\s*\[?\s*"\*"',
+            "policy_document": r'"Action"\s*:\s*\[?\s*"\*"'
+        }},
+        "description": "IAM policy grants all actions",
+        "remediation": "Scope IAM policies to the actions and resources actually required"
+    },
+    {
+        "id": "SEC-005",
+        "family": "network",
+        "check": "network_segmentation",
+        "type": "Network Segmentation",
+        "severity": "medium",
+        "frameworks": [],
+        "selector": {"types": ["aws_subnet", "aws::ec2::subnet"]},
+        "predicate": {"any_of": {"map_public_ip_on_launch": [True]}},
+        "description": "Subnet assigns public IPs to every instance launched in it",
+        "remediation": "Implement subnet isolation with private subnets for application tiers"
+    },
+    {
+        "id": "SEC-006",
+        "family": "network",
+        "check": "firewall_rules",
+        "type": "Overly Permissive Firewall",
+        "severity": "high",
+        "frameworks": ["PCI-DSS"],
+        "selector": {"types": [
+            "aws_security_group", "aws::ec2::securitygroup", "google_compute_firewall",
+            "azurerm_network_security_group"
+        ]},
+        "predicate": {"pattern": {
+            "ingress": r"0\.0\.0\.0/0",
+            "security_group_ingress": r"0\.0\.0\.0/0",
+            "source_ranges": r"0\.0\.0\.0/0",
+            "security_rule": r'"source_address_prefix": "(\*|0\.0\.0\.0/0|Internet)"'
+        }},
+        "description": "Security group allows traffic from 0.0.0.0/0",
+        "remediation": "Implement least privilege network access"
+    },
+    {
+        "id": "SEC-006",
+        "family": "network",
+        "check": "firewall_rules",
+        "type": "Overly Permissive Firewall",
+        "severity": "high",
+        "frameworks": ["PCI-DSS"],
+        "selector": {"types": ["aws_security_group_rule", "aws::ec2::securitygroupingress"]},
+        "predicate": {"all": [
+            {"none_of": {"type": ["egress"]}},
+            {"pattern": {"cidr_blocks": r"0\.0\.0\.0/0", "cidr_ip": r"0\.0\.0\.0/0"}}
+        ]},
+        "description": "Security group rule allows traffic from 0.0.0.0/0",
+        "remediation": "Implement least privilege network access"
+    }
+]
+
+
+def normalize_property(name: str) -> str:
+    return name.replace("_", "").replace("-", "").lower()
+
+
+def _equals(actual, expected) -> bool:
+    if isinstance(actual, str) and isinstance(expected, str):
+        return actual.lower() == expected.lower()
+    if isinstance(expected, bool) and isinstance(actual, str):
+        return actual.lower() == str(expected).lower()
+    return actual == expected
+
+
+def _as_text(value) -> str:
+    return value if isinstance(value, str) else json.dumps(value, default=str)
+
+
+Predicate = Callable[[Dict], bool]
+
+
+def compile_predicate(spec: Dict) -> Predicate:
+    """
+    Compile a predicate spec into a function over normalized properties.
+
+    Supported operators:
+      always                     -> true
+      none_truthy: [props]       -> no listed property is set to a truthy value
+      any_of: {prop: [values]}   -> some listed property equals one of its values
+      none_of: {prop: [values]}  -> no listed property equals one of its values
+      pattern: {prop: regex}     -> some listed property (rendered as JSON if
+                                    structured) matches its regex
+      all / any: [specs]         -> boolean composition
+    """
+    if not spec or "always" in spec:
+        return lambda props: True
+
+    (operator, argument), = spec.items()
+
+    if operator == "none_truthy":
+        names = [normalize_property(name) for name in argument]
+        return lambda props: not any(props.get(name) for name in names)
+
+    if operator in ("any_of", "none_of"):
+        expected = [(normalize_property(name), values) for name, values in argument.items()]
+
+        def matches(props: Dict) -> bool:
+            for name, values in expected:
+                if name in props and any(_equals(props[name], value) for value in values):
+                    return True
+            return False
+
+        return matches if operator == "any_of" else (lambda props: not matches(props))
+
+    if operator == "pattern":
+        patterns = [(normalize_property(name), re.compile(regex)) for name, regex in argument.items()]
+        return lambda props: any(
+            name in props and regex.search(_as_text(props[name])) is not None
+            for name, regex in patterns
+        )
+
+    if operator in ("all", "any"):
+        parts = [compile_predicate(part) for part in argument]
+        combine = all if operator == "all" else any
+        return lambda props: combine(part(props) for part in parts)
+
+    raise ValueError(f"Unknown predicate operator: {operator}")
+
+
+class RuleEngine:
+    """
+    Evaluates security rules against resources, indexing rules by
+    normalized resource type and category so each resource is only tested
+    against the rules that can apply to it
+    """
+
+    def __init__(self, rules: Optional[List[Dict]] = None):
+        self.rules = rules if rules is not None else self.load_rules()
+        self._compiled: List[Tuple[Dict, Predicate]] = []
+        self._by_type: Dict[str, List[int]] = {}
+        self._by_category: Dict[str, List[int]] = {}
+        self._candidates: Dict[Tuple[str, str], Tuple[Tuple[Dict, Predicate], ...]] = {}
+
+        for rule in self.rules:
+            self.add_rule(rule)
+
+    @staticmethod
+    def load_rules() -> List[Dict]:
+        """
+        Load rules from SECURITY_RULES_FILE (a JSON list) when set,
+        otherwise use the built-in definitions
+        """
+        path = os.getenv("SECURITY_RULES_FILE")
+        if not path:
+            return DEFAULT_RULES
+
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading security rules from {path}: {e}")
+            return DEFAULT_RULES
+
+    def add_rule(self, rule: Dict):
+        if rule.get("severity") not in SEVERITIES:
+            raise ValueError(f"Rule {rule.get('id')} has invalid severity {rule.get('severity')!r}")
+
+        position = len(self._compiled)
+        self._compiled.append((rule, compile_predicate(rule.get("predicate", {}))))
+
+        selector = rule.get("selector", {})
+        for resource_type in selector.get("types", []):
+            self._by_type.setdefault(resource_type.lower(), []).append(position)
+        for category in selector.get("categories", []):
+            self._by_category.setdefault(category, []).append(position)
+
+        self._candidates.clear()
+
+    def candidates(self, normalized_type: str, category: str) -> Tuple[Tuple[Dict, Predicate], ...]:
+        key = (normalized_type, category)
+        cached = self._candidates.get(key)
+        if cached is None:
+            # Racing threads compute the same tuple; the last store wins
+            # harmlessly, so the shared engine needs no lock here
+            positions = sorted(set(self._by_type.get(normalized_type, [])) |
+                               set(self._by_category.get(category, [])))
+            cached = tuple(self._compiled[position] for position in positions)
+            self._candidates[key] = cached
+        return cached
+
+    def evaluate(self, resources: Iterable[Dict]) -> List[Dict]:
+        findings = []
+
+        for resource in resources:
+            candidates = self.candidates(resource.get("normalized_type", ""), resource.get("category", "other"))
+            if not candidates:
+                continue
+
+            properties = resource.get("properties") or {}
+            props = {normalize_property(str(name)): value for name, value in properties.items()}
+
+            for rule, predicate in candidates:
+                if predicate(props):
+                    findings.append(self.create_finding(rule, resource))
+
+        return findings
+
+    def create_finding(self, rule: Dict, resource: Dict) -> Dict:
+        return {
+            "id": rule["id"],
+            "type": rule.get("type", rule.get("check", "unknown")),
+            "severity": rule["severity"],
+            "resource": resource.get("name", "unknown"),
+            "description": rule.get("description", ""),
+            "remediation": rule.get("remediation", "Review configuration"),
+            "compliance_impact": list(rule.get("frameworks", []))
+        }
+
+    def rules_by_family(self) -> Dict[str, List[Dict]]:
+        families: Dict[str, List[Dict]] = {}
+        seen = set()
+        for rule in self.rules:
+            if rule["id"] in seen:
+                continue
+            seen.add(rule["id"])
+            families.setdefault(rule.get("family", "general"), []).append({
+                "id": rule["id"],
+                "check": rule.get("check"),
+                "severity": rule["severity"]
+            })
+        return families
+
+    def framework_rules(self) -> Dict[str, List[str]]:
+        frameworks: Dict[str, List[str]] = {}
+        for rule in self.rules:
+            for framework in rule.get("frameworks", []):
+                rule_ids = frameworks.setdefault(framework, [])
+                if rule["id"] not in rule_ids:
+                    rule_ids.append(rule["id"])
+        return frameworks
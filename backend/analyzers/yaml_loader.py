@@ -0,0 +1,161 @@
+import re
+import logging
+from typing import Dict, Iterable, Iterator, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+try:
+    import yaml
+except ImportError:  # PyYAML is optional outside the full backend install
+    yaml = None
+
+# Document keys that mark a CloudFormation template
+CLOUDFORMATION_KEYS = ("AWSTemplateFormatVersion", "Resources")
+# Kubernetes metadata kept on resource records; the rest of the object
+# (spec, data, rules, ...) becomes the properties
+KUBERNETES_ENVELOPE = ("apiVersion", "kind", "metadata", "status")
+
+_CAMEL_BOUNDARY = re.compile(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
+
+
+def _fast_loader_base():
+    # libyaml's C loader when PyYAML was built against it
+    return getattr(yaml, "CSafeLoader", None) or yaml.SafeLoader
+
+
+def _construct_intrinsic(loader, tag_suffix: str, node) -> Dict:
+    """
+    CloudFormation short-form intrinsics (!Ref, !GetAtt, !Sub, ...) as the
+    equivalent long-form JSON objects
+    """
+    if isinstance(node, yaml.ScalarNode):
+        value = loader.construct_scalar(node)
+    elif isinstance(node, yaml.SequenceNode):
+        value = loader.construct_sequence(node, deep=True)
+    else:
+        value = loader.construct_mapping(node, deep=True)
+
+    if tag_suffix == "Ref":
+        return {"Ref": value}
+    if tag_suffix == "Condition":
+        return {"Condition": value}
+    if tag_suffix == "GetAtt" and isinstance(value, str):
+        value = value.split(".", 1)
+    return {f"Fn::{tag_suffix}": value}
+
+
+_LOADER = None
+
+
+def infrastructure_loader():
+    """
+    Safe loader class (C-accelerated when available) that understands
+    CloudFormation intrinsic tags; built once per process
+    """
+    global _LOADER
+    if _LOADER is None:
+        if yaml is None:
+            raise RuntimeError("PyYAML is not installed")
+        loader = type("InfrastructureLoader", (_fast_loader_base(),), {})
+        loader.add_multi_constructor("!", _construct_intrinsic)
+        _LOADER = loader
+    return _LOADER
+
+
+def kubernetes_type(kind: str) -> str:
+    """
+    Resource type for a Kubernetes kind, named like the Terraform
+    kubernetes provider (StatefulSet -> kubernetes_stateful_set)
+    """
+    return "kubernetes_" + _CAMEL_BOUNDARY.sub("_", kind).lower()
+
+
+def is_cloudformation(document) -> bool:
+    return isinstance(document, dict) and any(key in document for key in CLOUDFORMATION_KEYS)
+
+
+def is_kubernetes(document) -> bool:
+    return isinstance(document, dict) and "apiVersion" in document and isinstance(document.get("kind"), str)
+
+
+def iter_documents(stream: TextIO) -> Iterator:
+    """
+    Yield YAML documents one at a time; only the current document's
+    objects are alive at any point
+    """
+    for document in yaml.load_all(stream, Loader=infrastructure_loader()):
+        if document is not None:
+            yield document
+
+
+def iter_kubernetes_objects(document: Dict) -> Iterator[Dict]:
+    # `kind: List` (kubectl get -o yaml) wraps the real objects in items
+    kind = document.get("kind")
+    if isinstance(kind, str) and kind.endswith("List") and isinstance(document.get("items"), list):
+        for item in document["items"]:
+            if is_kubernetes(item):
+                yield item
+    else:
+        yield document
+
+
+def kubernetes_resource(obj: Dict) -> Dict:
+    metadata = obj.get("metadata") or {}
+    namespace = metadata.get("namespace")
+    name = metadata.get("name") or metadata.get("generateName") or "unnamed"
+
+    properties = {key: value for key, value in obj.items() if key not in KUBERNETES_ENVELOPE}
+    properties["api_version"] = obj.get("apiVersion")
+    if namespace:
+        properties["namespace"] = namespace
+    if metadata.get("labels"):
+        properties["labels"] = metadata["labels"]
+    if metadata.get("annotations"):
+        properties["annotations"] = metadata["annotations"]
+
+    return {
+        "type": kubernetes_type(obj["kind"]),
+        "name": f"{namespace}/{name}" if namespace else name,
+        "properties": properties
+    }
+
+
+def cloudformation_resources(document: Dict) -> Iterable[Dict]:
+    for name, config in (document.get("Resources") or {}).items():
+        config = config or {}
+        yield {
+            "type": config.get("Type", "Unknown"),
+            "name": name,
+            "properties": config.get("Properties") or {}
+        }
+
+
+def load_infrastructure_yaml(stream: TextIO) -> Dict:
+    """
+    Parse a CloudFormation YAML template or a (multi-document) Kubernetes
+    manifest into resource records shaped like the Terraform and JSON paths
+    """
+    resources = []
+    documents = 0
+    kinds: Dict[str, int] = {}
+    file_type: Optional[str] = None
+
+    for document in iter_documents(stream):
+        documents += 1
+        if is_cloudformation(document):
+            file_type = file_type or "cloudformation"
+            resources.extend(cloudformation_resources(document))
+        elif is_kubernetes(document):
+            file_type = file_type or "kubernetes"
+            for obj in iter_kubernetes_objects(document):
+                kinds[obj["kind"]] = kinds.get(obj["kind"], 0) + 1
+                resources.append(kubernetes_resource(obj))
+        else:
+            logger.debug(f"Skipping YAML document {documents}: not CloudFormation or Kubernetes")
+
+    return {
+        "file_type": file_type or "yaml",
+        "resources": resources,
+        "documents": documents,
+        "kinds": kinds
+    }
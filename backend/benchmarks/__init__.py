@@ -0,0 +1,5 @@
+"""
+Offline benchmarking tools: a local stand-in for the bedrock-runtime API,
+a load generator for the analysis endpoints, synthetic estate and codebase
+generators, and a stage-level benchmark suite with baseline comparison
+"""
@@ -0,0 +1,247 @@
+"""
+Local stand-in for the bedrock-runtime InvokeModel and
+InvokeModelWithResponseStream APIs.
+
+Point the production AIClient at it with BEDROCK_ENDPOINT_URL and
+DEMO_MODE=false (any credentials will do):
+
+    python -m benchmarks.bedrock_stub --port 8900 --latency-ms 400 --error-rate 0.02
+"""
+import os
+import json
+import time
+import base64
+import random
+import struct
+import hashlib
+import logging
+import argparse
+import binascii
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import unquote
+
+logger = logging.getLogger(__name__)
+
+WORDS = (
+    "migration", "workload", "encryption", "network", "latency", "replica", "subnet", "cost",
+    "rightsizing", "cutover", "rollback", "compliance", "storage", "throughput", "availability",
+    "container", "database", "policy", "gateway", "monitoring", "the", "and", "with", "for", "to"
+)
+
+
+class StubConfig:
+    """
+    Latency and failure model for the stand-in
+    """
+
+    def __init__(self, latency_ms: float = 300.0, jitter_ms: float = 100.0, token_ms: float = 5.0,
+                 response_tokens: int = 200, error_rate: float = 0.0, throttle_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.token_ms = token_ms
+        self.response_tokens = response_tokens
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "streams": 0, "errors": 0, "throttled": 0}
+
+    def first_token_delay(self) -> float:
+        with self._lock:
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(self.latency_ms + jitter, 0.0) / 1000
+
+    def failure(self) -> Optional[str]:
+        with self._lock:
+            roll = self.random.random()
+        if roll < self.throttle_rate:
+            return "ThrottlingException"
+        if roll < self.throttle_rate + self.error_rate:
+            return "InternalServerException"
+        return None
+
+    def count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+
+def completion_tokens(prompt: str, count: int) -> List[str]:
+    """
+    Deterministic filler text for a prompt, so identical prompts get
+    identical completions
+    """
+    rng = random.Random(hashlib.sha256(prompt.encode()).hexdigest())
+    return [rng.choice(WORDS) + " " for _ in range(count)]
+
+
+def encode_header(name: str, value: str) -> bytes:
+    name_bytes = name.encode()
+    value_bytes = value.encode()
+    # Header value type 7 is a string with a 2-byte length prefix
+    return (struct.pack("!B", len(name_bytes)) + name_bytes +
+            struct.pack("!BH", 7, len(value_bytes)) + value_bytes)
+
+
+def encode_event(payload: bytes, headers: Dict[str, str]) -> bytes:
+    """
+    One application/vnd.amazon.eventstream message: prelude (total and
+    header lengths, CRC), headers, payload and a trailing message CRC
+    """
+    header_bytes = b"".join(encode_header(name, value) for name, value in headers.items())
+    total_length = 12 + len(header_bytes) + len(payload) + 4
+    prelude = struct.pack("!II", total_length, len(header_bytes))
+    prelude += struct.pack("!I", binascii.crc32(prelude) & 0xFFFFFFFF)
+    message = prelude + header_bytes + payload
+    return message + struct.pack("!I", binascii.crc32(message) & 0xFFFFFFFF)
+
+
+def encode_chunk(chunk: Dict) -> bytes:
+    payload = json.dumps({"bytes": base64.b64encode(json.dumps(chunk).encode()).decode()}).encode()
+    return encode_event(payload, {
+        ":event-type": "chunk",
+        ":content-type": "application/json",
+        ":message-type": "event"
+    })
+
+
+def stream_chunks(model_id: str, tokens: List[str], input_tokens: int) -> Iterator[Dict]:
+    message_id = f"msg_stub_{hashlib.md5(''.join(tokens).encode()).hexdigest()[:16]}"
+    yield {"type": "message_start", "message": {
+        "id": message_id, "type": "message", "role": "assistant", "model": model_id, "content": [],
+        "stop_reason": None, "usage": {"input_tokens": input_tokens, "output_tokens": 0}
+    }}
+    yield {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}
+    for token in tokens:
+        yield {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": token}}
+    yield {"type": "content_block_stop", "index": 0}
+    yield {"type": "message_delta", "delta": {"stop_reason": "end_turn"},
+           "usage": {"output_tokens": len(tokens)}}
+    yield {"type": "message_stop"}
+
+
+class BedrockStubHandler(BaseHTTPRequestHandler):
+    config: StubConfig = StubConfig()
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def do_POST(self):
+        parts = self.path.split("?")[0].strip("/").split("/")
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+
+        if len(parts) != 3 or parts[0] != "model" or parts[2] not in ("invoke", "invoke-with-response-stream"):
+            self.send_error_response(404, "UnknownOperationException", f"Unknown path {self.path}")
+            return
+
+        model_id = unquote(parts[1])
+        streaming = parts[2] == "invoke-with-response-stream"
+        self.config.count("streams" if streaming else "requests")
+
+        try:
+            request = json.loads(body or b"{}")
+            prompt = "".join(
+                message["content"] if isinstance(message["content"], str)
+                else "".join(block.get("text", "") for block in message["content"])
+                for message in request.get("messages", [])
+            )
+            max_tokens = int(request.get("max_tokens", 4096))
+        except (ValueError, KeyError, TypeError) as e:
+            self.send_error_response(400, "ValidationException", f"Malformed request body: {e}")
+            return
+
+        time.sleep(self.config.first_token_delay())
+        failure = self.config.failure()
+        if failure is not None:
+            self.config.count("throttled" if failure == "ThrottlingException" else "errors")
+            status = 429 if failure == "ThrottlingException" else 500
+            self.send_error_response(status, failure, f"Injected {failure}")
+            return
+
+        tokens = completion_tokens(prompt, min(self.config.response_tokens, max_tokens))
+        input_tokens = max(len(prompt) // 4, 1)
+
+        if streaming:
+            self.send_stream(model_id, tokens, input_tokens)
+        else:
+            time.sleep(len(tokens) * self.config.token_ms / 1000)
+            self.send_json(200, {
+                "id": "msg_stub", "type": "message", "role": "assistant", "model": model_id,
+                "content": [{"type": "text", "text": "".join(tokens)}],
+                "stop_reason": "end_turn", "stop_sequence": None,
+                "usage": {"input_tokens": input_tokens, "output_tokens": len(tokens)}
+            })
+
+    def send_json(self, status: int, payload: Dict, headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("x-amzn-RequestId", hashlib.md5(data).hexdigest())
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_error_response(self, status: int, error_type: str, message: str):
+        self.send_json(status, {"message": message}, {"x-amzn-ErrorType": error_type})
+
+    def send_stream(self, model_id: str, tokens: List[str], input_tokens: int):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.amazon.eventstream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("x-amzn-bedrock-content-type", "application/json")
+        self.end_headers()
+
+        for chunk in stream_chunks(model_id, tokens, input_tokens):
+            if chunk["type"] == "content_block_delta":
+                time.sleep(self.config.token_ms / 1000)
+            frame = encode_chunk(chunk)
+            self.wfile.write(f"{len(frame):x}\r\n".encode() + frame + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def serve(host: str, port: int, config: StubConfig) -> ThreadingHTTPServer:
+    handler = type("ConfiguredBedrockStubHandler", (BedrockStubHandler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local bedrock-runtime stand-in")
+    parser.add_argument("--host", default=os.getenv("BEDROCK_STUB_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("BEDROCK_STUB_PORT", 8900)))
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="mean time to first token")
+    parser.add_argument("--jitter-ms", type=float, default=100.0, help="uniform jitter around the latency")
+    parser.add_argument("--token-ms", type=float, default=5.0, help="delay per generated token")
+    parser.add_argument("--response-tokens", type=int, default=200, help="tokens per completion")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction answered with a 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction answered with a 429")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    config = StubConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, token_ms=args.token_ms,
+        response_tokens=args.response_tokens, error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate, seed=args.seed
+    )
+    server = serve(args.host, args.port, config)
+    logger.info(f"Bedrock stand-in listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logger.info(f"Served {config.counters}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Open-loop load generator for the analysis API.
+
+Requests are started at a fixed rate regardless of how quickly earlier
+ones finish. Each run goes through POST /api/analyze/stream, so the arrival
+time of every stage event is recorded and reported as p50/p95/p99 per
+stage. With --narrative, each finished analysis also streams its AI
+narrative, which exercises AIClient end to end; against the Bedrock
+stand-in this covers pooling, retries and concurrency offline:
+
+    python -m benchmarks.loadgen --file ../samples/sample-infrastructure.tf --rps 5 --duration 30
+
+Terraform and YAML payloads get a unique trailing comment per request
+(disable with --allow-cache) so the result cache does not answer them.
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+import argparse
+from typing import Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Stage events reported, in pipeline order; "completed" is the end-to-end time
+STAGES = (
+    "parsed", "security_findings", "security_assessment", "cost_estimate",
+    "architecture", "plan", "completed"
+)
+NARRATIVE_STAGES = ("narrative_first_token", "narrative")
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile of an unsorted list
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(round(q / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+class LoadGenerator:
+    """
+    Drives the streaming analysis endpoint at a target request rate and
+    collects per-stage latencies
+    """
+
+    def __init__(self, base_url: str, file_path: str, rps: float, duration: float,
+                 target_cloud: str = "aws", narrative: bool = False, timeout: float = 300.0,
+                 max_connections: int = 256, bust_cache: bool = True):
+        self.base_url = base_url.rstrip("/")
+        self.file_path = file_path
+        self.rps = rps
+        self.duration = duration
+        self.target_cloud = target_cloud
+        self.narrative = narrative
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.bust_cache = bust_cache and file_path.endswith((".tf", ".yaml", ".yml"))
+        self.sequence = 0
+
+        with open(file_path, "rb") as f:
+            self.payload = f.read()
+
+        self.timings: Dict[str, List[float]] = {stage: [] for stage in STAGES + NARRATIVE_STAGES}
+        self.errors: Dict[str, int] = {}
+
+    async def run(self) -> Dict:
+        limits = httpx.Limits(max_connections=self.max_connections,
+                              max_keepalive_connections=self.max_connections)
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=limits) as client:
+            interval = 1.0 / self.rps
+            started = time.perf_counter()
+            tasks = []
+            sent = 0
+
+            while time.perf_counter() - started < self.duration:
+                tasks.append(asyncio.create_task(self.one_request(client)))
+                sent += 1
+                next_at = started + sent * interval
+                await asyncio.sleep(max(next_at - time.perf_counter(), 0))
+
+            await asyncio.gather(*tasks)
+            elapsed = time.perf_counter() - started
+
+        return self.report(sent, elapsed)
+
+    def next_payload(self) -> bytes:
+        self.sequence += 1
+        if not self.bust_cache:
+            return self.payload
+        return self.payload + f"\n# loadgen {os.getpid()}-{self.sequence}-{time.time_ns()}\n".encode()
+
+    async def one_request(self, client: httpx.AsyncClient):
+        payload = self.next_payload()
+        started = time.perf_counter()
+        seen: Dict[str, float] = {}
+        analysis_id: Optional[str] = None
+
+        try:
+            async with client.stream(
+                "POST", "/api/analyze/stream",
+                params={"target_cloud": self.target_cloud},
+                files={"file": (os.path.basename(self.file_path), payload)}
+            ) as response:
+                if response.status_code != 200:
+                    self.record_error(f"http_{response.status_code}")
+                    return
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    name = event["event"]
+                    if name == "error":
+                        self.record_error("analysis_error")
+                        return
+                    seen.setdefault(name, time.perf_counter() - started)
+                    if name == "completed":
+                        analysis_id = event["data"]["analysis_id"]
+        except httpx.HTTPError as e:
+            self.record_error(type(e).__name__)
+            return
+
+        for stage in STAGES:
+            if stage in seen:
+                self.timings[stage].append(seen[stage] * 1000)
+
+        if self.narrative and analysis_id:
+            await self.stream_narrative(client, analysis_id)
+
+    async def stream_narrative(self, client: httpx.AsyncClient, analysis_id: str):
+        started = time.perf_counter()
+        first_token = None
+
+        try:
+            async with client.stream("GET", f"/api/analysis/{analysis_id}/narrative") as response:
+                if response.status_code != 200:
+                    self.record_error(f"narrative_http_{response.status_code}")
+                    return
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    if event["event"] == "token" and first_token is None:
+                        first_token = time.perf_counter() - started
+                    elif event["event"] == "error":
+                        self.record_error("narrative_error")
+                        return
+        except httpx.HTTPError as e:
+            self.record_error(f"narrative_{type(e).__name__}")
+            return
+
+        if first_token is not None:
+            self.timings["narrative_first_token"].append(first_token * 1000)
+        self.timings["narrative"].append((time.perf_counter() - started) * 1000)
+
+    def record_error(self, kind: str):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def report(self, sent: int, elapsed: float) -> Dict:
+        stages = {}
+        for stage, values in self.timings.items():
+            if not values:
+                continue
+            stages[stage] = {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "p99_ms": round(percentile(values, 99), 2),
+                "max_ms": round(max(values), 2)
+            }
+
+        completed = len(self.timings["completed"])
+        return {
+            "target_rps": self.rps,
+            "achieved_rps": round(completed / elapsed, 2) if elapsed else 0.0,
+            "sent": sent,
+            "completed": completed,
+            "errors": self.errors,
+            "duration_seconds": round(elapsed, 2),
+            "stages": stages
+        }
+
+
+def format_report(report: Dict) -> str:
+    lines = [
+        f"sent {report['sent']}, completed {report['completed']} in {report['duration_seconds']}s "
+        f"({report['achieved_rps']}/s achieved, {report['target_rps']}/s target)",
+        f"errors: {report['errors'] or 'none'}",
+        "",
+        f"{'stage':<24}{'count':>8}{'p50 ms':>12}{'p95 ms':>12}{'p99 ms':>12}{'max ms':>12}"
+    ]
+    for stage, row in report["stages"].items():
+        lines.append(
+            f"{stage:<24}{row['count']:>8}{row['p50_ms']:>12.1f}{row['p95_ms']:>12.1f}"
+            f"{row['p99_ms']:>12.1f}{row['max_ms']:>12.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the MigrationGPT analysis API")
+    parser.add_argument("--url", default=os.getenv("BACKEND_URL", "http://localhost:8000"))
+    parser.add_argument("--file", required=True, help="infrastructure file to submit")
+    parser.add_argument("--rps", type=float, default=2.0, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to generate load")
+    parser.add_argument("--target-cloud", default="aws")
+    parser.add_argument("--narrative", action="store_true", help="also stream each AI narrative")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--allow-cache", action="store_true", help="send identical payloads")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    generator = LoadGenerator(
+        args.url, args.file, args.rps, args.duration,
+        target_cloud=args.target_cloud, narrative=args.narrative, timeout=args.timeout,
+        bust_cache=not args.allow_cache
+    )
+    report = asyncio.run(generator.run())
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+Benchmark suite: synthetic estates and codebases through the pipeline, the
+API and CodeAnalyzer, with a regression check against a stored baseline.
+
+Each scenario runs in a fresh interpreter, so peak RSS is that scenario's
+own. Pipeline stages are timed through the profiler spans that
+pipeline.stage() records; the end-to-end time is POST /api/analyze through
+an in-process ASGI client, so no server or network is involved:
+
+    python -m benchmarks.suite --sizes 10,1000,100000 --output results.json
+    python -m benchmarks.suite --baseline baseline.json   # exits 1 on regression
+    python -m benchmarks.suite --save-baseline baseline.json
+
+Generated inputs are kept in --data-dir and reused across runs.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import logging
+import platform
+import argparse
+import statistics
+import subprocess
+import tempfile
+from typing import Dict, List, Optional
+
+from .synthetic import FORMATS, generate_codebase, generate_estate
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+DEFAULT_SIZES = (10, 1000, 100000)
+DEFAULT_CODE_SIZES = (100, 1000)
+# Absolute slack so millisecond-scale stages do not flag on scheduler noise
+MIN_REGRESSION_SECONDS = 0.005
+
+# The child process runs against throwaway stores, memory-only caches and
+# instant demo responses unless the caller says otherwise
+CHILD_ENVIRONMENT = {
+    "DEMO_MODE": "true",
+    "DEMO_LATENCY_MS": "0",
+    "RESULT_CACHE_BACKEND": "memory",
+    "AI_CACHE_BACKEND": "memory",
+    "MAX_UPLOAD_SIZE": "4GB",
+    "PROFILING_ENABLED": "false",
+    "LOG_LEVEL": "WARNING"
+}
+
+
+def peak_rss_bytes() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) * scale
+
+
+def summarize_timings(samples: List[float]) -> Dict:
+    return {
+        "min": round(min(samples), 6),
+        "median": round(statistics.median(samples), 6),
+        "max": round(max(samples), 6),
+        "runs": len(samples)
+    }
+
+
+def scenario_name(kind: str, fmt: str, size: int) -> str:
+    return f"{kind}/{fmt}/{size}"
+
+
+def prepare_input(data_dir: str, kind: str, fmt: str, size: int, seed: int) -> str:
+    os.makedirs(data_dir, exist_ok=True)
+    if kind == "code":
+        path = os.path.join(data_dir, f"codebase-{size}-{seed}")
+        if not os.path.isdir(path):
+            staging = tempfile.mkdtemp(prefix="codebase-", dir=data_dir)
+            generate_codebase(staging, size, seed)
+            os.replace(staging, path)
+        return path
+
+    path = os.path.join(data_dir, f"{fmt}-{size}-{seed}{FORMATS[fmt]}")
+    if not os.path.exists(path):
+        generate_estate(fmt, size, path + ".partial", seed)
+        os.replace(path + ".partial", path)
+    return path
+
+
+# --- child process -------------------------------------------------------
+
+def run_pipeline_scenario(path: str, repeat: int, api: bool) -> Dict:
+    from pipeline import run_analysis
+    from utils.profiling import PipelineProfiler
+
+    stage_samples: Dict[str, List[float]] = {}
+    total_samples = []
+    resources = 0
+
+    for _ in range(repeat):
+        # Spans only; one stack sample a second is noise-free
+        profiler = PipelineProfiler(interval_ms=1000, trace_allocations=False).start()
+        start = time.perf_counter()
+        with profiler.attach():
+            result = run_analysis(path)
+        total_samples.append(time.perf_counter() - start)
+        report = profiler.stop()
+        for span in report["spans"]:
+            stage_samples.setdefault(span["name"], []).append(span["duration_seconds"])
+        resources = result["infra_results"].get("total_resources", 0)
+
+    timings = {stage: summarize_timings(samples) for stage, samples in stage_samples.items()}
+    timings["pipeline"] = summarize_timings(total_samples)
+    if api:
+        timings["api"] = summarize_timings(asyncio.run(time_api(path, repeat)))
+
+    return {"resources": resources, "input_bytes": os.path.getsize(path), "timings": timings}
+
+
+async def time_api(path: str, repeat: int) -> List[float]:
+    import httpx
+    from main import app
+
+    samples = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        for _ in range(repeat):
+            # A unique compliance tag keeps the result cache from answering
+            params = {"compliance_requirements": f"benchmark-{uuid.uuid4().hex}"}
+            with open(path, "rb") as f:
+                start = time.perf_counter()
+                response = await client.post("/api/analyze", params=params,
+                                             files={"file": (os.path.basename(path), f)})
+                samples.append(time.perf_counter() - start)
+            response.raise_for_status()
+    return samples
+
+
+def run_code_scenario(path: str, repeat: int) -> Dict:
+    from analyzers.code_analyzer import CodeAnalyzer
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = CodeAnalyzer().analyze_codebase(path)
+        samples.append(time.perf_counter() - start)
+
+    return {
+        "files": result["total_files"],
+        "lines_of_code": result["complexity_metrics"]["total_lines_of_code"],
+        "timings": {"analyze_codebase": summarize_timings(samples)}
+    }
+
+
+def run_child(spec: Dict) -> Dict:
+    for key, value in CHILD_ENVIRONMENT.items():
+        os.environ.setdefault(key, value)
+    scratch = tempfile.mkdtemp(prefix="migrationgpt-bench-")
+    os.environ.setdefault("ANALYSIS_STORE_DIR", os.path.join(scratch, "analyses"))
+    os.environ.setdefault("UPLOAD_DIR", os.path.join(scratch, "uploads"))
+    logging.basicConfig(level=os.environ["LOG_LEVEL"])
+    logging.getLogger().setLevel(os.environ["LOG_LEVEL"])
+
+    if spec["kind"] == "code":
+        result = run_code_scenario(spec["path"], spec["repeat"])
+    else:
+        result = run_pipeline_scenario(spec["path"], spec["repeat"], spec["api"])
+    result["peak_rss_bytes"] = peak_rss_bytes()
+    return result
+
+
+# --- parent process ------------------------------------------------------
+
+def run_scenario(spec: Dict, timeout: Optional[float]) -> Dict:
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [backend_dir, os.getenv("PYTHONPATH")])))
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.suite", "--child", json.dumps(spec)],
+        cwd=backend_dir, env=env, capture_output=True, text=True, timeout=timeout
+    )
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else
+                f"exit status {completed.returncode}"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def environment() -> Dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    }
+
+
+def run_suite(formats: List[str], sizes: List[int], code_sizes: List[int], repeat: int,
+              data_dir: str, seed: int = 0, api: bool = True, timeout: Optional[float] = None) -> Dict:
+    plan = [("pipeline", fmt, size) for fmt in formats for size in sizes]
+    plan += [("code", "polyglot", size) for size in code_sizes]
+    scenarios = {}
+
+    for kind, fmt, size in plan:
+        name = scenario_name(kind, fmt, size)
+        print(f"{name}: generating", file=sys.stderr, flush=True)
+        path = prepare_input(data_dir, kind, fmt, size, seed)
+        print(f"{name}: running x{repeat}", file=sys.stderr, flush=True)
+        spec = {"kind": kind, "path": path, "repeat": repeat, "api": api}
+        try:
+            result = run_scenario(spec, timeout)
+        except subprocess.TimeoutExpired:
+            result = {"error": f"timed out after {timeout}s"}
+        scenarios[name] = dict(result, kind=kind, format=fmt, size=size)
+
+    return {"schema": SCHEMA_VERSION, "environment": environment(), "scenarios": scenarios}
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float, rss_tolerance: float) -> List[Dict]:
+    """
+    Per scenario and metric, the change against the baseline; a row
+    regresses when the median time grows by more than `tolerance` (and by
+    more than MIN_REGRESSION_SECONDS) or peak RSS by more than
+    `rss_tolerance`
+    """
+    rows = []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None or "error" in current or "error" in previous:
+            continue
+
+        for metric, timing in current.get("timings", {}).items():
+            before = previous.get("timings", {}).get(metric)
+            if before is None:
+                continue
+            now, then = timing["median"], before["median"]
+            rows.append({
+                "scenario": name, "metric": metric, "baseline": then, "current": now,
+                "change": round(now / then - 1, 4) if then else None,
+                "regression": now > then * (1 + tolerance) and now - then > MIN_REGRESSION_SECONDS
+            })
+
+        now, then = current.get("peak_rss_bytes"), previous.get("peak_rss_bytes")
+        if now and then:
+            rows.append({
+                "scenario": name, "metric": "peak_rss_bytes", "baseline": then, "current": now,
+                "change": round(now / then - 1, 4), "regression": now > then * (1 + rss_tolerance)
+            })
+    return rows
+
+
+def format_results(results: Dict, rows: Optional[List[Dict]] = None) -> str:
+    lines = [f"{'scenario':<34}{'metric':<20}{'median s':>12}{'max s':>12}"]
+    for name, scenario in results["scenarios"].items():
+        if "error" in scenario:
+            lines.append(f"{name:<34}error: {scenario['error']}")
+            continue
+        for metric, timing in scenario["timings"].items():
+            lines.append(f"{name:<34}{metric:<20}{timing['median']:>12.4f}{timing['max']:>12.4f}")
+        if scenario.get("peak_rss_bytes"):
+            lines.append(f"{name:<34}{'peak_rss_mib':<20}{scenario['peak_rss_bytes'] / 2 ** 20:>12.1f}")
+
+    if rows is not None:
+        regressions = [row for row in rows if row["regression"]]
+        lines.append("")
+        lines.append(f"{len(rows)} metrics compared with the baseline, {len(regressions)} regressed")
+        for row in regressions:
+            lines.append(f"  REGRESSION {row['scenario']} {row['metric']}: "
+                         f"{row['baseline']} -> {row['current']} ({row['change']:+.1%})")
+    return "\n".join(lines)
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MigrationGPT benchmark suite")
+    parser.add_argument("--formats", default=",".join(FORMATS),
+                        help=f"comma-separated estate formats ({', '.join(FORMATS)})")
+    parser.add_argument("--sizes", type=_int_list, default=list(DEFAULT_SIZES),
+                        help="comma-separated resource counts (up to 1000000)")
+    parser.add_argument("--code-sizes", type=_int_list, default=list(DEFAULT_CODE_SIZES),
+                        help="comma-separated source file counts for CodeAnalyzer; empty to skip")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-api", action="store_true", help="skip the end-to-end API timing")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "migrationgpt-bench"))
+    parser.add_argument("--timeout", type=float, default=None, help="seconds allowed per scenario")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="compare against this results JSON; exit 1 on regression")
+    parser.add_argument("--save-baseline", help="write results JSON here for later comparison")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed median time growth")
+    parser.add_argument("--rss-tolerance", type=float, default=0.2, help="allowed peak RSS growth")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(json.loads(args.child))))
+        return
+
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        parser.error(f"unknown formats: {', '.join(sorted(unknown))}")
+
+    results = run_suite(formats, args.sizes, args.code_sizes, args.repeat, args.data_dir,
+                        seed=args.seed, api=not args.no_api, timeout=args.timeout)
+
+    rows = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            rows = compare(results, json.load(f), args.tolerance, args.rss_tolerance)
+        results["comparison"] = {"baseline": args.baseline, "tolerance": args.tolerance,
+                                 "rss_tolerance": args.rss_tolerance, "rows": rows}
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+
+    print(json.dumps(results, indent=2) if args.json else format_results(results, rows))
+    failed = any("error" in scenario for scenario in results["scenarios"].values())
+    if failed or (rows and any(row["regression"] for row in rows)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
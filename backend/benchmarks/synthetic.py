@@ -0,0 +1,311 @@
+"""
+Synthetic infrastructure estates and codebases for benchmarking.
+
+Every generator is seeded, so the same arguments always produce the same
+bytes, and writes as it goes, so a million-resource estate never has to be
+held in memory. The resource mix covers the types the classifier and the
+default security rules know about, with a share of deliberately insecure
+settings so the scanner has findings to report:
+
+    python -m benchmarks.synthetic terraform 100000 /tmp/estate.tf
+    python -m benchmarks.synthetic codebase 5000 /tmp/monorepo
+"""
+import os
+import json
+import random
+import argparse
+from typing import Callable, Dict, List, TextIO, Tuple
+
+FORMATS = {
+    "terraform": ".tf",
+    "cloudformation": ".json",
+    "cloudformation-yaml": ".yaml",
+    "kubernetes": ".yaml"
+}
+
+INSTANCE_TYPES = ("t3.micro", "t3.medium", "m5.large", "m5.xlarge", "c5.2xlarge", "r5.large")
+DB_ENGINES = ("mysql", "postgres", "sqlserver-se", "oracle-se2")
+RUNTIMES = ("python3.11", "nodejs18.x", "java17", "dotnet6")
+ENVIRONMENTS = ("production", "staging", "development")
+IMAGES = ("nginx:1.25", "redis:7", "postgres:15", "company/api:2.3.1", "company/worker:2.3.1")
+
+
+def _tags(rng: random.Random, index: int) -> Dict:
+    return {"Name": f"resource-{index}", "Environment": rng.choice(ENVIRONMENTS), "Team": f"team-{index % 17}"}
+
+
+def _instance(rng: random.Random, index: int) -> Dict:
+    return {
+        "ami": f"ami-{rng.getrandbits(32):08x}",
+        "instance_type": rng.choice(INSTANCE_TYPES),
+        "associate_public_ip_address": rng.random() < 0.3,
+        "tags": _tags(rng, index)
+    }
+
+
+def _database(rng: random.Random, index: int) -> Dict:
+    return {
+        "identifier": f"db-{index}",
+        "engine": rng.choice(DB_ENGINES),
+        "instance_class": "db." + rng.choice(INSTANCE_TYPES),
+        "allocated_storage": rng.choice((20, 100, 500, 1000)),
+        "storage_encrypted": rng.random() < 0.7,
+        "publicly_accessible": rng.random() < 0.1,
+        "tags": _tags(rng, index)
+    }
+
+
+def _bucket(rng: random.Random, index: int) -> Dict:
+    return {"bucket": f"bucket-{index}-{rng.getrandbits(24):06x}",
+            "acl": "public-read" if rng.random() < 0.15 else "private", "tags": _tags(rng, index)}
+
+
+def _security_group(rng: random.Random, index: int) -> Dict:
+    return {"name": f"sg-{index}", "description": "Managed by synthetic benchmark", "vpc_id": f"vpc-{index % 50}"}
+
+
+def _listener(rng: random.Random, index: int) -> Dict:
+    protocol = rng.choice(("HTTP", "HTTPS", "HTTPS"))
+    return {"load_balancer_arn": f"arn:aws:elasticloadbalancing:us-east-1:123456789012:loadbalancer/app/lb-{index}",
+            "port": 80 if protocol == "HTTP" else 443, "protocol": protocol}
+
+
+def _function(rng: random.Random, index: int) -> Dict:
+    return {"function_name": f"fn-{index}", "runtime": rng.choice(RUNTIMES),
+            "memory_size": rng.choice((128, 256, 512, 1024)), "timeout": rng.choice((3, 30, 300))}
+
+
+def _subnet(rng: random.Random, index: int) -> Dict:
+    return {"vpc_id": f"vpc-{index % 50}", "cidr_block": f"10.{index // 256 % 256}.{index % 256}.0/24",
+            "map_public_ip_on_launch": rng.random() < 0.25}
+
+
+def _table(rng: random.Random, index: int) -> Dict:
+    return {"name": f"table-{index}", "billing_mode": rng.choice(("PAY_PER_REQUEST", "PROVISIONED")),
+            "hash_key": "id"}
+
+
+# (Terraform type, CloudFormation type, properties, relative weight)
+RESOURCE_MIX: List[Tuple[str, str, Callable[[random.Random, int], Dict], int]] = [
+    ("aws_instance", "AWS::EC2::Instance", _instance, 25),
+    ("aws_db_instance", "AWS::RDS::DBInstance", _database, 8),
+    ("aws_s3_bucket", "AWS::S3::Bucket", _bucket, 15),
+    ("aws_security_group", "AWS::EC2::SecurityGroup", _security_group, 15),
+    ("aws_lb_listener", "AWS::ElasticLoadBalancingV2::Listener", _listener, 7),
+    ("aws_lambda_function", "AWS::Lambda::Function", _function, 12),
+    ("aws_subnet", "AWS::EC2::Subnet", _subnet, 12),
+    ("aws_dynamodb_table", "AWS::DynamoDB::Table", _table, 6),
+]
+_WEIGHTS = [weight for _, _, _, weight in RESOURCE_MIX]
+
+
+def iter_resources(count: int, seed: int = 0):
+    """
+    Yield (terraform_type, cloudformation_type, name, properties) for a
+    seeded resource mix
+    """
+    rng = random.Random(seed)
+    for index in range(count):
+        tf_type, cfn_type, properties, _ = rng.choices(RESOURCE_MIX, weights=_WEIGHTS)[0]
+        yield tf_type, cfn_type, f"r{index}", properties(rng, index)
+
+
+def _camel(key: str) -> str:
+    return "".join(part[:1].upper() + part[1:] for part in key.split("_"))
+
+
+def _cfn_properties(properties: Dict) -> Dict:
+    converted = {}
+    for key, value in properties.items():
+        if key == "tags":
+            value = [{"Key": k, "Value": v} for k, v in value.items()]
+        converted[_camel(key)] = value
+    return converted
+
+
+def _hcl_value(value) -> str:
+    # JSON scalars are valid HCL literals
+    return json.dumps(value)
+
+
+def write_terraform(out: TextIO, count: int, seed: int = 0):
+    out.write('provider "aws" {\n  region = "us-east-1"\n}\n\n')
+    for tf_type, _, name, properties in iter_resources(count, seed):
+        out.write(f'resource "{tf_type}" "{name}" {{\n')
+        for key, value in properties.items():
+            if isinstance(value, dict):
+                out.write(f"  {key} = {{\n")
+                for inner_key, inner_value in value.items():
+                    out.write(f"    {inner_key} = {_hcl_value(inner_value)}\n")
+                out.write("  }\n")
+            else:
+                out.write(f"  {key} = {_hcl_value(value)}\n")
+        out.write("}\n\n")
+
+
+def write_cloudformation(out: TextIO, count: int, seed: int = 0):
+    out.write('{\n  "AWSTemplateFormatVersion": "2010-09-09",\n')
+    out.write('  "Description": "Synthetic benchmark estate",\n  "Resources": {')
+    for position, (_, cfn_type, name, properties) in enumerate(iter_resources(count, seed)):
+        body = json.dumps({"Type": cfn_type, "Properties": _cfn_properties(properties)})
+        out.write(f'{"," if position else ""}\n    "{name}": {body}')
+    out.write("\n  }\n}\n")
+
+
+def write_cloudformation_yaml(out: TextIO, count: int, seed: int = 0):
+    out.write("AWSTemplateFormatVersion: '2010-09-09'\nDescription: Synthetic benchmark estate\n")
+    out.write("Parameters:\n  Environment:\n    Type: String\nResources:\n")
+    for _, cfn_type, name, properties in iter_resources(count, seed):
+        out.write(f"  {name}:\n    Type: {cfn_type}\n    Properties:\n")
+        for key, value in _cfn_properties(properties).items():
+            if key == "Tags":
+                out.write("      Tags:\n")
+                for tag in value:
+                    out.write(f"        - Key: {tag['Key']}\n")
+                    if tag["Key"] == "Environment":
+                        out.write("          Value: !Ref Environment\n")
+                    else:
+                        out.write(f"          Value: {json.dumps(tag['Value'])}\n")
+            else:
+                out.write(f"      {key}: {json.dumps(value)}\n")
+
+
+def _kubernetes_object(rng: random.Random, index: int) -> Dict:
+    namespace = f"team-{index % 17}"
+    name = f"app-{index}"
+    labels = {"app": name, "tier": rng.choice(("web", "api", "worker"))}
+    kind = rng.choices(("Deployment", "Service", "ConfigMap", "Secret", "StatefulSet", "Ingress"),
+                       weights=(30, 25, 20, 10, 8, 7))[0]
+    obj = {"apiVersion": "v1", "kind": kind,
+           "metadata": {"name": name, "namespace": namespace, "labels": labels}}
+
+    if kind in ("Deployment", "StatefulSet"):
+        obj["apiVersion"] = "apps/v1"
+        obj["spec"] = {
+            "replicas": rng.choice((1, 2, 3, 5)),
+            "selector": {"matchLabels": labels},
+            "template": {"metadata": {"labels": labels}, "spec": {"containers": [{
+                "name": "main",
+                "image": rng.choice(IMAGES),
+                "resources": {"requests": {"cpu": rng.choice(("100m", "250m", "1")),
+                                           "memory": rng.choice(("128Mi", "512Mi", "2Gi"))}},
+                "securityContext": {"privileged": rng.random() < 0.05}
+            }]}}
+        }
+    elif kind == "Service":
+        obj["spec"] = {"selector": labels, "type": rng.choice(("ClusterIP", "ClusterIP", "LoadBalancer")),
+                       "ports": [{"port": 80, "targetPort": 8080}]}
+    elif kind == "Ingress":
+        obj["apiVersion"] = "networking.k8s.io/v1"
+        obj["spec"] = {"rules": [{"host": f"{name}.example.com"}]}
+    else:
+        obj["data"] = {f"key{n}": f"value-{rng.getrandbits(32):08x}" for n in range(rng.randint(1, 5))}
+    return obj
+
+
+def write_kubernetes(out: TextIO, count: int, seed: int = 0):
+    rng = random.Random(seed)
+    for index in range(count):
+        # Flow-style JSON is a valid YAML document and much faster to emit
+        out.write("---\n")
+        out.write(json.dumps(_kubernetes_object(rng, index)))
+        out.write("\n")
+
+
+WRITERS = {
+    "terraform": write_terraform,
+    "cloudformation": write_cloudformation,
+    "cloudformation-yaml": write_cloudformation_yaml,
+    "kubernetes": write_kubernetes
+}
+
+
+def generate_estate(fmt: str, count: int, path: str, seed: int = 0) -> str:
+    """
+    Write a synthetic estate of `count` resources in one of FORMATS
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {', '.join(WRITERS)}")
+    with open(path, "w", buffering=1024 * 1024) as out:
+        WRITERS[fmt](out, count, seed)
+    return path
+
+
+# Extension, function template and branch statement per language
+CODE_LANGUAGES = {
+    ".py": ("def handler_{n}(value):\n{body}    return value\n\n", "    if value == {k}:\n        value += {k}\n"),
+    ".js": ("function handler{n}(value) {{\n{body}  return value;\n}}\n\n",
+            "  if (value === {k} && value > 0) {{ value += {k}; }}\n"),
+    ".ts": ("export function handler{n}(value: number): number {{\n{body}  return value;\n}}\n\n",
+            "  if (value === {k}) {{ value += {k}; }}\n"),
+    ".java": ("    public int handler{n}(int value) {{\n{body}        return value;\n    }}\n\n",
+              "        if (value == {k}) {{ value += {k}; }}\n"),
+    ".cs": ("    public int Handler{n}(int value) {{\n{body}        return value;\n    }}\n\n",
+            "        if (value == {k}) {{ value += {k}; }}\n"),
+}
+CLASS_WRAPPERS = {".java": "public class Module{n} {{\n{body}}}\n", ".cs": "public class Module{n} {{\n{body}}}\n"}
+FILES_PER_SERVICE = 200
+
+
+def _source_file(rng: random.Random, extension: str, index: int) -> str:
+    function_template, branch_template = CODE_LANGUAGES[extension]
+    functions = []
+    for n in range(rng.randint(1, 12)):
+        # Mostly simple functions with a long tail of very branchy ones
+        branches = min(int(rng.paretovariate(1.2)), 60)
+        body = "".join(branch_template.format(k=k) for k in range(branches))
+        functions.append(function_template.format(n=n, body=body))
+    source = "".join(functions)
+    if extension in CLASS_WRAPPERS:
+        source = CLASS_WRAPPERS[extension].format(n=index, body=source)
+    return source
+
+
+def generate_codebase(directory: str, files: int, seed: int = 0) -> str:
+    """
+    Write a polyglot monorepo of `files` source files, split into services
+    that each carry a dependency manifest
+    """
+    rng = random.Random(seed)
+    extensions = list(CODE_LANGUAGES)
+
+    for index in range(files):
+        service_dir = os.path.join(directory, f"service-{index // FILES_PER_SERVICE}")
+        if index % FILES_PER_SERVICE == 0:
+            os.makedirs(os.path.join(service_dir, "src"), exist_ok=True)
+            _write_manifests(rng, service_dir)
+        extension = rng.choice(extensions)
+        path = os.path.join(service_dir, "src", f"module_{index}{extension}")
+        with open(path, "w") as out:
+            out.write(_source_file(rng, extension, index))
+    return directory
+
+
+def _write_manifests(rng: random.Random, service_dir: str):
+    with open(os.path.join(service_dir, "requirements.txt"), "w") as out:
+        for package in rng.sample(("django==4.2.7", "flask==3.0.0", "boto3>=1.28", "pandas==2.1.0",
+                                    "psycopg2-binary==2.9.9", "requests", "pytest==7.4.0"), 4):
+            out.write(package + "\n")
+    with open(os.path.join(service_dir, "package.json"), "w") as out:
+        json.dump({"name": os.path.basename(service_dir),
+                   "dependencies": {"express": "^4.18.2", "react": "18.2.0", "pg": "^8.11.0"},
+                   "devDependencies": {"jest": "^29.0.0"}}, out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic estates and codebases")
+    parser.add_argument("kind", choices=sorted(FORMATS) + ["codebase"])
+    parser.add_argument("count", type=int, help="resources, or source files for a codebase")
+    parser.add_argument("path", help="output file, or directory for a codebase")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.kind == "codebase":
+        generate_codebase(args.path, args.count, args.seed)
+    else:
+        generate_estate(args.kind, args.count, args.path, args.seed)
+    print(args.path)
+
+
+if __name__ == "__main__":
+    main()
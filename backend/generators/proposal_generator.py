@@ -1,15 +1,10 @@
 import logging
-from typing import Dict
+from typing import Dict, List
 from datetime import datetime
-import os
 
 logger = logging.getLogger(__name__)
 
 class ProposalGenerator:
-    def __init__(self):
-        self.output_dir = "/tmp/proposals"
-        os.makedirs(self.output_dir, exist_ok=True)
-    
     def generate_proposal(self, project_name: str, analysis_data: Dict) -> Dict:
         logger.info(f"Generating proposal for project: {project_name}")
         
@@ -1,19 +1,30 @@
 import logging
-from typing import Dict
+from typing import Dict, List, Tuple
 from datetime import datetime
 import os
 
+from utils.metrics import stage_timer
+from utils.prompt_batcher import group_findings
+
 logger = logging.getLogger(__name__)
 
 class ReportGenerator:
     def __init__(self):
         self.output_dir = "/tmp/reports"
+    
+    def output_path(self, filename: str) -> str:
+        """
+        Path under output_dir, created on first write rather than at
+        construction so building the generator touches no disk
+        """
         os.makedirs(self.output_dir, exist_ok=True)
+        return os.path.join(self.output_dir, filename)
     
+    @stage_timer("report")
     def generate_pdf(self, analysis_id: str, analysis_data: Dict) -> str:
         logger.info(f"Generating PDF report for analysis {analysis_id}")
         
-        report_path = os.path.join(self.output_dir, f"{analysis_id}_report.pdf")
+        report_path = self.output_path(f"{analysis_id}_report.pdf")
         
         try:
             from reportlab.lib.pagesizes import letter
@@ -81,9 +92,46 @@ class ReportGenerator:
             "Implement infrastructure as code, adopt managed services, and establish continuous monitoring."
         )
     
+    def narrative_sections(self, data: Dict) -> List[Tuple[str, str, List[Dict]]]:
+        """
+        (section, instruction, items) for each AI-written narrative section
+        of the report, in report order
+        """
+        security = data.get("security_assessment") or {}
+        cost = data.get("cost_estimate") or {}
+        architecture = data.get("architecture_recommendations") or {}
+        plan = data.get("migration_plan") or {}
+        
+        cost_overview = {k: v for k, v in cost.items() if k != "optimization_opportunities"}
+        target_architecture = [
+            dict(item, category=category)
+            for category, items in (architecture.get("target_architecture") or {}).items()
+            for item in items
+        ]
+        
+        return [
+            ("security",
+             f"Write the security section of a cloud migration assessment report "
+             f"(risk score {security.get('risk_score', 0)}). Findings",
+             group_findings(security.get("findings", []))),
+            ("cost",
+             f"Write the cost section of a cloud migration assessment report for {cost_overview}. "
+             f"Optimization opportunities",
+             cost.get("optimization_opportunities", [])),
+            ("architecture",
+             f"Write the target architecture section of a cloud migration assessment report "
+             f"for {data.get('target_cloud', 'aws')}. Service mappings",
+             target_architecture),
+            ("migration",
+             f"Write the migration plan section of a cloud migration assessment report "
+             f"({plan.get('complexity', 'medium')} complexity, {plan.get('timeline_weeks', 0)} weeks). Phases",
+             plan.get("phases", []))
+        ]
+    
+    @stage_timer("report")
     def generate_json(self, analysis_id: str, analysis_data: Dict) -> str:
         import json
-        json_path = os.path.join(self.output_dir, f"{analysis_id}_report.json")
+        json_path = self.output_path(f"{analysis_id}_report.json")
         
         try:
             with open(json_path, 'w') as f:
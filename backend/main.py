@@ -1,23 +1,36 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Body
+from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Body, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse, Response, PlainTextResponse
+from starlette.concurrency import iterate_in_threadpool
+from starlette.datastructures import Headers
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 import os
 import uuid
 from datetime import datetime
 import logging
-import tempfile
-
-from agents.security_agent import SecurityAgent
-from agents.cost_agent import CostAgent
-from agents.architecture_agent import ArchitectureAgent
-from agents.migration_agent import MigrationAgent
-from analyzers.infrastructure_analyzer import InfrastructureAnalyzer
-from analyzers.code_analyzer import CodeAnalyzer
-from analyzers.security_scanner import SecurityScanner
-from generators.report_generator import ReportGenerator
-from generators.proposal_generator import ProposalGenerator
+import asyncio
+import json
+import threading
+from contextlib import nullcontext
+from concurrent.futures import Future
+
+from pipeline import (
+    RESULT_KEYS, RETARGET_INPUTS, UnsupportedCloudError, parse_target_clouds, run_analysis,
+    retarget_analysis, iter_stage_events, summarize
+)
+from pipeline_backend import create_pipeline_backend
+from registry import get_registry
+from utils.job_store import AnalysisStore, AnalysisJobQueue, QueueFullError
+from utils.result_cache import ResultCache
+from utils.ai_client import get_ai_client, shared_cache_stats
+from utils.uploads import UploadSpooler, UploadTooLargeError
+from utils.serialization import json_default
+from utils.metrics import (
+    ANALYSES, INPUT_BYTES, cache_stats, file_type_label, render_latest, track_analysis
+)
+from utils.profiling import ProfilePolicy
+from utils.task_context import PipelineCancelledError
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -36,11 +49,58 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+analysis_store = AnalysisStore()
+pipeline_backend = create_pipeline_backend()
+job_queue = AnalysisJobQueue(analysis_store, max_workers=pipeline_backend.concurrency)
+result_cache = ResultCache()
+upload_spooler = UploadSpooler()
+profile_policy = ProfilePolicy()
+
+cache_stats.register("result", result_cache.stats)
+# Scrapes must not build the client (and its Bedrock session) just to report zeros
+cache_stats.register("ai", shared_cache_stats)
+
+# Multipart framing allowance on top of the file size limit when rejecting
+# oversized requests by their Content-Length
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+# How often a waiting request checks whether its client is still there
+DISCONNECT_POLL_SECONDS = 0.5
+
+class RejectOversizedUploads:
+    """
+    Plain ASGI rather than @app.middleware("http"), whose wrapped receive
+    hides client disconnects from the endpoints that cancel on them
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "POST":
+            headers = Headers(scope=scope)
+            length = headers.get("content-length", "")
+            if (length.isdigit() and headers.get("content-type", "").startswith("multipart/form-data")
+                    and int(length) > upload_spooler.max_bytes + MULTIPART_OVERHEAD_BYTES):
+                response = JSONResponse(
+                    status_code=413,
+                    content={"detail": str(UploadTooLargeError(upload_spooler.max_bytes))}
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+app.add_middleware(RejectOversizedUploads)
+
+@app.exception_handler(UploadTooLargeError)
+async def upload_too_large(request: Request, exc: UploadTooLargeError):
+    return JSONResponse(status_code=413, content={"detail": str(exc)})
+
 class GitHubAnalysisRequest(BaseModel):
     github_url: Optional[str] = None
     project_name: str
     file_content: str
     target_cloud: str = "aws"
+    compliance_requirements: Optional[List[str]] = []
 
 class AnalysisRequest(BaseModel):
     project_name: str
@@ -54,6 +114,16 @@ class AnalysisResponse(BaseModel):
     findings_count: int
     estimated_cost: float
     timeline_weeks: int
+    cached: bool = False
+    profiled: bool = False
+
+class RetargetRequest(BaseModel):
+    target_cloud: str
+
+class AnalysisSubmission(BaseModel):
+    analysis_id: str
+    status: str
+    profiled: bool = False
 
 @app.get("/")
 async def root():
@@ -71,91 +141,415 @@ async def health_check():
         "timestamp": datetime.utcnow().isoformat()
     }
 
+async def receive_input(analysis_id: str, request: Optional[GitHubAnalysisRequest],
+                        file: Optional[UploadFile], project_name: Optional[str], target_cloud: str,
+                        compliance_requirements: Optional[List[str]]) -> Dict:
+    if request and request.file_content:
+        staged = upload_spooler.spool_text(request.file_content)
+        return dict(staged, filename=None, project_name=request.project_name,
+                    target_cloud=request.target_cloud,
+                    compliance_requirements=request.compliance_requirements or [])
+    elif file:
+        staged = await upload_spooler.spool_upload(analysis_id, file)
+        return dict(staged, filename=file.filename, project_name=project_name,
+                    target_cloud=target_cloud, compliance_requirements=compliance_requirements or [])
+    else:
+        raise HTTPException(status_code=400, detail="No file provided")
+
+def discard_input(job: Dict):
+    """
+    Remove a staged input whose analysis will not run; the spooled upload
+    is only kept for analyses that were accepted
+    """
+    upload_spooler.discard(job["path"])
+
+def validate_target_cloud(target_cloud: str):
+    try:
+        parse_target_clouds(target_cloud)
+    except UnsupportedCloudError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def register_analysis(request: Optional[GitHubAnalysisRequest], file: Optional[UploadFile],
+                            project_name: Optional[str], target_cloud: str,
+                            compliance_requirements: Optional[List[str]] = None) -> Dict:
+    analysis_id = str(uuid.uuid4())
+    job = await receive_input(analysis_id, request, file, project_name, target_cloud, compliance_requirements)
+    try:
+        validate_target_cloud(job["target_cloud"])
+    except HTTPException:
+        discard_input(job)
+        raise
+    
+    file_kind = os.path.basename(job["filename"] or ".tf").lower().partition(".")[2]
+    
+    analysis_store.create(
+        analysis_id, job["project_name"], job["target_cloud"],
+        input_digest=job["sha256"], input_bytes=job["size"], file_kind=file_kind,
+        compliance_requirements=job["compliance_requirements"]
+    )
+    
+    job["analysis_id"] = analysis_id
+    job["file_type"] = file_type_label(job["filename"] or ".tf")
+    INPUT_BYTES.labels(file_type=job["file_type"]).observe(job["size"])
+    job["cache_key"] = result_cache.make_key(
+        job["sha256"], file_kind, job["target_cloud"], job["compliance_requirements"]
+    )
+    return job
+
+def run_tracked_analysis(analysis_id: str, file_type: str, profile: bool, *args) -> Dict:
+    with track_analysis(file_type):
+        profiler = pipeline_backend.new_profiler().start() if profile else None
+        try:
+            return pipeline_backend.run(analysis_id, run_analysis, *args, profiler=profiler)
+        finally:
+            if profiler is not None:
+                analysis_store.save_profile(analysis_id, profiler.stop())
+
+def cancel_analysis(analysis_id: str):
+    if not job_queue.cancel(analysis_id):
+        pipeline_backend.cancel(analysis_id)
+
+async def await_analysis(http_request: Request, analysis_id: str, future: Future) -> Dict:
+    """
+    Wait for a queued analysis, cancelling it if the client disconnects
+    """
+    waiter = asyncio.wrap_future(future)
+    while True:
+        done, _ = await asyncio.wait({waiter}, timeout=DISCONNECT_POLL_SECONDS)
+        if done:
+            return waiter.result()
+        if await http_request.is_disconnected():
+            logger.info(f"Client disconnected, cancelling analysis {analysis_id}")
+            cancel_analysis(analysis_id)
+            waiter.cancel()
+            raise HTTPException(status_code=499, detail="Client closed request")
+
+async def watch_disconnect(http_request: Request, disconnected: threading.Event):
+    while not disconnected.is_set():
+        if await http_request.is_disconnected():
+            disconnected.set()
+            return
+        await asyncio.sleep(DISCONNECT_POLL_SECONDS)
+
+def cached_result(job: Dict) -> Optional[Dict]:
+    cached = result_cache.get(job["cache_key"])
+    if cached is None:
+        return None
+    
+    ANALYSES.labels(file_type=job["file_type"], outcome="cached").inc()
+    logger.info(f"Serving analysis {job['analysis_id']} for {job['project_name']} from cache")
+    return dict(cached, project_name=job["project_name"])
+
+async def enqueue_analysis(background_tasks: BackgroundTasks, request: Optional[GitHubAnalysisRequest],
+                           file: Optional[UploadFile], project_name: Optional[str], target_cloud: str,
+                           compliance_requirements: Optional[List[str]] = None, profile: bool = False):
+    job = await register_analysis(request, file, project_name, target_cloud, compliance_requirements)
+    analysis_id = job["analysis_id"]
+    
+    cached = cached_result(job)
+    if cached is not None:
+        upload_spooler.discard(job["cleanup_path"])
+        background_tasks.add_task(analysis_store.complete, analysis_id, cached, summarize(cached))
+        future = Future()
+        future.set_result(cached)
+        return analysis_id, future, True
+    
+    file_path, cleanup_path = job["path"], job["cleanup_path"]
+    logger.info(f"Queueing analysis {analysis_id} for {job['project_name']}")
+    
+    try:
+        future = job_queue.submit(
+            analysis_id,
+            run_tracked_analysis,
+            analysis_id,
+            job["file_type"],
+            profile,
+            file_path,
+            job["project_name"],
+            job["target_cloud"],
+            job["compliance_requirements"],
+            summarize=summarize,
+            cleanup_path=cleanup_path
+        )
+    except QueueFullError as e:
+        analysis_store.fail(analysis_id, str(e))
+        discard_input(job)
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    def fill_cache(done: Future):
+        if not done.cancelled() and done.exception() is None:
+            result_cache.set(job["cache_key"], done.result())
+    
+    future.add_done_callback(fill_cache)
+    return analysis_id, future, False
+
+def encode_event(event: str, payload: Dict, stream_format: str) -> str:
+    if stream_format == "sse":
+        return f"event: {event}\ndata: {json.dumps(payload, default=json_default)}\n\n"
+    return json.dumps({"event": event, "data": payload}, default=json_default) + "\n"
+
 @app.post("/api/analyze", response_model=AnalysisResponse)
 async def analyze_infrastructure(
     background_tasks: BackgroundTasks,
+    http_request: Request,
     request: GitHubAnalysisRequest = None,
     file: UploadFile = File(None),
     project_name: str = None,
-    target_cloud: str = "aws"
+    target_cloud: str = "aws",
+    compliance_requirements: Optional[List[str]] = Query(None),
+    profile: bool = False
 ):
+    profiled = profile_policy.should_profile(http_request.headers, profile)
     try:
-        analysis_id = str(uuid.uuid4())
-        
-        if request and request.file_content:
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.tf', delete=False) as tmp_file:
-                tmp_file.write(request.file_content)
-                file_path = tmp_file.name
-            project_name = request.project_name
-            target_cloud = request.target_cloud
-        elif file:
-            upload_dir = "/tmp/uploads"
-            os.makedirs(upload_dir, exist_ok=True)
-            file_path = os.path.join(upload_dir, f"{analysis_id}_{file.filename}")
-            
-            with open(file_path, "wb") as f:
-                content = await file.read()
-                f.write(content)
-        else:
-            raise HTTPException(status_code=400, detail="No file provided")
-        
-        logger.info(f"Starting analysis {analysis_id} for {project_name}")
-        
-        infra_analyzer = InfrastructureAnalyzer()
-        infra_results = infra_analyzer.analyze_file(file_path)
-        
-        security_scanner = SecurityScanner()
-        security_results = security_scanner.scan(infra_results)
-        
-        security_agent = SecurityAgent()
-        security_assessment = security_agent.assess(security_results)
-        
-        cost_agent = CostAgent()
-        cost_estimate = cost_agent.estimate(infra_results, target_cloud)
-        
-        architecture_agent = ArchitectureAgent()
-        arch_recommendations = architecture_agent.design(infra_results, target_cloud)
-        
-        migration_agent = MigrationAgent()
-        migration_plan = migration_agent.create_plan(
-            infra_results, 
-            security_assessment,
-            cost_estimate,
-            arch_recommendations
+        analysis_id, future, cached = await enqueue_analysis(
+            background_tasks, request, file, project_name, target_cloud, compliance_requirements,
+            profile=profiled
         )
+        result = await await_analysis(http_request, analysis_id, future)
         
-        if request:
-            try:
-                os.unlink(file_path)
-            except:
-                pass
-        
-        response = AnalysisResponse(
+        return AnalysisResponse(
             analysis_id=analysis_id,
             status="completed",
-            risk_score=security_assessment.get("risk_score", 0),
-            findings_count=len(security_assessment.get("findings", [])),
-            estimated_cost=cost_estimate.get("total_cost", 0),
-            timeline_weeks=migration_plan.get("timeline_weeks", 0)
+            cached=cached,
+            profiled=profiled and not cached,
+            **summarize(result)
         )
         
-        return response
-        
+    except (HTTPException, UploadTooLargeError):
+        raise
     except Exception as e:
         logger.error(f"Analysis failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/analyze/submit", response_model=AnalysisSubmission, status_code=202)
+async def submit_analysis(
+    background_tasks: BackgroundTasks,
+    http_request: Request,
+    request: GitHubAnalysisRequest = None,
+    file: UploadFile = File(None),
+    project_name: str = None,
+    target_cloud: str = "aws",
+    compliance_requirements: Optional[List[str]] = Query(None),
+    profile: bool = False
+):
+    profiled = profile_policy.should_profile(http_request.headers, profile)
+    analysis_id, _, cached = await enqueue_analysis(
+        background_tasks, request, file, project_name, target_cloud, compliance_requirements,
+        profile=profiled
+    )
+    return AnalysisSubmission(
+        analysis_id=analysis_id,
+        status="completed" if cached else "queued",
+        profiled=profiled and not cached
+    )
+
+@app.post("/api/analyze/stream")
+async def analyze_stream(
+    http_request: Request,
+    request: GitHubAnalysisRequest = None,
+    file: UploadFile = File(None),
+    project_name: str = None,
+    target_cloud: str = "aws",
+    compliance_requirements: Optional[List[str]] = Query(None),
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+    batch_size: int = Query(500, ge=1, le=10000),
+    profile: bool = False
+):
+    job = await register_analysis(request, file, project_name, target_cloud, compliance_requirements)
+    analysis_id = job["analysis_id"]
+    cached = cached_result(job)
+    
+    file_path, cleanup_path = job["path"], job["cleanup_path"]
+    if cached is not None:
+        upload_spooler.discard(cleanup_path)
+        cleanup_path = None
+    profiled = cached is None and profile_policy.should_profile(http_request.headers, profile)
+    disconnected = threading.Event()
+    
+    def event_stream():
+        profiler = None
+        result = {
+            "project_name": job["project_name"],
+            "target_cloud": job["target_cloud"],
+            "compliance_requirements": job["compliance_requirements"]
+        }
+        try:
+            yield encode_event("started", {
+                "analysis_id": analysis_id,
+                "project_name": job["project_name"],
+                "target_cloud": job["target_cloud"],
+                "cached": cached is not None,
+                "profiled": profiled
+            }, format)
+            
+            if cached is not None:
+                stages = ((key, cached[key]) for key in RESULT_KEYS if key in cached)
+                tracker = nullcontext()
+            else:
+                analysis_store.update(analysis_id, status="running", started_at=datetime.utcnow().isoformat())
+                if profiled:
+                    profiler = pipeline_backend.new_profiler().start()
+                stages = pipeline_backend.iter_analysis(
+                    analysis_id, file_path, job["target_cloud"], profiler, disconnected.is_set
+                )
+                tracker = track_analysis(job["file_type"])
+            
+            with tracker:
+                for key, value in stages:
+                    result[key] = value
+                    for event, payload in iter_stage_events(key, value, batch_size):
+                        yield encode_event(event, payload, format)
+            
+            if profiler is not None:
+                analysis_store.save_profile(analysis_id, profiler.stop())
+                profiler = None
+            
+            summary = summarize(result)
+            analysis_store.complete(analysis_id, result, summary)
+            if cached is None:
+                result_cache.set(job["cache_key"], result)
+            
+            yield encode_event("completed", dict(summary, analysis_id=analysis_id, status="completed"), format)
+        except PipelineCancelledError:
+            logger.info(f"Client disconnected, cancelled streaming analysis {analysis_id}")
+            analysis_store.cancel(analysis_id)
+        except Exception as e:
+            logger.error(f"Streaming analysis {analysis_id} failed: {str(e)}")
+            analysis_store.fail(analysis_id, str(e))
+            yield encode_event("error", {"analysis_id": analysis_id, "detail": str(e)}, format)
+        finally:
+            if profiler is not None:
+                analysis_store.save_profile(analysis_id, profiler.stop())
+            upload_spooler.discard(cleanup_path)
+    
+    async def body():
+        watcher = asyncio.ensure_future(watch_disconnect(http_request, disconnected))
+        try:
+            async for chunk in iterate_in_threadpool(event_stream()):
+                yield chunk
+        finally:
+            disconnected.set()
+            watcher.cancel()
+    
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type)
+
 @app.get("/api/analysis/{analysis_id}")
 async def get_analysis(analysis_id: str):
-    return {
-        "analysis_id": analysis_id,
-        "status": "completed",
-        "message": "Full analysis retrieval endpoint"
-    }
+    record = analysis_store.get(analysis_id)
+    
+    if record is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    
+    result = record.pop("result", None) or {}
+    record.update({
+        "security_assessment": result.get("security_assessment"),
+        "cost_estimate": result.get("cost_estimate"),
+        "architecture_recommendations": result.get("architecture_recommendations"),
+        "migration_plan": result.get("migration_plan"),
+        "ai_insights": result.get("ai_insights"),
+        "cloud_comparison": result.get("cloud_comparison")
+    })
+    
+    return record
+
+@app.post("/api/analysis/{analysis_id}/retarget", response_model=AnalysisResponse)
+async def retarget(analysis_id: str, retarget_request: RetargetRequest):
+    base = analysis_store.get(analysis_id)
+    
+    if base is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    if base.get("status") != "completed" or "result" not in base:
+        raise HTTPException(status_code=409, detail=f"Analysis is {base.get('status')}, not completed")
+    
+    target_cloud = retarget_request.target_cloud
+    validate_target_cloud(target_cloud)
+    new_id = str(uuid.uuid4())
+    compliance_requirements = base.get("compliance_requirements", [])
+    cache_key = result_cache.make_key(
+        base.get("input_digest"), base.get("file_kind"), target_cloud, compliance_requirements
+    )
+    
+    analysis_store.create(
+        new_id, base.get("project_name"), target_cloud,
+        parent_analysis_id=analysis_id,
+        input_digest=base.get("input_digest"), file_kind=base.get("file_kind"),
+        compliance_requirements=compliance_requirements
+    )
+    
+    cached = result_cache.get(cache_key) if base.get("input_digest") else None
+    if cached is not None:
+        analysis_store.complete(new_id, cached, summarize(cached))
+        return AnalysisResponse(analysis_id=new_id, status="completed", cached=True, **summarize(cached))
+    
+    try:
+        base_result = {key: base["result"].get(key) for key in RETARGET_INPUTS}
+        future = job_queue.submit(
+            new_id, pipeline_backend.run, new_id, retarget_analysis, base_result, target_cloud,
+            summarize=summarize
+        )
+        result = await asyncio.wrap_future(future)
+    except QueueFullError as e:
+        analysis_store.fail(new_id, str(e))
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Re-targeting {analysis_id} failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if base.get("input_digest"):
+        result_cache.set(cache_key, result)
+    
+    return AnalysisResponse(analysis_id=new_id, status="completed", **summarize(result))
+
+@app.get("/api/analysis/{analysis_id}/narrative")
+async def stream_narrative(
+    analysis_id: str,
+    section: Optional[List[str]] = Query(None),
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$")
+):
+    record = analysis_store.get(analysis_id)
+    
+    if record is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    if record.get("status") != "completed":
+        raise HTTPException(status_code=409, detail=f"Analysis is {record.get('status')}")
+    
+    sections = [
+        entry for entry in get_registry().report_generator.narrative_sections(record.get("result") or {})
+        if not section or entry[0] in section
+    ]
+    ai_client = get_ai_client()
+    
+    async def narrative_stream():
+        yield encode_event("started", {"analysis_id": analysis_id, "sections": [entry[0] for entry in sections]}, format)
+        try:
+            for name, instruction, items in sections:
+                yield encode_event("section", {"section": name}, format)
+                async for text in ai_client.astream_batched(instruction, items):
+                    yield encode_event("token", {"section": name, "text": text}, format)
+                yield encode_event("section_completed", {"section": name}, format)
+            yield encode_event("completed", {"analysis_id": analysis_id}, format)
+        except Exception as e:
+            logger.error(f"Narrative stream for {analysis_id} failed: {str(e)}")
+            yield encode_event("error", {"analysis_id": analysis_id, "detail": str(e)}, format)
+    
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(narrative_stream(), media_type=media_type)
+
+@app.get("/api/analysis/{analysis_id}/profile")
+async def get_profile(analysis_id: str, format: str = Query("json", pattern="^(json|collapsed)$")):
+    profile = analysis_store.get_profile(analysis_id)
+    
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    if format == "collapsed":
+        return PlainTextResponse(profile.get("collapsed", ""))
+    return profile
 
 @app.get("/api/analysis/{analysis_id}/report")
 async def download_report(analysis_id: str):
-    report_path = f"/tmp/reports/{analysis_id}_report.pdf"
+    report_path = os.path.join(get_registry().report_generator.output_dir, f"{analysis_id}_report.pdf")
     
     if not os.path.exists(report_path):
         raise HTTPException(status_code=404, detail="Report not found")
@@ -168,11 +562,18 @@ async def download_report(analysis_id: str):
 
 @app.get("/metrics")
 async def get_metrics():
-    return {
-        "total_analyses": 0,
-        "avg_analysis_time_seconds": 0,
-        "success_rate": 100
-    }
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
+
+@app.on_event("startup")
+async def build_components():
+    # Rule compilation and table setup happen once, before the first request
+    get_registry()
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    job_queue.shutdown()
+    pipeline_backend.shutdown()
 
 if __name__ == "__main__":
     import uvicorn
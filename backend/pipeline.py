@@ -0,0 +1,279 @@
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from registry import get_registry
+from utils.ai_client import get_ai_client
+from utils.metrics import stage_timer
+from utils.profiling import profile_span
+from utils.task_context import checkpoint
+
+logger = logging.getLogger(__name__)
+
+CLOUD_INDEPENDENT_KEYS = ("infra_results", "security_results", "security_assessment")
+# What the cloud-dependent stages read, and what re-targeting carries over
+CLOUD_DEPENDENT_INPUTS = ("infra_results", "security_assessment")
+RETARGET_INPUTS = CLOUD_INDEPENDENT_KEYS + ("project_name", "compliance_requirements")
+SUPPORTED_CLOUDS = ("aws", "azure", "gcp")
+RESULT_KEYS = CLOUD_INDEPENDENT_KEYS + (
+    "cost_estimate", "architecture_recommendations", "migration_plan", "ai_insights", "cloud_comparison"
+)
+
+# Stream event emitted for each result key, and the list inside it that is
+# streamed in batches ahead of the stage event
+STAGE_EVENTS = {
+    "infra_results": "parsed",
+    "security_results": "security_findings",
+    "security_assessment": "security_assessment",
+    "cost_estimate": "cost_estimate",
+    "architecture_recommendations": "architecture",
+    "migration_plan": "plan",
+    "ai_insights": "insights",
+    "cloud_comparison": "cloud_comparison"
+}
+BATCHED_ITEMS = {
+    "infra_results": ("resources", "resources"),
+    "security_results": ("findings", "findings")
+}
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a stage for /metrics, and as a span when the analysis is profiled;
+    a cancelled or timed-out analysis stops before the stage starts
+    """
+    checkpoint()
+    with stage_timer(name), profile_span(name):
+        yield
+
+
+class UnsupportedCloudError(ValueError):
+    """
+    Raised for a target cloud outside SUPPORTED_CLOUDS
+    """
+
+
+def parse_target_clouds(target_cloud: str) -> List[str]:
+    """
+    Expand "all" or a comma-separated list into provider names
+    """
+    if target_cloud.strip().lower() == "all":
+        return list(SUPPORTED_CLOUDS)
+
+    clouds = []
+    for cloud in target_cloud.split(","):
+        cloud = cloud.strip().lower()
+        if cloud and cloud not in SUPPORTED_CLOUDS:
+            raise UnsupportedCloudError(
+                f"Unsupported target cloud {cloud!r}; expected {', '.join(SUPPORTED_CLOUDS)} or all"
+            )
+        if cloud and cloud not in clouds:
+            clouds.append(cloud)
+    return clouds or ["aws"]
+
+
+def run_analysis(file_path: str, project_name: Optional[str] = None,
+                 target_cloud: str = "aws",
+                 compliance_requirements: Optional[List[str]] = None) -> Dict:
+    """
+    Run the full assessment pipeline over a staged infrastructure file
+    """
+    logger.info(f"Running analysis pipeline for {project_name} ({file_path})")
+
+    result = {
+        "project_name": project_name,
+        "target_cloud": target_cloud,
+        "compliance_requirements": compliance_requirements or []
+    }
+    result.update(iter_analysis(file_path, target_cloud))
+    return result
+
+
+def iter_analysis(file_path: str, target_cloud: str = "aws") -> Iterator[Tuple[str, Dict]]:
+    """
+    Yield (result_key, value) as each pipeline stage finishes
+    """
+    stages: Dict = {}
+    for key, value in iter_cloud_independent_stages(file_path):
+        stages[key] = value
+        yield key, value
+
+    yield from iter_cloud_dependent_stages(stages, target_cloud)
+
+
+def retarget_analysis(base_result: Dict, target_cloud: str) -> Dict:
+    """
+    Re-run only the target-cloud dependent stages of a stored result,
+    reusing its parsed infrastructure and security assessment
+    """
+    logger.info(f"Re-targeting analysis of {base_result.get('project_name')} to {target_cloud}")
+
+    result = {key: base_result.get(key) for key in CLOUD_INDEPENDENT_KEYS}
+    result.update({
+        "project_name": base_result.get("project_name"),
+        "target_cloud": target_cloud,
+        "compliance_requirements": base_result.get("compliance_requirements", [])
+    })
+    result.update(run_cloud_dependent_stages(result, target_cloud))
+    return result
+
+
+def run_cloud_independent_stages(file_path: str) -> Dict:
+    return dict(iter_cloud_independent_stages(file_path))
+
+
+def iter_cloud_independent_stages(file_path: str) -> Iterator[Tuple[str, Dict]]:
+    components = get_registry()
+    with stage("analyze_file"):
+        infra_results = components.infrastructure_analyzer.analyze_file(file_path)
+
+    with stage("classify"):
+        components.classifier.classify(infra_results)
+    yield "infra_results", infra_results
+
+    with stage("scan"):
+        security_results = components.security_scanner.scan(infra_results)
+    yield "security_results", security_results
+
+    with stage("assess"):
+        security_assessment = components.security_agent.assess(security_results)
+    yield "security_assessment", security_assessment
+
+
+def run_cloud_dependent_stages(stages: Dict, target_cloud: str) -> Dict:
+    return dict(iter_cloud_dependent_stages(stages, target_cloud))
+
+
+def iter_cloud_dependent_stages(stages: Dict, target_cloud: str) -> Iterator[Tuple[str, Dict]]:
+    clouds = parse_target_clouds(target_cloud)
+    if len(clouds) > 1:
+        yield from iter_cloud_comparison(stages, clouds)
+        return
+
+    target_cloud = clouds[0]
+    infra_results = stages["infra_results"]
+    components = get_registry()
+
+    with stage("estimate"):
+        cost_estimate = components.cost_agent.estimate(infra_results, target_cloud)
+    yield "cost_estimate", cost_estimate
+
+    with stage("design"):
+        arch_recommendations = components.architecture_agent.design(infra_results, target_cloud)
+    yield "architecture_recommendations", arch_recommendations
+
+    with stage("create_plan"):
+        migration_plan = components.migration_agent.create_plan(
+            infra_results,
+            stages["security_assessment"],
+            cost_estimate,
+            arch_recommendations
+        )
+    yield "migration_plan", migration_plan
+
+    yield "ai_insights", generate_insights(infra_results, stages["security_assessment"], migration_plan)
+
+
+def generate_insights(infra_results: Dict, security_assessment: Dict, migration_plan: Dict) -> Dict:
+    """
+    The four AI prompts for an analysis, sent concurrently rather than as
+    four sequential round trips
+    """
+    with stage("insights"):
+        return get_ai_client().insights(
+            security_assessment.get("findings", []),
+            infra_results.get("resources", []),
+            infra_results,
+            migration_plan.get("complexity", "medium")
+        )
+
+
+def iter_cloud_comparison(stages: Dict, clouds: List[str]) -> Iterator[Tuple[str, Dict]]:
+    """
+    Cost and architecture for several providers from one classification
+    pass; the first provider is reported as the primary result
+    """
+    infra_results = stages["infra_results"]
+    components = get_registry()
+
+    with stage("estimate"):
+        cost_estimates = components.cost_agent.compare(infra_results, clouds)
+    primary = clouds[0]
+    yield "cost_estimate", cost_estimates[primary]
+
+    with stage("design"):
+        designs = components.architecture_agent.compare(infra_results, clouds)
+    yield "architecture_recommendations", designs[primary]
+
+    with stage("create_plan"):
+        migration_plan = components.migration_agent.create_plan(
+            infra_results,
+            stages["security_assessment"],
+            cost_estimates[primary],
+            designs[primary]
+        )
+    yield "migration_plan", migration_plan
+
+    yield "ai_insights", generate_insights(infra_results, stages["security_assessment"], migration_plan)
+
+    comparison = []
+    for cloud in clouds:
+        estimate = cost_estimates[cloud]
+        target_architecture = designs[cloud]["target_architecture"]
+        comparison.append({
+            "cloud": cloud,
+            "migration_cost": estimate["migration_cost"],
+            "monthly_operational_cost": estimate["monthly_operational_cost"],
+            "yearly_operational_cost": estimate["yearly_operational_cost"],
+            "three_year_tco": estimate["three_year_tco"],
+            "services": {
+                category: sorted({item["target"] for item in items if "target" in item})
+                for category, items in target_architecture.items()
+            }
+        })
+
+    yield "cloud_comparison", {
+        "clouds": clouds,
+        "providers": {
+            cloud: {
+                "cost_estimate": cost_estimates[cloud],
+                "architecture_recommendations": designs[cloud]
+            }
+            for cloud in clouds
+        },
+        "comparison": comparison,
+        "lowest_three_year_tco": min(comparison, key=lambda row: row["three_year_tco"])["cloud"]
+    }
+
+
+def iter_stage_events(key: str, value: Dict, batch_size: int = 500) -> Iterator[Tuple[str, Dict]]:
+    """
+    Turn one finished stage into stream events: large lists first, in
+    batches, then the stage itself without them
+    """
+    if key in BATCHED_ITEMS:
+        item_key, event = BATCHED_ITEMS[key]
+        items = value.get(item_key, [])
+        for offset in range(0, len(items), batch_size):
+            yield event, {"offset": offset, "items": items[offset:offset + batch_size]}
+
+        value = {k: v for k, v in value.items() if k != item_key}
+        if "classification" in value:
+            value["classification"] = {"counts": value["classification"]["counts"]}
+
+    yield STAGE_EVENTS.get(key, key), value
+
+
+def summarize(result: Dict) -> Dict:
+    """
+    Reduce a pipeline result to the fields returned by /api/analyze
+    """
+    security_assessment = result.get("security_assessment", {})
+
+    return {
+        "risk_score": security_assessment.get("risk_score", 0),
+        "findings_count": len(security_assessment.get("findings", [])),
+        "estimated_cost": result.get("cost_estimate", {}).get("total_cost", 0),
+        "timeline_weeks": result.get("migration_plan", {}).get("timeline_weeks", 0)
+    }
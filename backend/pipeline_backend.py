@@ -0,0 +1,364 @@
+import os
+import time
+import signal
+import logging
+import weakref
+import threading
+import multiprocessing
+from abc import ABC, abstractmethod
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from pipeline import (
+    CLOUD_DEPENDENT_INPUTS, iter_analysis, run_cloud_dependent_stages, run_cloud_independent_stages
+)
+from registry import get_registry
+from utils.job_store import QueueFullError
+from utils.profiling import PipelineProfiler, profiled_iter
+from utils.task_context import PipelineCancelledError, PipelineTimeoutError, TaskContext
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("thread", "process")
+# How often a waiting caller looks for a disconnected client
+POLL_SECONDS = 0.25
+# Time a cancelled or timed-out worker gets to reach a checkpoint before it is killed
+TIMEOUT_GRACE_SECONDS = 5
+# Tasks in flight at once (running or waiting for a worker process)
+MAX_TASKS = 4096
+
+ShouldCancel = Optional[Callable[[], bool]]
+
+
+class _PoolRecycled(BrokenProcessPool):
+    """
+    The task's pool was torn down to stop another task's worker
+    """
+
+
+class PipelineBackend(ABC):
+    """
+    Where analyses run. run() executes one pipeline function for a task;
+    iter_analysis() yields stage results for streaming. Both raise
+    PipelineCancelledError after cancel(task_id) and PipelineTimeoutError
+    once a task runs past PIPELINE_TASK_TIMEOUT seconds (0 disables it).
+    """
+
+    # Analyses the job queue should run at once; None keeps ANALYSIS_WORKERS
+    concurrency: Optional[int] = None
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout if timeout is not None else float(os.getenv("PIPELINE_TASK_TIMEOUT", 600))
+
+    def new_profiler(self) -> PipelineProfiler:
+        return PipelineProfiler()
+
+    @abstractmethod
+    def run(self, task_id: str, fn: Callable[..., Dict], *args,
+            profiler: Optional[PipelineProfiler] = None, should_cancel: ShouldCancel = None) -> Dict:
+        ...
+
+    def iter_analysis(self, task_id: str, file_path: str, target_cloud: str,
+                      profiler: Optional[PipelineProfiler] = None,
+                      should_cancel: ShouldCancel = None) -> Iterator[Tuple[str, Dict]]:
+        """
+        Stage results in two round trips: the cloud-independent stages,
+        then the cloud-dependent ones fed only the inputs they read
+        """
+        stages = self.run(task_id, run_cloud_independent_stages, file_path,
+                          profiler=profiler, should_cancel=should_cancel)
+        yield from stages.items()
+
+        inputs = {key: stages[key] for key in CLOUD_DEPENDENT_INPUTS}
+        yield from self.run(task_id, run_cloud_dependent_stages, inputs, target_cloud,
+                            profiler=profiler, should_cancel=should_cancel).items()
+
+    @abstractmethod
+    def cancel(self, task_id: str) -> bool:
+        ...
+
+    def shutdown(self):
+        pass
+
+
+class ThreadPipelineBackend(PipelineBackend):
+    """
+    Runs the pipeline on the calling thread (a job queue worker or the
+    streaming response's thread). Cancellation and timeouts take effect at
+    the next stage boundary.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        super().__init__(timeout)
+        self._cancelled: Dict[str, threading.Event] = {}
+
+    @contextmanager
+    def _task(self, task_id: str, should_cancel: ShouldCancel) -> Iterator[TaskContext]:
+        event = self._cancelled.setdefault(task_id, threading.Event())
+        is_cancelled = event.is_set
+        if should_cancel is not None:
+            is_cancelled = lambda: event.is_set() or should_cancel()
+        try:
+            yield TaskContext(task_id, self.timeout, is_cancelled)
+        finally:
+            self._cancelled.pop(task_id, None)
+
+    def run(self, task_id: str, fn: Callable[..., Dict], *args,
+            profiler: Optional[PipelineProfiler] = None, should_cancel: ShouldCancel = None) -> Dict:
+        with self._task(task_id, should_cancel) as task, task:
+            with profiler.attach() if profiler is not None else nullcontext():
+                return fn(*args)
+
+    def iter_analysis(self, task_id: str, file_path: str, target_cloud: str,
+                      profiler: Optional[PipelineProfiler] = None,
+                      should_cancel: ShouldCancel = None) -> Iterator[Tuple[str, Dict]]:
+        """
+        Stage results as each finishes; every step re-attaches the task to
+        whichever thread resumes the generator
+        """
+        with self._task(task_id, should_cancel) as task:
+            yield from profiled_iter(profiler, _task_iter(task, iter_analysis(file_path, target_cloud)))
+
+    def cancel(self, task_id: str) -> bool:
+        event = self._cancelled.get(task_id)
+        if event is None:
+            return False
+        event.set()
+        return True
+
+
+def _task_iter(task: TaskContext, iterator: Iterator) -> Iterator:
+    while True:
+        with task:
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+# Worker process state, set up by _init_worker
+_cancel_flags = None
+_worker_pids = None
+
+
+def _init_worker(cancel_flags, worker_pids):
+    global _cancel_flags, _worker_pids
+    _cancel_flags = cancel_flags
+    _worker_pids = worker_pids
+
+    components = get_registry()
+    # The pipeline pool already occupies every core; nested pools would oversubscribe it
+    components.infrastructure_analyzer.max_workers = 1
+    components.code_analyzer.max_workers = 1
+
+
+def _run_in_worker(slot: int, task_id: str, timeout: Optional[float], fn: Callable[..., Dict],
+                   args: tuple, profile: bool) -> Tuple[Dict, Optional[Dict]]:
+    task = TaskContext(task_id, timeout, lambda: bool(_cancel_flags[slot]))
+    profiler = PipelineProfiler().start() if profile else None
+
+    _worker_pids[slot] = os.getpid()
+    try:
+        with task, profiler.attach() if profiler is not None else nullcontext():
+            task.check()
+            result = fn(*args)
+    finally:
+        _worker_pids[slot] = 0
+        report = profiler.stop() if profiler is not None else None
+    return result, report
+
+
+class ProcessPipelineBackend(PipelineBackend):
+    """
+    Runs pipeline functions in a pool of PIPELINE_WORKERS processes so
+    parsing, rule evaluation and cost aggregation use every core. Inputs
+    are staged file paths or the few stage results a task reads, and the
+    parent process keeps every store and cache write. Cancellation and
+    timeouts take effect at the next stage boundary; a worker still inside
+    a stage TIMEOUT_GRACE_SECONDS later is killed and the pool recycled.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, timeout: Optional[float] = None):
+        super().__init__(timeout)
+        self.max_workers = max_workers or int(os.getenv("PIPELINE_WORKERS", os.cpu_count() or 1))
+        self.concurrency = self.max_workers
+        self._context = multiprocessing.get_context(
+            "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        )
+        # Shared with every worker: a cancel flag and the worker pid per task slot
+        self._cancel_flags = self._context.RawArray("b", MAX_TASKS)
+        self._worker_pids = self._context.RawArray("i", MAX_TASKS)
+        self._free_slots: List[int] = list(range(MAX_TASKS))
+        self._slots: Dict[str, int] = {}
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Pools torn down on purpose; the other tasks they held are retried
+        self._recycled: "weakref.WeakSet[ProcessPoolExecutor]" = weakref.WeakSet()
+
+    def new_profiler(self) -> PipelineProfiler:
+        # Allocations are traced in the worker that does the work
+        return PipelineProfiler(trace_allocations=False)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=self._context,
+                    initializer=_init_worker,
+                    initargs=(self._cancel_flags, self._worker_pids)
+                )
+            return self._executor
+
+    def _reset_pool(self, broken: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _recycle(self, executor: ProcessPoolExecutor, slot: int):
+        """
+        Kill the worker running the task in slot and replace its pool;
+        killing the whole process leaves no lock or file half-held
+        """
+        with self._lock:
+            self._recycled.add(executor)
+        pid = self._worker_pids[slot]
+        if pid:
+            try:
+                os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+            except OSError:
+                pass
+        self._reset_pool(executor)
+
+    def _acquire_slot(self, task_id: str) -> int:
+        with self._lock:
+            if not self._free_slots:
+                raise QueueFullError("Pipeline task limit reached, retry later")
+            slot = self._free_slots.pop()
+            self._cancel_flags[slot] = 0
+            self._worker_pids[slot] = 0
+            self._slots[task_id] = slot
+            return slot
+
+    def _release_slot(self, slot: int):
+        with self._lock:
+            self._free_slots.append(slot)
+
+    def run(self, task_id: str, fn: Callable[..., Dict], *args,
+            profiler: Optional[PipelineProfiler] = None, should_cancel: ShouldCancel = None) -> Dict:
+        try:
+            result, report = self._submit(task_id, fn, args, profiler is not None, should_cancel)
+        except _PoolRecycled:
+            # Another task's worker was killed along with the pool this one ran on
+            logger.warning(f"Retrying analysis {task_id} on a fresh pipeline worker pool")
+            result, report = self._submit(task_id, fn, args, profiler is not None, should_cancel)
+
+        if report is not None:
+            profiler.absorb(report)
+        return result
+
+    def _submit(self, task_id: str, fn: Callable[..., Dict], args: tuple, profile: bool,
+                should_cancel: ShouldCancel) -> Tuple[Dict, Optional[Dict]]:
+        slot = self._acquire_slot(task_id)
+        executor = self._pool()
+        try:
+            future = executor.submit(_run_in_worker, slot, task_id, self.timeout, fn, args, profile)
+        except Exception:
+            with self._lock:
+                self._slots.pop(task_id, None)
+            self._release_slot(slot)
+            raise
+
+        # The slot stays reserved until the worker is done with it, even if
+        # the caller gives up first
+        future.add_done_callback(lambda done: self._release_slot(slot))
+        self._futures[task_id] = future
+        try:
+            return self._wait(task_id, slot, executor, future, should_cancel)
+        except (BrokenProcessPool, CancelledError) as e:
+            with self._lock:
+                recycled = executor in self._recycled
+            if self._cancel_flags[slot]:
+                raise PipelineCancelledError(f"Analysis {task_id} was cancelled")
+            if recycled:
+                raise _PoolRecycled(str(e)) from e
+            if isinstance(e, CancelledError):
+                # The backend shut down before a worker picked the task up
+                raise PipelineCancelledError(f"Analysis {task_id} was cancelled")
+            logger.error("Pipeline worker pool broke; starting a new one")
+            self._reset_pool(executor)
+            raise
+        finally:
+            with self._lock:
+                self._slots.pop(task_id, None)
+                self._futures.pop(task_id, None)
+
+    def _wait(self, task_id: str, slot: int, executor: ProcessPoolExecutor, future: Future,
+              should_cancel: ShouldCancel) -> Tuple[Dict, Optional[Dict]]:
+        started = None
+        # When the task was told to stop, and what to raise if it never does
+        stopping_since = None
+        stop_error: Optional[Exception] = None
+        while True:
+            done, _ = wait([future], timeout=POLL_SECONDS)
+            if done:
+                return future.result()
+
+            if should_cancel is not None and should_cancel():
+                self.cancel(task_id)
+                should_cancel = None
+
+            now = time.monotonic()
+            if started is None and future.running():
+                started = now
+            if stopping_since is None:
+                if self._cancel_flags[slot]:
+                    stopping_since = now
+                    stop_error = PipelineCancelledError(f"Analysis {task_id} was cancelled")
+                elif self.timeout and started is not None and now - started > self.timeout:
+                    stopping_since = now
+                    stop_error = PipelineTimeoutError(
+                        f"Analysis {task_id} exceeded the {self.timeout:g}s task timeout"
+                    )
+
+            # Still inside one stage, so it will not reach a checkpoint soon
+            if stopping_since is not None and now - stopping_since > TIMEOUT_GRACE_SECONDS:
+                logger.warning(f"Pipeline worker for {task_id} did not stop; recycling the pool")
+                self._recycle(executor, slot)
+                raise stop_error
+
+    def cancel(self, task_id: str) -> bool:
+        with self._lock:
+            slot = self._slots.get(task_id)
+            future = self._futures.get(task_id)
+        if slot is None:
+            return False
+
+        self._cancel_flags[slot] = 1
+        if future is not None:
+            future.cancel()
+        return True
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_pipeline_backend() -> PipelineBackend:
+    """
+    Backend selected by PIPELINE_BACKEND: "thread" (default) or "process"
+    """
+    name = os.getenv("PIPELINE_BACKEND", "thread").lower()
+    if name not in BACKENDS:
+        raise ValueError(f"PIPELINE_BACKEND must be one of {', '.join(BACKENDS)}, not {name!r}")
+    logger.info(f"Running analyses on the {name} pipeline backend")
+    if name == "process":
+        return ProcessPipelineBackend()
+    return ThreadPipelineBackend()
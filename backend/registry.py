@@ -0,0 +1,54 @@
+import logging
+import threading
+from typing import Optional
+
+from agents.security_agent import SecurityAgent
+from agents.cost_agent import CostAgent
+from agents.architecture_agent import ArchitectureAgent
+from agents.migration_agent import MigrationAgent
+from analyzers.code_analyzer import CodeAnalyzer
+from analyzers.infrastructure_analyzer import InfrastructureAnalyzer
+from analyzers.security_scanner import SecurityScanner
+from analyzers.resource_classifier import ResourceClassifier
+from generators.report_generator import ReportGenerator
+from generators.proposal_generator import ProposalGenerator
+
+logger = logging.getLogger(__name__)
+
+
+class ComponentRegistry:
+    """
+    The analyzers, agents and generators shared by every request. Each
+    keeps only read-only tables after construction, so one instance of
+    each serves concurrent analyses without locking; building them once
+    moves rule compilation and table setup off the request path
+    """
+
+    def __init__(self):
+        self.infrastructure_analyzer = InfrastructureAnalyzer()
+        self.classifier = ResourceClassifier()
+        self.security_scanner = SecurityScanner()
+        self.security_agent = SecurityAgent()
+        self.cost_agent = CostAgent()
+        self.architecture_agent = ArchitectureAgent()
+        self.migration_agent = MigrationAgent()
+        self.code_analyzer = CodeAnalyzer()
+        self.report_generator = ReportGenerator()
+        self.proposal_generator = ProposalGenerator()
+
+
+_shared_registry: Optional[ComponentRegistry] = None
+_shared_registry_lock = threading.Lock()
+
+
+def get_registry() -> ComponentRegistry:
+    """
+    Get the shared component registry, building it on first use
+    """
+    global _shared_registry
+    if _shared_registry is None:
+        with _shared_registry_lock:
+            if _shared_registry is None:
+                _shared_registry = ComponentRegistry()
+                logger.info("Component registry initialized")
+    return _shared_registry
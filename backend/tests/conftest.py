@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+# The backend runs from its own directory with absolute imports (from utils...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def client(tmp_path_factory):
+    """
+    TestClient for the app in demo mode with its stores under tmp; one app
+    lifetime per session, as the shutdown hook stops the job queue
+    """
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("ANALYSIS_STORE_DIR", str(tmp_path_factory.mktemp("analyses")))
+        patch.setenv("UPLOAD_DIR", str(tmp_path_factory.mktemp("uploads")))
+        patch.setenv("DEMO_MODE", "true")
+        from fastapi.testclient import TestClient
+        import main
+
+        with TestClient(main.app) as test_client:
+            yield test_client
@@ -0,0 +1,127 @@
+import io
+import json
+import time
+import asyncio
+import threading
+
+from utils import ai_client
+from utils.ai_client import AIClient, shared_cache_stats
+from utils.metrics import CacheStatsCollector
+
+
+def test_astream_stops_the_producer_when_the_consumer_leaves(monkeypatch):
+    monkeypatch.setenv("DEMO_MODE", "true")
+    monkeypatch.setenv("AI_CACHE_BACKEND", "memory")
+    client = AIClient()
+    closed = threading.Event()
+    produced = []
+
+    def slow_stream(prompt, max_tokens=None):
+        try:
+            for position in range(100):
+                produced.append(position)
+                time.sleep(0.01)
+                yield str(position)
+        finally:
+            closed.set()
+
+    monkeypatch.setattr(client, "iter_stream", slow_stream)
+
+    async def consume():
+        async for text in client.astream_batched("Summarize", [{"name": "a"}]):
+            if text == "2":
+                break
+
+    asyncio.run(consume())
+    assert closed.wait(2)
+    assert len(produced) < 100
+    client.close()
+
+
+def test_insights_fan_out_under_the_concurrency_limit(monkeypatch):
+    monkeypatch.setenv("DEMO_MODE", "true")
+    monkeypatch.setenv("AI_CACHE_BACKEND", "memory")
+    monkeypatch.setenv("DEMO_LATENCY_MS", "200")
+    infrastructure = {"resources": [{"type": "aws_instance", "name": "web"}]}
+
+    client = AIClient(max_concurrency=4)
+    started = time.monotonic()
+    insights = client.insights([], infrastructure["resources"], infrastructure, "low")
+    concurrent = time.monotonic() - started
+
+    assert set(insights) == {"security", "cost", "architecture", "migration"}
+    assert "12 weeks" in insights["migration"]["analysis"]
+    assert concurrent < 0.6
+
+    serial = AIClient(max_concurrency=1)
+    started = time.monotonic()
+    assert serial.insights([], infrastructure["resources"], infrastructure, "low") == insights
+    assert time.monotonic() - started >= 0.8
+    client.close()
+    serial.close()
+
+
+class RecordingBedrock:
+    def __init__(self):
+        self.prompts = []
+
+    def invoke_model(self, modelId, body):
+        prompt = json.loads(body)["messages"][0]["content"]
+        self.prompts.append(prompt)
+        return {"body": io.BytesIO(json.dumps({"content": [{"text": f"answer {len(self.prompts)}"}]}).encode())}
+
+
+def production_client(monkeypatch) -> AIClient:
+    monkeypatch.setenv("DEMO_MODE", "true")
+    monkeypatch.setenv("AI_CACHE_BACKEND", "memory")
+    client = AIClient()
+    client.demo_mode = False
+    client.client = RecordingBedrock()
+    return client
+
+
+def test_prompts_carry_the_payload_as_passed_and_cache_by_content(monkeypatch):
+    client = production_client(monkeypatch)
+    phases = [
+        {"name": "Discovery", "start_date": "2024-01-01"},
+        {"name": "Cutover", "start_date": "2024-06-01"},
+    ]
+
+    first = client._invoke_batched("Plan review for phases", phases)
+    prompt = client.client.prompts[0]
+    assert prompt.index("Discovery") < prompt.index("Cutover")
+    assert "2024-06-01" in prompt
+
+    # Same content in another order and with other run dates: served from cache
+    reordered = [dict(phases[1], start_date="2025-01-01"), dict(phases[0], start_date="2025-02-01")]
+    assert client._invoke_batched("Plan review for phases", reordered) == first
+    assert len(client.client.prompts) == 1
+    client.close()
+
+
+def test_migration_strategy_prompt_is_not_rewritten(monkeypatch):
+    client = production_client(monkeypatch)
+
+    first = client.get_migration_strategy(" High ")
+    assert client.client.prompts == ["Migration strategy for  High  complexity"]
+    assert client.get_migration_strategy("high") == first
+    assert len(client.client.prompts) == 1
+    client.close()
+
+
+def test_metrics_scrapes_do_not_create_the_client(monkeypatch):
+    monkeypatch.setenv("DEMO_MODE", "true")
+    monkeypatch.setenv("AI_CACHE_BACKEND", "memory")
+    monkeypatch.setattr(ai_client, "_shared_client", None)
+    collector = CacheStatsCollector()
+    collector.register("ai", shared_cache_stats)
+
+    assert all(not family.samples for family in collector.collect())
+    assert ai_client._shared_client is None
+
+    client = ai_client.get_ai_client()
+    hits = {family.name: family for family in collector.collect()}["migrationgpt_cache_hits"]
+    assert [sample.labels for sample in hits.samples] == [
+        {"cache": "ai", "tier": "memory"}, {"cache": "ai", "tier": "backend"}
+    ]
+    client.close()
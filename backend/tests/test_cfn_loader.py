@@ -0,0 +1,124 @@
+import os
+import json
+import time
+import pickle
+
+import pytest
+
+from analyzers.cfn_loader import LazyProperties, MappedTemplate, TemplateFormatError, iter_cloudformation_resources
+from analyzers.infrastructure_analyzer import InfrastructureAnalyzer
+from utils.demo_mode import DemoAIClient
+
+TEMPLATE = {
+    "AWSTemplateFormatVersion": "2010-09-09",
+    "Parameters": {"Env": {"Type": "String", "Default": "prod {with} [brackets]"}},
+    "Resources": {
+        "Bucket": {"Type": "AWS::S3::Bucket", "Properties": {"BucketName": "a\"b", "Tags": [{"Key": "k"}]}},
+        "Queue": {"Type": "AWS::SQS::Queue"},
+        "Db": {"Type": "AWS::RDS::DBInstance", "Properties": {"StorageEncrypted": True, "AllocatedStorage": 20}}
+    },
+    "Outputs": {}
+}
+
+
+@pytest.fixture
+def template_path(tmp_path):
+    path = tmp_path / "stack.json"
+    path.write_text(json.dumps(TEMPLATE, indent=2))
+    return str(path)
+
+
+def open_fds():
+    return len(os.listdir("/proc/self/fd"))
+
+
+def test_resources_match_a_full_decode(template_path):
+    with MappedTemplate(template_path) as template:
+        resources = list(iter_cloudformation_resources(template))
+
+        assert [(r["type"], r["name"]) for r in resources] == [
+            (body["Type"], name) for name, body in TEMPLATE["Resources"].items()
+        ]
+        assert isinstance(resources[0]["properties"], LazyProperties)
+        assert dict(resources[0]["properties"]) == TEMPLATE["Resources"]["Bucket"]["Properties"]
+        assert resources[1]["properties"] == {}
+        assert pickle.loads(pickle.dumps(resources[2]["properties"])) == TEMPLATE["Resources"]["Db"]["Properties"]
+    assert template.closed
+
+
+def test_decode_cache_is_bounded_and_per_template(template_path):
+    template = MappedTemplate(template_path, cache_size=1)
+    bucket, _, db = (r["properties"] for r in iter_cloudformation_resources(template))
+
+    bucket["BucketName"]
+    db["AllocatedStorage"]
+    assert list(template._decoded) == [(db._start, db._end)]
+
+    template.close()
+    assert not template._decoded
+
+
+def test_analyzer_returns_plain_dicts_and_closes_the_template(template_path):
+    analyzer = InfrastructureAnalyzer(sample_fallback=False, max_workers=1)
+    analyzer.analyze_file(template_path)  # warm up imports and logging handles
+    before = open_fds()
+
+    # Keep every result alive: none of them may pin an fd or a mapping
+    results = [analyzer.analyze_file(template_path) for _ in range(20)]
+    result = results[-1]
+
+    assert open_fds() == before
+    assert result["file_type"] == "cloudformation"
+    assert result["total_resources"] == 3
+    assert all(type(resource["properties"]) is dict for resource in result["resources"])
+    assert result["resources"][2]["properties"]["AllocatedStorage"] == 20
+
+
+def test_malformed_template_is_closed_too(tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text('{"Resources": {"Bucket": {"Type": "AWS::S3::Bucket", "Properties": {')
+    analyzer = InfrastructureAnalyzer(sample_fallback=False, max_workers=1)
+    before = open_fds()
+
+    with pytest.raises(TemplateFormatError):
+        with MappedTemplate(str(path)) as template:
+            list(iter_cloudformation_resources(template))
+    assert template.closed
+
+    analyzer.analyze_file(str(path))
+    assert open_fds() == before
+
+
+def test_demo_responses_do_not_depend_on_the_template_path(tmp_path):
+    payload = json.dumps(TEMPLATE)
+    client = DemoAIClient(seed=7)
+    draws = []
+    for name in ("one.json", "two.json"):
+        path = tmp_path / name
+        path.write_text(payload)
+        with MappedTemplate(str(path)) as template:
+            properties = [r["properties"] for r in iter_cloudformation_resources(template)]
+            draws.append(client._rng(properties).random())
+
+    assert draws[0] == draws[1]
+    assert draws[0] == client._rng([r.get("Properties", {}) for r in TEMPLATE["Resources"].values()]).random()
+
+
+def test_truncated_templates_fail_fast(tmp_path):
+    text = json.dumps(TEMPLATE)
+    path = tmp_path / "truncated.json"
+    started = time.monotonic()
+
+    # Every cut inside the Resources object, then a long value with no closing bracket
+    for cut in range(text.index('"Resources"'), text.index(', "Outputs"')):
+        path.write_text(text[:cut])
+        with pytest.raises(TemplateFormatError):
+            with MappedTemplate(str(path)) as template:
+                list(iter_cloudformation_resources(template))
+
+    path.write_text('{"Resources": {"Bucket": {"Properties": {"Tags": [' + '1, "a\\\\"b", ' * 200000)
+    result = InfrastructureAnalyzer(sample_fallback=False, max_workers=1).analyze_file(str(path))
+
+    assert result["total_resources"] == 0
+    assert "Unterminated" in result["metadata"]["error"]
+    assert time.monotonic() - started < 5
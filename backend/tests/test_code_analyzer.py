@@ -0,0 +1,260 @@
+import textwrap
+
+import pytest
+
+from analyzers import code_analyzer
+from analyzers.code_analyzer import CodeAnalyzer, analyze_source_file
+from analyzers.dependency_manifests import (
+    collect_dependencies, is_manifest, parse_csproj, parse_manifest, parse_package_json,
+    parse_pom, parse_requirements
+)
+
+PYTHON_SOURCE = textwrap.dedent('''\
+    # helpers
+    def pick(value):
+        if value and value > 1:
+            return "if or while"
+        return None
+
+
+    def plain():
+        return 1
+''')
+JS_SOURCE = textwrap.dedent('''\
+    // if this were counted the estimate would be off
+    function check(a, b) {
+        if (a && b) { return "for || while"; }
+        return a ?? b;
+    }
+''')
+POM = textwrap.dedent('''\
+    <project xmlns="http://maven.apache.org/POM/4.0.0">
+      <version>2.1.0</version>
+      <properties>
+        <spring.version>3.2.1</spring.version>
+      </properties>
+      <dependencies>
+        <dependency>
+          <groupId>org.springframework.boot</groupId>
+          <artifactId>spring-boot-starter-web</artifactId>
+          <version>${spring.version}</version>
+        </dependency>
+        <dependency>
+          <groupId>com.example</groupId>
+          <artifactId>shared</artifactId>
+          <version>${project.version}</version>
+        </dependency>
+        <dependency>
+          <groupId>software.amazon.awssdk</groupId>
+          <artifactId>s3</artifactId>
+          <version>${undefined.version}</version>
+        </dependency>
+        <dependency>
+          <groupId>org.junit.jupiter</groupId>
+          <artifactId>junit-jupiter</artifactId>
+          <scope>test</scope>
+        </dependency>
+      </dependencies>
+    </project>
+''')
+CSPROJ = textwrap.dedent('''\
+    <Project Sdk="Microsoft.NET.Sdk">
+      <ItemGroup>
+        <PackageReference Include="Npgsql" Version="8.0.1" />
+        <PackageReference Include="Dapper">
+          <Version>2.1.28</Version>
+        </PackageReference>
+        <PackageReference Update="Newtonsoft.Json" />
+        <PackageReference Version="1.0.0" />
+      </ItemGroup>
+    </Project>
+''')
+
+
+def summary(dependencies):
+    return [(d["package"], d["version"], d["category"], d["scope"]) for d in dependencies]
+
+
+def test_python_metrics_come_from_radon(tmp_path):
+    path = tmp_path / "app.py"
+    path.write_text(PYTHON_SOURCE)
+
+    metrics = analyze_source_file(str(path))
+
+    assert metrics["language"] == "Python"
+    assert metrics["method"] == "radon"
+    assert metrics["functions"] == 2
+    assert metrics["max_complexity"] == 3
+    assert metrics["total_complexity"] == 4
+    assert metrics["loc"] == 9
+
+
+def test_estimate_ignores_comments_and_strings(tmp_path):
+    path = tmp_path / "check.js"
+    path.write_text(JS_SOURCE)
+
+    metrics = analyze_source_file(str(path))
+
+    # if, && and ?? are the only decision points outside literals
+    assert metrics["method"] == "estimate"
+    assert metrics["functions"] == 1
+    assert metrics["total_complexity"] == 4
+    assert metrics["max_complexity"] == 4
+    assert (metrics["loc"], metrics["comments"], metrics["sloc"]) == (5, 1, 4)
+
+
+def test_unparseable_python_falls_back_to_the_estimate(tmp_path):
+    path = tmp_path / "broken.py"
+    path.write_text("def broken(:\n    if x:\n        pass\n")
+
+    assert analyze_source_file(str(path))["method"] == "estimate"
+
+
+def test_oversized_files_are_skipped(tmp_path):
+    path = tmp_path / "bundle.js"
+    path.write_text("var x = 1;\n" * 100)
+
+    assert analyze_source_file(str(path), max_bytes=64)["skipped"] == "too_large"
+
+
+def test_codebase_walk_skips_vendored_directories(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text(PYTHON_SOURCE)
+    (tmp_path / "src" / "check.js").write_text(JS_SOURCE)
+    (tmp_path / "node_modules" / "lib").mkdir(parents=True)
+    (tmp_path / "node_modules" / "lib" / "index.js").write_text(JS_SOURCE)
+    (tmp_path / "requirements.txt").write_text("flask==3.0.0\n")
+
+    result = CodeAnalyzer(max_workers=1).analyze_codebase(str(tmp_path))
+
+    assert result["total_files"] == 2
+    assert result["languages"] == {"Python": 1, "JavaScript": 1}
+    assert result["complexity_metrics"]["total_lines_of_code"] == 14
+    assert summary(result["dependencies"]) == [("flask", "3.0.0", "web_framework", "runtime")]
+
+
+def test_parallel_metrics_match_serial(tmp_path, monkeypatch):
+    files = []
+    for index in range(6):
+        path = tmp_path / f"module_{index}.py"
+        path.write_text(PYTHON_SOURCE * (index + 1))
+        files.append(str(path))
+
+    serial = CodeAnalyzer(max_workers=1).analyze_complexity(files)
+    monkeypatch.setattr(code_analyzer, "PARALLEL_MIN_FILES", 2)
+    parallel = CodeAnalyzer(max_workers=2).analyze_complexity(files)
+
+    assert parallel == serial
+
+
+def test_high_complexity_files_are_ranked(tmp_path):
+    branches = "".join(f"    if x == {n}:\n        return {n}\n" for n in range(30))
+    (tmp_path / "hot.py").write_text(f"def hot(x):\n{branches}")
+    (tmp_path / "cold.py").write_text(PYTHON_SOURCE)
+    files = [str(tmp_path / "cold.py"), str(tmp_path / "hot.py")]
+
+    complexity = CodeAnalyzer(max_workers=1).analyze_complexity(files)
+
+    assert [entry["file"] for entry in complexity["high_complexity_files"]] == [files[1]]
+    assert complexity["high_complexity_files"][0]["max_complexity"] == 31
+
+
+def test_requirements_strip_markers_extras_and_options(tmp_path):
+    path = tmp_path / "requirements.txt"
+    path.write_text(textwrap.dedent('''\
+        # pinned runtime stack
+        -r base.txt
+        --index-url https://example.com/simple
+        Django==4.2.7 ; python_version >= "3.8"
+        requests[security,socks]>=2.31,<3  # http client
+        uvicorn[standard]
+        boto3===1.34.0
+        -e git+https://github.com/example/tool.git#egg=tool
+        https://example.com/pkg.whl
+    '''))
+
+    assert summary(parse_requirements(str(path))) == [
+        ("Django", "4.2.7", "web_framework", "runtime"),
+        ("requests", ">=2.31,<3", "library", "runtime"),
+        ("uvicorn", "*", "library", "runtime"),
+        ("boto3", "1.34.0", "cloud_sdk", "runtime"),
+    ]
+
+
+def test_requirements_split_files_are_development_scope(tmp_path):
+    path = tmp_path / "requirements-dev.txt"
+    path.write_text("pytest>=7\n")
+
+    assert is_manifest(str(path))
+    assert summary(parse_manifest(str(path))) == [("pytest", ">=7", "testing", "development")]
+
+
+def test_package_json_sections_map_to_scopes(tmp_path):
+    path = tmp_path / "package.json"
+    path.write_text('''{
+        "name": "web",
+        "dependencies": {"express": "^4.18.2", "@aws-sdk/client-s3": "3.400.0"},
+        "devDependencies": {"jest": "^29.0.0"},
+        "optionalDependencies": {"fsevents": "2.3.3"},
+        "peerDependencies": {"react": ">=18"},
+        "bundleDependencies": {"ignored": "1.0.0"}
+    }''')
+
+    assert summary(parse_package_json(str(path))) == [
+        ("express", "^4.18.2", "web_framework", "runtime"),
+        ("@aws-sdk/client-s3", "3.400.0", "cloud_sdk", "runtime"),
+        ("jest", "^29.0.0", "testing", "development"),
+        ("fsevents", "2.3.3", "library", "optional"),
+        ("react", ">=18", "frontend", "peer"),
+    ]
+
+
+def test_pom_resolves_properties(tmp_path):
+    path = tmp_path / "pom.xml"
+    path.write_text(POM)
+
+    assert summary(parse_pom(str(path))) == [
+        ("org.springframework.boot:spring-boot-starter-web", "3.2.1", "web_framework", "runtime"),
+        ("com.example:shared", "2.1.0", "library", "runtime"),
+        # Unknown properties stay as written; the groupId settles the category
+        ("software.amazon.awssdk:s3", "${undefined.version}", "cloud_sdk", "runtime"),
+        ("org.junit.jupiter:junit-jupiter", "*", "testing", "development"),
+    ]
+
+
+def test_csproj_version_as_attribute_or_element(tmp_path):
+    path = tmp_path / "Api.csproj"
+    path.write_text(CSPROJ)
+
+    assert summary(parse_csproj(str(path))) == [
+        ("Npgsql", "8.0.1", "database", "runtime"),
+        ("Dapper", "2.1.28", "database", "runtime"),
+        ("Newtonsoft.Json", "*", "library", "runtime"),
+    ]
+
+
+def test_unreadable_manifests_are_skipped_and_duplicates_merged(tmp_path):
+    broken = tmp_path / "pom.xml"
+    broken.write_text("<project><dependencies>")
+    first = tmp_path / "requirements.txt"
+    first.write_text("Flask==3.0.0\n")
+    second = tmp_path / "requirements-prod.txt"
+    second.write_text("flask==2.0.0\nredis==5.0.1\n")
+
+    assert parse_manifest(str(broken)) == []
+    assert summary(collect_dependencies([str(broken), str(first), str(second)])) == [
+        ("Flask", "3.0.0", "web_framework", "runtime"),
+        ("redis", "5.0.1", "database", "runtime"),
+    ]
+
+
+@pytest.mark.parametrize("filename, expected", [
+    ("requirements.txt", True),
+    ("requirements-test.txt", True),
+    ("package.json", True),
+    ("package-lock.json", False),
+    ("Service.csproj", True),
+    ("notes.txt", False),
+])
+def test_manifest_detection(filename, expected):
+    assert is_manifest(f"/repo/{filename}") is expected
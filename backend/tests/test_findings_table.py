@@ -0,0 +1,46 @@
+import pytest
+
+from analyzers.findings_table import FindingsTable, mean_severity_score
+
+FINDINGS = [
+    {"id": "SEC-001", "severity": "critical"},
+    {"id": "SEC-001", "severity": "critical"},
+    {"id": "SEC-006", "severity": "high"},
+    {"id": "SEC-005", "severity": "medium"},
+    {"id": "X-1", "severity": "bogus"},
+]
+
+
+def test_severity_histogram_counts_unknown_severities_as_medium():
+    histogram = FindingsTable(FINDINGS).severity_histogram()
+    assert histogram == {"critical": 2, "high": 1, "medium": 2, "low": 0}
+
+
+def test_compliance_counts_distinct_violated_rules():
+    status = FindingsTable(FINDINGS).compliance({
+        "PCI-DSS": ["SEC-001", "SEC-002", "SEC-003", "SEC-006"],
+        "HIPAA": ["SEC-002"]
+    })
+
+    assert status["PCI-DSS"] == {"compliant": False, "violations": 2, "compliance_percentage": 50.0}
+    assert status["HIPAA"] == {"compliant": True, "violations": 0, "compliance_percentage": 100.0}
+
+
+def test_framework_without_rules_is_fully_compliant():
+    status = FindingsTable(FINDINGS).compliance({"CUSTOM": []})
+    assert status["CUSTOM"] == {"compliant": True, "violations": 0, "compliance_percentage": 100.0}
+
+
+def test_empty_scan():
+    table = FindingsTable([])
+    aggregates = table.aggregate({"SOC2": ["SEC-001"]})
+
+    assert aggregates["total"] == 0
+    assert aggregates["compliance_status"]["SOC2"]["compliant"] is True
+    assert mean_severity_score(aggregates["severity_histogram"], {s: 1 for s in aggregates["severity_histogram"]}) == 0.0
+
+
+def test_mean_severity_score_weights_by_count():
+    histogram = {"critical": 1, "high": 1, "medium": 0, "low": 2}
+    scores = {"critical": 10, "high": 6, "medium": 3, "low": 1}
+    assert mean_severity_score(histogram, scores) == pytest.approx(18 / 4)
@@ -0,0 +1,89 @@
+import io
+
+import pytest
+
+from analyzers.hcl_parser import HCLParseError, iter_blocks, iter_terraform_blocks, tokenize
+
+MAIN_TF = '''# comment
+resource "aws_instance" "web" {
+  ami       = "ami-${var.region}"   // trailing comment
+  count     = 2
+  encrypted = true
+  tags      = { Name = "web" }
+  ports     = [80, 443]
+  /* block
+     comment */
+  user_data = <<-EOT
+    #!/bin/sh
+    echo hi
+  EOT
+  ebs_block_device {
+    size = 8
+  }
+}
+
+data "aws_ami" "base" {}
+variable "region" { default = "us-east-1" }
+module "vpc" { source = "./vpc" }
+locals { ignored = true }
+'''
+
+
+def test_tokenize_keeps_interpolations_and_skips_comments():
+    tokens = [token for token in tokenize(io.StringIO(MAIN_TF)) if token[0] != "newline"]
+
+    assert tokens[:4] == [("ident", "resource"), ("string", "aws_instance"), ("string", "web"), ("op", "{")]
+    assert ("string", "ami-${var.region}") in tokens
+    assert ("number", 2) in tokens
+    assert not any("comment" in str(value) for _, value in tokens)
+
+
+def test_iter_blocks_parses_nested_values():
+    blocks = list(iter_blocks(io.StringIO(MAIN_TF)))
+    block_type, labels, body = blocks[0]
+
+    assert (block_type, labels) == ("resource", ["aws_instance", "web"])
+    assert body["count"] == 2
+    assert body["encrypted"] is True
+    assert body["tags"] == {"Name": "web"}
+    assert body["ports"] == [80, 443]
+    assert body["user_data"] == "#!/bin/sh\necho hi\n"
+    assert body["ebs_block_device"] == [{"size": 8}]
+    assert [block[0] for block in blocks] == ["resource", "data", "variable", "module", "locals"]
+
+
+def test_iter_terraform_blocks_yields_known_block_kinds():
+    records = list(iter_terraform_blocks(io.StringIO(MAIN_TF)))
+
+    assert [(r["block"], r["type"], r["name"]) for r in records] == [
+        ("resource", "aws_instance", "web"),
+        ("data", "aws_ami", "base"),
+        ("variable", "variable", "region"),
+        ("module", "module", "vpc"),
+    ]
+
+
+def test_malformed_block_header_raises():
+    with pytest.raises(HCLParseError):
+        list(iter_blocks(io.StringIO('resource "aws_instance" "web" = 3 {')))
+
+
+def test_expressions_and_negative_numbers():
+    source = '''resource "aws_instance" "web" {
+  offset = -5
+  empty  = null
+  names  = [for s in var.subnets : s.name]
+  ami    = data.aws_ami.base.id
+}
+'''
+    (_, _, body), = iter_blocks(io.StringIO(source))
+
+    assert body["offset"] == -5
+    assert body["empty"] is None
+    assert body["names"].startswith("[for s in var.subnets")
+    assert body["ami"] == "data.aws_ami.base.id"
+
+
+def test_unterminated_block_raises():
+    with pytest.raises(HCLParseError):
+        list(iter_blocks(io.StringIO('resource "aws_instance" "web" {\n  ami = "x"\n')))
@@ -0,0 +1,124 @@
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from analyzers.infrastructure_analyzer import InfrastructureAnalyzer
+
+VPC_TF = 'resource "aws_vpc" "main" { cidr_block = "10.0.0.0/16" }\n'
+BUCKET_TF = 'resource "aws_s3_bucket" "logs" {}\nvariable "region" {}\n'
+STACK_JSON = '{"Resources": {"Queue": {"Type": "AWS::SQS::Queue"}}}'
+
+
+@pytest.fixture
+def estate(tmp_path):
+    root = tmp_path / "estate"
+    (root / "network").mkdir(parents=True)
+    (root / "main.tf").write_text(BUCKET_TF)
+    (root / "network" / "vpc.tf").write_text(VPC_TF)
+    (root / "stack.json").write_text(STACK_JSON)
+    (root / "README.md").write_text("not infrastructure")
+    (root / "node_modules").mkdir()
+    (root / "node_modules" / "skip.tf").write_text('resource "aws_s3_bucket" "skip" {}\n')
+    return root
+
+
+def analyzer(max_workers: int = 1) -> InfrastructureAnalyzer:
+    return InfrastructureAnalyzer(sample_fallback=False, max_workers=max_workers)
+
+
+def summary(result):
+    return sorted((r["source_file"], r["type"], r["name"]) for r in result["resources"])
+
+
+def test_directory_merges_supported_files(estate):
+    merged = analyzer().analyze_file(str(estate))
+
+    assert summary(merged) == [
+        ("main.tf", "aws_s3_bucket", "logs"),
+        ("network/vpc.tf", "aws_vpc", "main"),
+        ("stack.json", "AWS::SQS::Queue", "Queue")
+    ]
+    assert [v["name"] for v in merged["variables"]] == ["region"]
+    assert merged["metadata"]["total_files"] == 3
+    assert merged["metadata"]["file_types"] == {"terraform": 2, "cloudformation": 1}
+
+
+def test_parallel_parsing_matches_serial(estate):
+    serial = analyzer(1).analyze_file(str(estate))
+    parallel = analyzer(2).analyze_file(str(estate))
+
+    assert parallel["resources"] == serial["resources"]
+    assert parallel["metadata"]["files"] == serial["metadata"]["files"]
+
+
+@pytest.mark.parametrize("suffix", [".tar.gz", ".zip"])
+def test_archives_are_extracted_and_merged(estate, tmp_path, suffix):
+    archive = tmp_path / f"estate{suffix}"
+    if suffix == ".zip":
+        with zipfile.ZipFile(archive, "w") as zf:
+            for path in estate.rglob("*"):
+                if path.is_file():
+                    zf.write(path, os.path.relpath(path, estate.parent))
+    else:
+        with tarfile.open(archive, "w:gz") as tar:
+            tar.add(estate, arcname="estate")
+
+    result = analyzer().analyze_file(str(archive))
+
+    assert summary(result) == [
+        ("estate/main.tf", "aws_s3_bucket", "logs"),
+        ("estate/network/vpc.tf", "aws_vpc", "main"),
+        ("estate/stack.json", "AWS::SQS::Queue", "Queue")
+    ]
+    assert result["metadata"]["root"] == f"estate{suffix}"
+
+
+def test_zip_members_outside_the_root_are_skipped(tmp_path):
+    archive = tmp_path / "evil.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("../escaped.tf", 'resource "aws_s3_bucket" "escaped" {}\n')
+        zf.writestr("inner/../../escaped2.tf", 'resource "aws_s3_bucket" "escaped2" {}\n')
+        zf.writestr("ok/vpc.tf", VPC_TF)
+
+    result = analyzer().analyze_file(str(archive))
+
+    assert [r["name"] for r in result["resources"]] == ["main"]
+    assert not list(tmp_path.parent.glob("escaped*.tf"))
+    assert not list(tmp_path.glob("escaped*.tf"))
+
+
+def test_tar_traversal_and_links_are_skipped(tmp_path):
+    archive = tmp_path / "evil.tar"
+    with tarfile.open(archive, "w") as tar:
+        for name, body in (("../escaped.tf", BUCKET_TF), ("ok/vpc.tf", VPC_TF)):
+            info = tarfile.TarInfo(name)
+            info.size = len(body)
+            tar.addfile(info, io.BytesIO(body.encode()))
+        link = tarfile.TarInfo("ok/passwd.tf")
+        link.type = tarfile.SYMTYPE
+        link.linkname = "/etc/passwd"
+        tar.addfile(link)
+
+    result = analyzer().analyze_file(str(archive))
+
+    assert [r["name"] for r in result["resources"]] == ["main"]
+    assert result["metadata"]["total_files"] == 1
+    assert not (tmp_path.parent / "escaped.tf").exists()
+
+
+def test_unsupported_and_corrupt_archives_report_errors(tmp_path):
+    rar = tmp_path / "estate.rar"
+    rar.write_bytes(b"Rar!\x1a\x07\x00")
+    corrupt = tmp_path / "estate.zip"
+    corrupt.write_bytes(b"not a zip")
+
+    unsupported = analyzer().analyze_file(str(rar))
+    broken = analyzer().analyze_file(str(corrupt))
+
+    assert unsupported["total_resources"] == 0
+    assert "Unsupported file type" in unsupported["metadata"]["error"]
+    assert broken["total_resources"] == 0
+    assert broken["metadata"]["error"]
@@ -0,0 +1,93 @@
+import threading
+
+import pytest
+
+from utils.job_store import AnalysisJobQueue, AnalysisStore, QueueFullError
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AnalysisStore(store_dir=str(tmp_path))
+
+
+def test_record_lifecycle_persists_result(store, tmp_path):
+    store.create("a1", "demo", "aws")
+    assert store.get("a1")["status"] == "queued"
+
+    store.update("a1", status="running")
+    store.complete("a1", {"cost_estimate": {"total_cost": 10}}, {"estimated_cost": 10})
+
+    reloaded = AnalysisStore(store_dir=str(tmp_path))
+    record = reloaded.get("a1")
+    assert record["status"] == "completed"
+    assert record["estimated_cost"] == 10
+    assert record["result"] == {"cost_estimate": {"total_cost": 10}}
+    assert "result" not in reloaded.get("a1", include_result=False)
+
+
+def test_failed_and_unknown_records(store):
+    store.create("a2", "demo", "aws")
+    store.fail("a2", "boom")
+
+    assert store.get("a2")["status"] == "failed"
+    assert store.get("a2")["error"] == "boom"
+    assert store.get("missing") is None
+
+
+def test_queue_runs_job_and_cleans_up(store, tmp_path):
+    staged = tmp_path / "upload.tf"
+    staged.write_text("")
+    store.create("a3", "demo", "aws")
+    queue = AnalysisJobQueue(store, max_workers=1, max_pending=1)
+    try:
+        future = queue.submit("a3", lambda x: {"value": x}, 7,
+                              summarize=lambda result: {"summary": result["value"]},
+                              cleanup_path=str(staged))
+        assert future.result(timeout=5) == {"value": 7}
+    finally:
+        queue.shutdown(wait=True)
+
+    record = store.get("a3")
+    assert record["status"] == "completed"
+    assert record["summary"] == 7
+    assert not staged.exists()
+
+
+def test_queue_records_failure(store):
+    def explode():
+        raise ValueError("bad input")
+
+    store.create("a4", "demo", "aws")
+    queue = AnalysisJobQueue(store, max_workers=1, max_pending=1)
+    try:
+        with pytest.raises(ValueError):
+            queue.submit("a4", explode).result(timeout=5)
+    finally:
+        queue.shutdown(wait=True)
+
+    assert store.get("a4")["status"] == "failed"
+    assert store.get("a4")["error"] == "bad input"
+
+
+def test_queue_rejects_when_full_and_cancels_pending(store):
+    release = threading.Event()
+    queue = AnalysisJobQueue(store, max_workers=1, max_pending=1)
+    try:
+        for analysis_id in ("b1", "b2", "b3"):
+            store.create(analysis_id, "demo", "aws")
+        running = queue.submit("b1", release.wait, 5)
+        queue.submit("b2", lambda: {})
+
+        with pytest.raises(QueueFullError):
+            queue.submit("b3", lambda: {})
+
+        # A cancelled pending job gives its slot back
+        assert queue.cancel("b2")
+        assert store.get("b2")["status"] == "cancelled"
+        queue.submit("b3", lambda: {"ok": True})
+
+        release.set()
+        running.result(timeout=5)
+    finally:
+        queue.shutdown(wait=True)
+    assert store.get("b3")["status"] == "completed"
@@ -0,0 +1,120 @@
+import os
+import time
+import threading
+
+import pytest
+
+import pipeline_backend
+from pipeline_backend import PipelineBackend, ProcessPipelineBackend, ThreadPipelineBackend
+from utils.task_context import PipelineCancelledError, PipelineTimeoutError, checkpoint
+
+
+# Module-level so the process pool's workers can unpickle them
+def sleepy(seconds: float) -> dict:
+    time.sleep(seconds)
+    return {"slept": seconds}
+
+
+def stepwise(steps: int) -> dict:
+    for _ in range(steps):
+        checkpoint()
+        time.sleep(0.05)
+    return {"steps": steps}
+
+
+def worker_pid() -> dict:
+    return {"pid": os.getpid()}
+
+
+@pytest.fixture(scope="module")
+def process_backend():
+    backend = ProcessPipelineBackend(max_workers=1, timeout=0)
+    yield backend
+    backend.shutdown()
+
+
+def test_backends_must_implement_run_and_cancel():
+    with pytest.raises(TypeError):
+        PipelineBackend()
+
+
+def test_process_backend_runs_and_reuses_workers(process_backend):
+    assert process_backend.run("first", sleepy, 0) == {"slept": 0}
+    assert process_backend.run("second", sleepy, 0) == {"slept": 0}
+    assert process_backend.cancel("finished") is False
+
+
+def test_process_backend_cancel_stops_at_the_next_checkpoint(process_backend):
+    pid = process_backend.run("warm", worker_pid)["pid"]
+    threading.Timer(0.5, process_backend.cancel, ("stepwise",)).start()
+    started = time.monotonic()
+
+    with pytest.raises(PipelineCancelledError):
+        process_backend.run("stepwise", stepwise, 1200)
+
+    assert time.monotonic() - started < 5
+    # The worker stopped on its own, so it stays in the pool
+    assert process_backend.run("after-cancel", worker_pid) == {"pid": pid}
+
+
+def test_process_backend_recycles_a_worker_stuck_in_a_stage(process_backend, monkeypatch):
+    monkeypatch.setattr(pipeline_backend, "TIMEOUT_GRACE_SECONDS", 0.5)
+    pid = process_backend.run("warm", worker_pid)["pid"]
+    threading.Timer(0.5, process_backend.cancel, ("blocked",)).start()
+    started = time.monotonic()
+
+    with pytest.raises(PipelineCancelledError):
+        process_backend.run("blocked", sleepy, 60)
+
+    assert time.monotonic() - started < 10
+    assert process_backend.run("after-recycle", worker_pid) != {"pid": pid}
+
+
+def test_process_backend_polls_should_cancel(process_backend):
+    process_backend.run("warm", sleepy, 0)
+    deadline = time.monotonic() + 0.5
+
+    with pytest.raises(PipelineCancelledError):
+        process_backend.run("disconnected", stepwise, 1200, should_cancel=lambda: time.monotonic() > deadline)
+
+
+def test_process_backend_times_out(monkeypatch):
+    monkeypatch.setattr(pipeline_backend, "TIMEOUT_GRACE_SECONDS", 0.5)
+    backend = ProcessPipelineBackend(max_workers=1, timeout=1)
+    try:
+        backend.run("warm", sleepy, 0)
+        started = time.monotonic()
+        with pytest.raises(PipelineTimeoutError):
+            backend.run("slow", stepwise, 1200)
+        with pytest.raises(PipelineTimeoutError):
+            backend.run("stuck", sleepy, 60)
+        assert time.monotonic() - started < 10
+    finally:
+        backend.shutdown()
+
+
+def test_recycling_retries_the_other_tasks_on_the_pool(monkeypatch):
+    monkeypatch.setattr(pipeline_backend, "TIMEOUT_GRACE_SECONDS", 0.5)
+    backend = ProcessPipelineBackend(max_workers=2, timeout=0)
+    results = {}
+    try:
+        backend.run("warm", sleepy, 0)
+        bystander = threading.Thread(target=lambda: results.update(backend.run("bystander", stepwise, 30)))
+        bystander.start()
+        threading.Timer(0.5, backend.cancel, ("blocked",)).start()
+
+        with pytest.raises(PipelineCancelledError):
+            backend.run("blocked", sleepy, 60)
+        bystander.join(20)
+        assert results == {"steps": 30}
+    finally:
+        backend.shutdown()
+
+
+def test_thread_backend_stops_at_the_next_checkpoint():
+    backend = ThreadPipelineBackend(timeout=0)
+    threading.Timer(0.2, backend.cancel, ("stepwise",)).start()
+
+    with pytest.raises(PipelineCancelledError):
+        backend.run("stepwise", stepwise, 200)
+    assert backend.run("quick", stepwise, 1) == {"steps": 1}
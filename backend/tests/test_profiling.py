@@ -0,0 +1,96 @@
+import threading
+import tracemalloc
+
+from utils.profiling import PipelineProfiler, ProfilePolicy, profile_span, profiled_iter
+
+
+def busy_stage():
+    with profile_span("parse"):
+        blocks = [bytearray(1024) for _ in range(256)]
+        total = 0
+        for _ in range(1000000):
+            total += 1
+        return len(blocks), total
+
+
+def test_profiling_is_off_unless_enabled(monkeypatch):
+    monkeypatch.delenv("PROFILING_ENABLED", raising=False)
+    policy = ProfilePolicy(sample_rate=1.0)
+
+    assert policy.enabled is False
+    assert policy.should_profile({"x-profile": "1"}, requested=True) is False
+
+
+def test_enabled_policy_honours_header_query_and_sampling(monkeypatch):
+    monkeypatch.setenv("PROFILING_ENABLED", "true")
+    monkeypatch.setenv("PROFILE_SAMPLE_RATE", "0")
+    policy = ProfilePolicy()
+
+    assert policy.should_profile({"x-profile": "yes"})
+    assert policy.should_profile({}, requested=True)
+    assert not policy.should_profile({"x-profile": "0"})
+    assert ProfilePolicy(sample_rate=1.0).should_profile({})
+
+
+def test_profiler_reports_spans_samples_and_allocations():
+    profiler = PipelineProfiler(interval_ms=1, trace_allocations=True).start()
+
+    def worker():
+        with profiler.attach():
+            busy_stage()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    report = profiler.stop()
+
+    assert [span["name"] for span in report["spans"]] == ["parse"]
+    assert report["spans"][0]["allocated_bytes"] >= 0
+    assert report["samples"] > 0
+    # Stacks start at the frame that attached, not the thread bootstrap
+    assert all(line.startswith("worker (") for line in report["collapsed"].splitlines())
+    assert "busy_stage" in report["collapsed"]
+    assert report["allocation_sites"]
+    assert not tracemalloc.is_tracing()
+
+
+def test_spans_are_no_ops_without_an_attached_profiler():
+    profiler = PipelineProfiler(interval_ms=1, trace_allocations=False).start()
+    busy_stage()
+    report = profiler.stop()
+
+    assert report["spans"] == []
+    assert report["samples"] == 0
+    assert report["allocation_sites"] == []
+
+
+def test_absorb_merges_a_worker_report():
+    worker = PipelineProfiler(interval_ms=1, trace_allocations=False).start()
+    for _ in profiled_iter(worker, (busy_stage() for _ in range(2))):
+        pass
+    parent = PipelineProfiler(interval_ms=1, trace_allocations=False).start()
+    parent.absorb(worker.stop())
+    report = parent.stop()
+
+    assert [span["name"] for span in report["spans"]] == ["parse", "parse"]
+    assert report["samples"] == sum(int(line.rpartition(" ")[2]) for line in report["collapsed"].splitlines())
+
+
+def test_api_profiles_only_when_enabled(client, monkeypatch):
+    import main
+
+    body = b'resource "aws_s3_bucket" "profiling_disabled" {}\n'
+    response = client.post("/api/analyze", files={"file": ("main.tf", body)}, headers={"X-Profile": "1"})
+    assert response.json()["profiled"] is False
+    assert client.get(f"/api/analysis/{response.json()['analysis_id']}/profile").status_code == 404
+
+    monkeypatch.setattr(main, "profile_policy", ProfilePolicy(enabled=True, sample_rate=0))
+    body = b'resource "aws_s3_bucket" "profiling_enabled" {}\n'
+    response = client.post("/api/analyze", files={"file": ("main.tf", body)}, headers={"X-Profile": "1"})
+    assert response.json()["profiled"] is True
+
+    analysis_id = response.json()["analysis_id"]
+    report = client.get(f"/api/analysis/{analysis_id}/profile").json()
+    assert {"analyze_file", "scan", "create_plan"} <= {span["name"] for span in report["spans"]}
+    collapsed = client.get(f"/api/analysis/{analysis_id}/profile", params={"format": "collapsed"})
+    assert collapsed.text == report["collapsed"]
@@ -0,0 +1,96 @@
+import json
+import logging
+
+from utils.prompt_batcher import (
+    TRUNCATION_MARKER, PromptBatcher, estimate_tokens, group_findings, group_resources, merge_responses
+)
+
+
+def size(item) -> int:
+    return estimate_tokens(json.dumps(item, sort_keys=True, separators=(",", ":"))) + 1
+
+
+def test_grouping_collapses_members():
+    findings = [
+        {"id": "SEC-001", "type": "t", "severity": "critical", "resource": "a"},
+        {"id": "SEC-001", "type": "t", "severity": "critical", "resource": "b"},
+        {"id": "SEC-006", "type": "u", "severity": "high", "resource": "c"},
+    ]
+    groups = group_findings(findings)
+    assert [(g["id"], g["resources"], g["count"]) for g in groups] == [
+        ("SEC-001", ["a", "b"], 2), ("SEC-006", ["c"], 1)
+    ]
+
+    resources = [{"type": "aws_instance", "category": "compute", "properties": {}, "name": n} for n in "xy"]
+    assert group_resources(resources) == [
+        {"type": "aws_instance", "category": "compute", "properties": {}, "names": ["x", "y"], "count": 2}
+    ]
+
+
+def test_pack_keeps_order_and_every_chunk_within_budget():
+    batcher = PromptBatcher(max_prompt_tokens=100, max_response_tokens=1000)
+    items = [{"id": position, "text": "x" * 60} for position in range(12)]
+
+    chunks = batcher.pack(items)
+
+    assert len(chunks) > 1
+    assert [item["id"] for chunk in chunks for item in chunk] == list(range(12))
+    assert all(sum(size(item) for item in chunk) <= 100 for chunk in chunks)
+
+
+def test_prompts_carry_part_markers_only_when_split():
+    batcher = PromptBatcher(max_prompt_tokens=120, max_response_tokens=1000)
+
+    single = batcher.build_prompts("Review", [{"id": 1}])
+    assert single == ['Review: [{"id":1}]']
+
+    split = batcher.build_prompts("Review", [{"id": n, "text": "x" * 100} for n in range(6)])
+    assert len(split) > 1
+    assert split[0].startswith(f"Review (part 1 of {len(split)}): ")
+    assert all(estimate_tokens(prompt) <= 120 for prompt in split)
+
+
+def test_oversized_member_list_is_halved():
+    batcher = PromptBatcher(max_prompt_tokens=100, max_response_tokens=1000)
+    group = {"id": "SEC-001", "resources": [f"bucket-{n}" for n in range(200)], "count": 200}
+
+    (chunk,), = batcher.pack([group])
+
+    assert size(chunk) <= 100
+    assert 0 < len(chunk["resources"]) < 200
+    assert chunk["count"] == 200
+
+
+def test_oversized_fields_without_members_are_truncated(caplog):
+    batcher = PromptBatcher(max_prompt_tokens=200, max_response_tokens=1000)
+    resource = {"type": "aws_instance", "properties": {"user_data": "y" * 5000}, "names": ["web"], "count": 1}
+
+    with caplog.at_level(logging.WARNING):
+        (chunk,), = batcher.pack([resource])
+
+    assert size(chunk) <= 200
+    assert chunk["type"] == "aws_instance"
+    assert chunk["properties"].endswith(TRUNCATION_MARKER)
+    assert "properties" in caplog.text
+
+
+def test_items_that_cannot_fit_are_left_out(caplog):
+    batcher = PromptBatcher(max_prompt_tokens=20, max_response_tokens=1000)
+    wide = {f"field_{n}": "value" for n in range(30)}
+
+    with caplog.at_level(logging.WARNING):
+        chunks = batcher.pack([wide, {"id": 1}])
+
+    assert chunks == [[{"id": 1}]]
+    assert "left out" in caplog.text
+
+
+def test_response_budget_is_clamped():
+    batcher = PromptBatcher(max_prompt_tokens=1000, max_response_tokens=2048, min_response_tokens=512)
+    assert batcher.response_tokens("short") == 512
+    assert batcher.response_tokens("x" * 100000) == 2048
+
+
+def test_merge_responses_skips_blanks():
+    assert merge_responses([" a ", "", "b"]) == "a\n\nb"
+    assert merge_responses([]) == ""
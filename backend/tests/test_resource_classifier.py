@@ -0,0 +1,60 @@
+from analyzers.resource_classifier import (
+    LOOKUP_CACHE_SIZE, ResourceClassifier, ensure_classified, lookup_type, resources_in
+)
+
+
+def infra():
+    return {"resources": [
+        {"type": "aws_instance", "name": "web"},
+        {"type": " AWS::S3::Bucket ", "name": "assets"},
+        {"type": "google_sql_database_instance", "name": "db"},
+        {"type": "azurerm_custom_firewall_thing", "name": "fw"},
+        {"type": "null_resource", "name": "noop"},
+    ]}
+
+
+def test_lookup_type_uses_table_then_heuristics():
+    assert lookup_type("aws_instance") == ("compute", "aws", "aws_instance")
+    assert lookup_type(" AWS::S3::Bucket ") == ("storage", "aws", "aws::s3::bucket")
+    assert lookup_type("azurerm_custom_firewall_thing") == ("network", "azure", "azurerm_custom_firewall_thing")
+    assert lookup_type("null_resource") == ("other", "generic", "null_resource")
+
+
+def test_lookup_memo_is_bounded():
+    lookup_type.cache_clear()
+    for position in range(LOOKUP_CACHE_SIZE + 10):
+        lookup_type(f"custom_type_{position}")
+
+    info = lookup_type.cache_info()
+    assert info.maxsize == LOOKUP_CACHE_SIZE
+    assert info.currsize == LOOKUP_CACHE_SIZE
+
+
+def test_classify_tags_resources_and_indexes_categories():
+    results = infra()
+    classification = ResourceClassifier().classify(results)
+
+    assert classification["by_category"] == {
+        "compute": [0], "database": [2], "storage": [1], "network": [3], "other": [4]
+    }
+    assert classification["counts"]["storage"] == 1
+    assert results["classification"] is classification
+    assert results["resources"][1]["normalized_type"] == "aws::s3::bucket"
+    assert results["resources"][2]["provider"] == "gcp"
+
+
+def test_index_is_reused_until_resources_change(monkeypatch):
+    results = infra()
+    first = ensure_classified(results)
+
+    calls = []
+    original = ResourceClassifier.classify
+    monkeypatch.setattr(ResourceClassifier, "classify", lambda self, data: calls.append(1) or original(self, data))
+
+    assert ensure_classified(results) is first
+    assert [r["name"] for r in resources_in(results, "compute")] == ["web"]
+    assert calls == []
+
+    results["resources"].append({"type": "aws_lambda_function", "name": "fn"})
+    assert ensure_classified(results)["by_category"]["compute"] == [0, 5]
+    assert calls == [1]
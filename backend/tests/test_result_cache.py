@@ -0,0 +1,66 @@
+import os
+
+from utils.result_cache import ResultCache
+
+
+def test_key_ignores_list_order():
+    assert ResultCache.make_key("digest", "tf", ["hipaa", "pci"]) == ResultCache.make_key("digest", "tf", ["pci", "hipaa"])
+    assert ResultCache.make_key("digest", "tf", "aws") != ResultCache.make_key("digest", "tf", "gcp")
+
+
+def test_memory_tier_hits_misses_and_lru_eviction():
+    cache = ResultCache(max_entries=2, ttl_seconds=60, backend="memory")
+
+    assert cache.get("a") is None
+    cache.set("a", {"n": 1})
+    cache.set("b", {"n": 2})
+    assert cache.get("a") == {"n": 1}  # "a" is now most recently used
+    cache.set("c", {"n": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"n": 1}
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2
+    assert stats["memory_hits"] == 2
+    assert stats["misses"] == 2
+
+
+def test_disk_tier_serves_after_memory_eviction(tmp_path, monkeypatch):
+    monkeypatch.setenv("RESULT_CACHE_DIR", str(tmp_path))
+    cache = ResultCache(max_entries=1, ttl_seconds=60, backend="disk")
+
+    cache.set("a", {"n": 1})
+    cache.set("b", {"n": 2})  # evicts "a" from memory only
+
+    assert cache.get("a") == {"n": 1}
+    stats = cache.stats()
+    assert stats["backend"] == "disk"
+    assert stats["backend_hits"] == 1
+
+    # A fresh process-level cache still finds both on disk
+    assert ResultCache(max_entries=1, ttl_seconds=60, backend="disk").get("b") == {"n": 2}
+
+
+def test_expired_entries_are_dropped(tmp_path, monkeypatch):
+    monkeypatch.setenv("RESULT_CACHE_DIR", str(tmp_path))
+    cache = ResultCache(max_entries=4, ttl_seconds=60, backend="disk")
+    cache.set("a", {"n": 1})
+    cache.ttl_seconds = cache.backend.ttl_seconds = -1
+    cache._entries["a"] = (0, {"n": 1})
+
+    assert cache.get("a") is None
+    assert not (tmp_path / "results" / "a.json").exists()
+
+
+def test_cache_hits_keep_the_upload_like_misses(client):
+    import main
+
+    body = b'resource "aws_s3_bucket" "cache_hit_upload" {}\n'
+    first = client.post("/api/analyze", files={"file": ("main.tf", body)}).json()
+    second = client.post("/api/analyze", files={"file": ("main.tf", body)}).json()
+    assert second["cached"] is True
+
+    for analysis in (first, second):
+        upload = os.path.join(main.upload_spooler.upload_dir, f"{analysis['analysis_id']}_main.tf")
+        assert os.path.exists(upload)
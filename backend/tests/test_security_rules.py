@@ -0,0 +1,126 @@
+import pytest
+
+from analyzers.security_rules import DEFAULT_RULES, RuleEngine, compile_predicate, normalize_property
+from analyzers.security_scanner import SecurityScanner
+
+# Findings the hand-coded scanner produced for an unencrypted public bucket
+# and an open security group; the engine must keep their exact shape
+LEGACY_STORAGE_FINDINGS = [
+    {
+        "id": "SEC-001",
+        "type": "Unencrypted Storage",
+        "severity": "critical",
+        "resource": "assets",
+        "description": "Storage resource is not encrypted at rest",
+        "remediation": "Enable encryption using AWS KMS or equivalent",
+        "compliance_impact": ["SOC2", "HIPAA", "PCI-DSS"]
+    },
+    {
+        "id": "SEC-003",
+        "type": "Public Access Enabled",
+        "severity": "critical",
+        "resource": "assets",
+        "description": "Resource allows public access",
+        "remediation": "Restrict access to authorized users/services only",
+        "compliance_impact": ["SOC2", "HIPAA", "PCI-DSS"]
+    }
+]
+LEGACY_NETWORK_FINDING = {
+    "id": "SEC-006",
+    "type": "Overly Permissive Firewall",
+    "severity": "high",
+    "resource": "web",
+    "description": "Security group allows traffic from 0.0.0.0/0",
+    "remediation": "Implement least privilege network access",
+    "compliance_impact": ["PCI-DSS"]
+}
+LEGACY_FRAMEWORKS = {
+    "SOC2": ["SEC-001", "SEC-002", "SEC-003", "SEC-004"],
+    "HIPAA": ["SEC-001", "SEC-002", "SEC-003"],
+    "PCI-DSS": ["SEC-001", "SEC-002", "SEC-003", "SEC-004", "SEC-006"]
+}
+
+RESOURCES = [
+    {"type": "aws_s3_bucket", "name": "assets", "properties": {"acl": "public-read"}},
+    {"type": "aws_s3_bucket", "name": "logs", "properties": {
+        "server_side_encryption_configuration": [{"rule": {}}], "acl": "private"
+    }},
+    {"type": "AWS::RDS::DBInstance", "name": "db", "properties": {"StorageEncrypted": True}},
+    {"type": "aws_security_group", "name": "web", "properties": {
+        "ingress": [{"from_port": 443, "cidr_blocks": ["0.0.0.0/0"]}]
+    }},
+    {"type": "aws_security_group", "name": "internal", "properties": {
+        "ingress": [{"cidr_blocks": ["10.0.0.0/8"]}]
+    }},
+    {"type": "aws_security_group_rule", "name": "egress-all", "properties": {
+        "type": "egress", "cidr_blocks": ["0.0.0.0/0"]
+    }},
+    {"type": "aws_lb_listener", "name": "http", "properties": {"protocol": "HTTP"}},
+    {"type": "aws_iam_policy", "name": "admin", "properties": {
+        "policy": '{"Statement": [{"Effect": "Allow", "Action": "*", "Resource": "*"}]}'
+    }},
+    {"type": "aws_subnet", "name": "public", "properties": {"map_public_ip_on_launch": True}},
+    {"type": "aws_instance", "name": "app", "properties": {"instance_type": "t3.micro"}}
+]
+
+
+def scan(resources):
+    return SecurityScanner().scan({"resources": [dict(resource) for resource in resources]})
+
+
+def test_findings_keep_the_legacy_shape():
+    findings = scan(RESOURCES[:1] + RESOURCES[3:4])["findings"]
+    assert findings == LEGACY_STORAGE_FINDINGS + [LEGACY_NETWORK_FINDING]
+
+
+def test_compliance_frameworks_match_the_legacy_table():
+    scanner = SecurityScanner()
+    assert scanner.compliance_frameworks == LEGACY_FRAMEWORKS
+    assert {family: [rule["id"] for rule in rules] for family, rules in scanner.security_rules.items()} == {
+        "encryption": ["SEC-001", "SEC-002"],
+        "access_control": ["SEC-003", "SEC-004"],
+        "network": ["SEC-005", "SEC-006"]
+    }
+
+
+def test_rules_fire_only_on_misconfigured_resources():
+    fired = [(finding["id"], finding["resource"]) for finding in scan(RESOURCES)["findings"]]
+    assert fired == [
+        ("SEC-001", "assets"), ("SEC-003", "assets"),
+        ("SEC-006", "web"),
+        ("SEC-002", "http"),
+        ("SEC-004", "admin"),
+        ("SEC-005", "public")
+    ]
+
+
+def test_no_findings_falls_back_to_the_legacy_samples():
+    result = scan([RESOURCES[1], RESOURCES[-1]])
+    assert [finding["id"] for finding in result["findings"]] == ["SEC-001", "SEC-003", "SEC-005"]
+    assert result["risk_assessment"]["overall_risk"] == "critical"
+    assert result["compliance_status"]["SOC2"]["violations"] == 2
+
+
+def test_indexed_evaluation_matches_testing_every_rule():
+    scanner = SecurityScanner()
+    classified = {"resources": [dict(resource) for resource in RESOURCES]}
+    scanner.scan(classified)
+    engine = scanner.rule_engine
+
+    brute_force = []
+    for resource in classified["resources"]:
+        props = {normalize_property(name): value for name, value in resource["properties"].items()}
+        for rule in DEFAULT_RULES:
+            selector = rule["selector"]
+            applies = (resource["normalized_type"] in [t.lower() for t in selector.get("types", [])] or
+                       resource["category"] in selector.get("categories", []))
+            if applies and compile_predicate(rule["predicate"])(props):
+                brute_force.append(engine.create_finding(rule, resource))
+
+    assert engine.evaluate(classified["resources"]) == brute_force
+    assert engine.candidates("aws_instance", "compute") == ()
+
+
+def test_invalid_severity_is_rejected():
+    with pytest.raises(ValueError):
+        RuleEngine([{"id": "X-1", "severity": "urgent"}])
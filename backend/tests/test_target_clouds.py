@@ -0,0 +1,41 @@
+import pytest
+
+from pipeline import SUPPORTED_CLOUDS, UnsupportedCloudError, parse_target_clouds
+
+
+@pytest.mark.parametrize("target_cloud, expected", [
+    ("aws", ["aws"]),
+    (" GCP ", ["gcp"]),
+    ("all", list(SUPPORTED_CLOUDS)),
+    ("azure, aws,azure", ["azure", "aws"]),
+    ("", ["aws"]),
+    (",", ["aws"]),
+])
+def test_parse_target_clouds(target_cloud, expected):
+    assert parse_target_clouds(target_cloud) == expected
+
+
+@pytest.mark.parametrize("target_cloud", ["oracle", "aws,foo", "all,aws"])
+def test_unknown_clouds_are_rejected(target_cloud):
+    with pytest.raises(UnsupportedCloudError):
+        parse_target_clouds(target_cloud)
+
+
+@pytest.mark.parametrize("endpoint", ["/api/analyze", "/api/analyze/submit", "/api/analyze/stream"])
+def test_endpoints_reject_unknown_clouds(client, endpoint):
+    response = client.post(
+        f"{endpoint}?target_cloud=aws,oracle",
+        files={"file": ("main.tf", b'resource "aws_instance" "web" {}\n')}
+    )
+
+    assert response.status_code == 400
+    assert "oracle" in response.json()["detail"]
+
+
+def test_retarget_rejects_unknown_clouds(client):
+    analysis = client.post(
+        "/api/analyze", files={"file": ("main.tf", b'resource "aws_instance" "web" {}\n')}
+    ).json()
+
+    response = client.post(f"/api/analysis/{analysis['analysis_id']}/retarget", json={"target_cloud": "oracle"})
+    assert response.status_code == 400
@@ -0,0 +1,75 @@
+import os
+import asyncio
+
+import pytest
+
+from utils.job_store import QueueFullError
+from utils.uploads import UploadSpooler, UploadTooLargeError, parse_size
+
+TF = b'resource "aws_instance" "web" {}\n'
+
+
+class FakeUpload:
+    def __init__(self, filename: str, body: bytes):
+        self.filename = filename
+        self.body = body
+
+    async def read(self, size: int) -> bytes:
+        chunk, self.body = self.body[:size], self.body[size:]
+        return chunk
+
+
+def uploads(client):
+    import main
+    return set(os.listdir(main.upload_spooler.upload_dir))
+
+
+@pytest.mark.parametrize("value, expected", [("100MB", 100 * 1024 ** 2), ("512k", 512 * 1024), (" 42 ", 42)])
+def test_parse_size(value, expected):
+    assert parse_size(value) == expected
+
+
+def test_spool_upload_hashes_in_chunks_and_rejects_oversized(tmp_path):
+    spooler = UploadSpooler(upload_dir=str(tmp_path), max_bytes=64, chunk_size=8)
+
+    staged = asyncio.run(spooler.spool_upload("a1", FakeUpload("main.tf", TF)))
+    assert staged["size"] == len(TF)
+    assert staged["cleanup_path"] is None
+    assert open(staged["path"], "rb").read() == TF
+
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(spooler.spool_upload("a2", FakeUpload("big.tf", b"x" * 65)))
+    assert os.listdir(tmp_path) == ["a1_main.tf"]
+
+
+def test_spool_text_is_temporary(tmp_path):
+    spooler = UploadSpooler(upload_dir=str(tmp_path), max_bytes=64, chunk_size=8)
+    staged = spooler.spool_text(TF.decode())
+    assert staged["cleanup_path"] == staged["path"]
+    spooler.discard(staged["path"])
+    assert not os.path.exists(staged["path"])
+
+    with pytest.raises(UploadTooLargeError):
+        spooler.spool_text("x" * 65)
+
+
+def test_rejected_target_cloud_discards_the_upload(client):
+    before = uploads(client)
+    response = client.post("/api/analyze/submit?target_cloud=oracle", files={"file": ("main.tf", TF)})
+
+    assert response.status_code == 400
+    assert uploads(client) == before
+
+
+def test_full_queue_discards_the_upload(client, monkeypatch):
+    import main
+
+    def full(*args, **kwargs):
+        raise QueueFullError("Analysis queue is full")
+
+    before = uploads(client)
+    monkeypatch.setattr(main.job_queue, "submit", full)
+    response = client.post("/api/analyze/submit", files={"file": ("full.tf", b'resource "aws_vpc" "full" {}\n')})
+
+    assert response.status_code == 503
+    assert uploads(client) == before
@@ -0,0 +1,44 @@
+import io
+
+from analyzers.yaml_loader import load_infrastructure_yaml
+
+MANIFEST = '''apiVersion: v1
+kind: List
+items:
+  - apiVersion: apps/v1
+    kind: Deployment
+    metadata: {name: web, namespace: shop}
+  - apiVersion: v1
+    kind: ~
+    metadata: {name: broken}
+---
+apiVersion: v1
+kind: ~
+metadata: {name: null-kind}
+---
+apiVersion: v1
+kind: 3
+---
+apiVersion: v1
+kind: Service
+metadata: {name: web}
+'''
+
+
+def test_lists_unwrap_and_non_string_kinds_are_skipped():
+    parsed = load_infrastructure_yaml(io.StringIO(MANIFEST))
+
+    assert parsed["file_type"] == "kubernetes"
+    assert parsed["documents"] == 4
+    assert parsed["kinds"] == {"Deployment": 1, "Service": 1}
+    assert [resource["name"] for resource in parsed["resources"]] == ["shop/web", "web"]
+    assert parsed["resources"][0]["type"] == "kubernetes_deployment"
+
+
+def test_cloudformation_yaml():
+    parsed = load_infrastructure_yaml(io.StringIO(
+        "Resources:\n  Bucket:\n    Type: AWS::S3::Bucket\n    Properties: {BucketName: b}\n"
+    ))
+
+    assert parsed["file_type"] == "cloudformation"
+    assert parsed["resources"] == [{"type": "AWS::S3::Bucket", "name": "Bucket", "properties": {"BucketName": "b"}}]
@@ -1,17 +1,71 @@
 import os
+import json
+import asyncio
 import logging
-from typing import Dict, Optional
+import threading
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing, closing
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
 from .demo_mode import is_demo_mode, get_demo_client
+from .result_cache import ResultCache
+from .serialization import json_default
+from .metrics import track_bedrock_call
+from .prompt_batcher import PromptBatcher, group_findings, group_resources, merge_responses
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MODEL = 'anthropic.claude-3-5-sonnet-20241022-v2:0'
+
+# Per-run fields that would make otherwise identical prompts differ
+VOLATILE_KEYS = frozenset({
+    "analysis_id", "scan_timestamp", "created_at", "started_at", "completed_at", "start_date", "end_date"
+})
+
+
+def canonicalize(value: Any) -> Any:
+    """
+    Normalize prompt inputs so equivalent data serializes identically:
+    volatile keys dropped, strings trimmed, floats rounded and list/set
+    members put in a stable order
+    """
+    if isinstance(value, Mapping):
+        return {str(k): canonicalize(v) for k, v in value.items() if k not in VOLATILE_KEYS}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [canonicalize(v) for v in value]
+        return sorted(items, key=lambda item: json.dumps(item, sort_keys=True, default=json_default))
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, float):
+        return round(value, 6)
+    return value
+
+
+def canonical_json(value: Any) -> str:
+    return json.dumps(canonicalize(value), sort_keys=True, separators=(",", ":"), default=json_default)
+
 class AIClient:
     """
     AI Client that automatically switches between demo mode and production
     """
     
-    def __init__(self):
+    def __init__(self, max_connections: Optional[int] = None, max_concurrency: Optional[int] = None):
         self.demo_mode = is_demo_mode()
+        self.model_id = os.getenv('BEDROCK_MODEL', DEFAULT_MODEL)
+        self.max_tokens = int(os.getenv('BEDROCK_MAX_TOKENS', 4096))
+        self.max_connections = max_connections or int(os.getenv('BEDROCK_MAX_CONNECTIONS', 16))
+        self.max_concurrency = max_concurrency or int(os.getenv('AI_MAX_CONCURRENCY', 4))
+        
+        # Blocking invocations are offloaded here; one thread per pooled connection
+        self.executor = ThreadPoolExecutor(max_workers=self.max_connections, thread_name_prefix="bedrock")
+        self.cache = ResultCache(
+            max_entries=int(os.getenv('AI_CACHE_SIZE', 1024)),
+            ttl_seconds=int(os.getenv('AI_CACHE_TTL', 7 * 24 * 3600)),
+            backend=os.getenv('AI_CACHE_BACKEND', 'disk'),
+            namespace="prompts"
+        )
+        self.batcher = PromptBatcher(max_response_tokens=self.max_tokens)
         
         if self.demo_mode:
             logger.info("Running in DEMO MODE - No AWS credentials required!")
@@ -26,11 +80,21 @@ class AIClient:
         """
         try:
             import boto3
+            from botocore.config import Config
+            
+            config = Config(
+                max_pool_connections=self.max_connections,
+                connect_timeout=int(os.getenv('BEDROCK_CONNECT_TIMEOUT', 5)),
+                read_timeout=int(os.getenv('BEDROCK_READ_TIMEOUT', 120)),
+                retries={'max_attempts': int(os.getenv('BEDROCK_MAX_ATTEMPTS', 3)), 'mode': 'adaptive'}
+            )
             return boto3.client(
                 'bedrock-runtime',
                 region_name=os.getenv('AWS_REGION', 'us-east-1'),
                 aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-                aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
+                aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+                endpoint_url=os.getenv('BEDROCK_ENDPOINT_URL') or None,
+                config=config
             )
         except Exception as e:
             logger.warning(f"Failed to initialize Bedrock client: {e}")
@@ -47,58 +111,276 @@ class AIClient:
         else:
             return self._invoke_bedrock(prompt, context)
     
-    def _invoke_bedrock(self, prompt: str, context: Optional[Dict]) -> str:
+    def _invoke_bedrock(self, prompt: str, context: Optional[Dict], max_tokens: Optional[int] = None,
+                        key_material: Any = None) -> str:
         """
-        Invoke AWS Bedrock (production mode only)
+        Invoke AWS Bedrock (production mode only), answering repeated
+        prompts from the response cache. key_material, when given, is what
+        the prompt was built from; its canonical form keys the cache so
+        equivalent inputs share a response while the prompt itself carries
+        the data exactly as passed
         """
+        max_tokens = max_tokens or self.max_tokens
+        semantic = canonical_json(key_material) if key_material is not None else prompt
+        key = ResultCache.make_key(self.model_id, max_tokens, semantic)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached["text"]
+        
         try:
-            import json
-            
-            response = self.client.invoke_model(
-                modelId=os.getenv('BEDROCK_MODEL', 'anthropic.claude-3-5-sonnet-20241022-v2:0'),
-                body=json.dumps({
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 4096,
-                    "messages": [
-                        {"role": "user", "content": prompt}
-                    ]
-                })
-            )
-            
-            result = json.loads(response['body'].read())
-            return result['content'][0]['text']
-            
+            with track_bedrock_call("invoke"):
+                response = self.client.invoke_model(
+                    modelId=self.model_id,
+                    body=self._request_body(prompt, max_tokens)
+                )
+                
+                result = json.loads(response['body'].read())
+                text = result['content'][0]['text']
         except Exception as e:
             logger.error(f"Bedrock invocation failed: {e}")
             return "Analysis completed with limited AI capabilities."
+        
+        self.cache.set(key, {"text": text})
+        return text
+    
+    def _request_body(self, prompt: str, max_tokens: int) -> str:
+        return json.dumps({
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": max_tokens,
+            "messages": [
+                {"role": "user", "content": prompt}
+            ]
+        })
+    
+    def iter_stream(self, prompt: str, max_tokens: Optional[int] = None) -> Iterator[str]:
+        """
+        Yield completion text as it is generated, using
+        invoke_model_with_response_stream in production mode
+        """
+        if self.demo_mode:
+            yield from self.client.stream(prompt, {})
+            return
+        
+        max_tokens = max_tokens or self.max_tokens
+        key = ResultCache.make_key(self.model_id, max_tokens, prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached["text"]
+            return
+        
+        parts = []
+        try:
+            with track_bedrock_call("stream"):
+                response = self.client.invoke_model_with_response_stream(
+                    modelId=self.model_id,
+                    body=self._request_body(prompt, max_tokens)
+                )
+                # Closing the generator early also closes the HTTP stream
+                with closing(response['body']) as events:
+                    for event in events:
+                        chunk = event.get('chunk')
+                        if not chunk:
+                            continue
+                        payload = json.loads(chunk['bytes'])
+                        if payload.get('type') == 'content_block_delta':
+                            text = payload.get('delta', {}).get('text', '')
+                            if text:
+                                parts.append(text)
+                                yield text
+        except Exception as e:
+            logger.error(f"Bedrock streaming invocation failed: {e}")
+            if not parts:
+                yield "Analysis completed with limited AI capabilities."
+            return
+        
+        self.cache.set(key, {"text": "".join(parts)})
+    
+    async def astream(self, prompt: str, max_tokens: Optional[int] = None) -> AsyncIterator[str]:
+        """
+        Async iterator over iter_stream(); the blocking event stream is read
+        on the invocation pool and handed over through a queue
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+        stopped = threading.Event()
+        
+        def produce():
+            stream = self.iter_stream(prompt, max_tokens)
+            try:
+                for text in stream:
+                    if stopped.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, text)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                stream.close()
+                if not stopped.is_set():
+                    loop.call_soon_threadsafe(queue.put_nowait, done)
+        
+        producer = self.executor.submit(produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # The consumer went away (client disconnect, cancellation): stop
+            # reading the event stream instead of draining it into the queue
+            stopped.set()
+            producer.cancel()
+    
+    async def astream_batched(self, instruction: str, items: List[Dict]) -> AsyncIterator[str]:
+        """
+        Stream the responses to each token-budgeted prompt for items, one
+        prompt after another so the text arrives in order
+        """
+        prompts = self.batcher.build_prompts(instruction, items)
+        for position, prompt in enumerate(prompts):
+            if position:
+                yield "\n\n"
+            async with aclosing(self.astream(prompt, self.batcher.response_tokens(prompt))) as stream:
+                async for text in stream:
+                    yield text
+    
+    def _invoke_batched(self, instruction: str, items: List[Dict], key_context: Any = None) -> str:
+        """
+        Split items into prompts that fit the token budget, invoke the
+        chunks concurrently and merge the responses in chunk order. Each
+        chunk is cached under its canonical content plus key_context (the
+        instruction by default)
+        """
+        chunks = self.batcher.build_chunks(instruction, items)
+        key_context = instruction if key_context is None else key_context
+        
+        def invoke(position: int, prompt: str, chunk: List[Dict]) -> str:
+            return self._invoke_bedrock(prompt, {}, self.batcher.response_tokens(prompt),
+                                        key_material={"context": key_context, "part": position, "parts": len(chunks), "items": chunk})
+        
+        if len(chunks) == 1:
+            return invoke(1, *chunks[0])
+        
+        logger.info(f"Splitting '{instruction}' into {len(chunks)} prompts")
+        with ThreadPoolExecutor(max_workers=min(len(chunks), self.max_concurrency),
+                                thread_name_prefix="bedrock-chunk") as pool:
+            responses = list(pool.map(
+                lambda numbered: invoke(numbered[0], *numbered[1]),
+                enumerate(chunks, start=1)
+            ))
+        return merge_responses(responses)
     
     def get_security_assessment(self, findings):
         if self.demo_mode:
             return self.client.get_security_assessment(findings)
         else:
-            return self._invoke_bedrock(f"Security assessment for: {findings}", {})
+            return self._invoke_batched("Security assessment for findings", group_findings(findings))
     
     def get_cost_optimization(self, resources):
         if self.demo_mode:
             return self.client.get_cost_optimization(resources)
         else:
-            return self._invoke_bedrock(f"Cost optimization for: {resources}", {})
+            return self._invoke_batched("Cost optimization for resources", group_resources(resources))
     
     def get_architecture_design(self, infrastructure):
         if self.demo_mode:
             return self.client.get_architecture_design(infrastructure)
+        elif isinstance(infrastructure, dict) and isinstance(infrastructure.get("resources"), list):
+            overview = {k: v for k, v in infrastructure.items() if k not in ("resources", "classification")}
+            return self._invoke_batched(
+                f"Architecture design for infrastructure {json.dumps(overview, default=json_default)} with resources",
+                group_resources(infrastructure["resources"]),
+                key_context=["Architecture design", overview]
+            )
         else:
-            return self._invoke_bedrock(f"Architecture design for: {infrastructure}", {})
+            return self._invoke_bedrock(
+                f"Architecture design for: {json.dumps(infrastructure, default=json_default)}", {},
+                key_material=["Architecture design", infrastructure]
+            )
     
     def get_migration_strategy(self, complexity):
         if self.demo_mode:
             return self.client.get_migration_strategy(complexity)
         else:
-            return self._invoke_bedrock(f"Migration strategy for {complexity} complexity", {})
+            return self._invoke_bedrock(
+                f"Migration strategy for {complexity} complexity", {},
+                key_material=["Migration strategy", str(complexity).strip().lower()]
+            )
+    
+    def cache_stats(self) -> Dict:
+        return self.cache.stats()
+    
+    async def run(self, fn: Callable, *args) -> Any:
+        """
+        Run a blocking client call on the invocation pool
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(fn, *args))
+    
+    async def aanalyze(self, prompt: str, context: Optional[Dict] = None) -> str:
+        return await self.run(self.analyze, prompt, context)
+    
+    async def gather(self, calls: Dict[str, Tuple[Callable, tuple]],
+                     max_concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Run named client calls concurrently, at most max_concurrency at a time
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+        
+        async def bounded(fn: Callable, args: tuple):
+            async with semaphore:
+                return await self.run(fn, *args)
+        
+        names = list(calls)
+        results = await asyncio.gather(*(bounded(fn, args) for fn, args in calls.values()))
+        return dict(zip(names, results))
+    
+    async def gather_insights(self, findings, resources, infrastructure, complexity: str,
+                              max_concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Security, cost, architecture and migration insights for one analysis
+        in a single concurrent round
+        """
+        return await self.gather({
+            "security": (self.get_security_assessment, (findings,)),
+            "cost": (self.get_cost_optimization, (resources,)),
+            "architecture": (self.get_architecture_design, (infrastructure,)),
+            "migration": (self.get_migration_strategy, (complexity,))
+        }, max_concurrency)
+    
+    def insights(self, findings, resources, infrastructure, complexity: str) -> Dict[str, Any]:
+        """
+        gather_insights() for synchronous callers such as pipeline stages,
+        which run on worker threads without an event loop
+        """
+        return asyncio.run(self.gather_insights(findings, resources, infrastructure, complexity))
+    
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_shared_client: Optional[AIClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_ai_client() -> AIClient:
+    """
+    Get the shared AI client instance (auto-detects demo vs production mode)
+    """
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = AIClient()
+    return _shared_client
 
 
-def get_ai_client():
+def shared_cache_stats() -> Optional[Dict]:
     """
-    Get AI client instance (auto-detects demo vs production mode)
+    Cache stats of the shared client, or None before anything has created it
     """
-    return AIClient()
+    client = _shared_client
+    return client.cache_stats() if client is not None else None
@@ -1,8 +1,14 @@
 import os
+import re
+import json
+import time
+import hashlib
 import logging
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional
 import random
 
+from .serialization import json_default
+
 logger = logging.getLogger(__name__)
 
 DEMO_MODE = os.getenv("DEMO_MODE", "true").lower() == "true"
@@ -11,9 +17,21 @@ class DemoAIClient:
     """
     Mock AI client for demo mode - no AWS credentials needed!
     Provides realistic responses without external API calls.
+    
+    Responses are derived from a hash of DEMO_SEED and the inputs, so the
+    same inputs always get the same answer. An optional latency model
+    (DEMO_LATENCY_MS plus DEMO_TOKEN_MS per word, DEMO_LATENCY_JITTER_MS
+    of input-derived jitter) makes demo mode a repeatable stand-in for
+    model latency.
     """
     
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None, latency_ms: Optional[float] = None,
+                 jitter_ms: Optional[float] = None, token_ms: Optional[float] = None):
+        self.seed = seed if seed is not None else int(os.getenv("DEMO_SEED", 0))
+        self.latency_ms = latency_ms if latency_ms is not None else float(os.getenv("DEMO_LATENCY_MS", 0))
+        self.jitter_ms = jitter_ms if jitter_ms is not None else float(os.getenv("DEMO_LATENCY_JITTER_MS", 0))
+        self.token_ms = token_ms if token_ms is not None else float(os.getenv("DEMO_TOKEN_MS", 0))
+        
         self.responses = {
             "security_analysis": [
                 "Critical security finding: Unencrypted S3 bucket detected. This poses a significant data exposure risk.",
@@ -38,21 +56,56 @@ class DemoAIClient:
             ]
         }
     
-    def analyze(self, prompt: str, context: Dict) -> str:
+    def _rng(self, *inputs) -> random.Random:
         """
-        Generate realistic AI response based on context
+        Random generator seeded from DEMO_SEED and the call inputs
         """
+        material = json.dumps([self.seed, inputs], sort_keys=True, default=json_default)
+        return random.Random(hashlib.sha256(material.encode()).hexdigest())
+    
+    def _first_token_delay(self, rng: random.Random) -> float:
+        return max(self.latency_ms + rng.uniform(-self.jitter_ms, self.jitter_ms), 0.0) / 1000
+    
+    def _simulate_latency(self, rng: random.Random, response) -> None:
+        if not (self.latency_ms or self.jitter_ms or self.token_ms):
+            return
+        words = len(json.dumps(response, default=json_default).split())
+        time.sleep(self._first_token_delay(rng) + words * self.token_ms / 1000)
+    
+    def _respond(self, prompt: str) -> str:
         if "security" in prompt.lower():
-            return random.choice(self.responses["security_analysis"])
+            choices = self.responses["security_analysis"]
         elif "cost" in prompt.lower():
-            return random.choice(self.responses["cost_analysis"])
+            choices = self.responses["cost_analysis"]
         elif "architecture" in prompt.lower():
-            return random.choice(self.responses["architecture"])
+            choices = self.responses["architecture"]
         else:
-            return random.choice(self.responses["migration_plan"])
+            choices = self.responses["migration_plan"]
+        return self._rng("analyze", prompt).choice(choices)
+    
+    def analyze(self, prompt: str, context: Dict) -> str:
+        """
+        Generate realistic AI response based on context
+        """
+        response = self._respond(prompt)
+        self._simulate_latency(self._rng("latency", prompt), response)
+        return response
+    
+    def stream(self, prompt: str, context: Dict) -> Iterator[str]:
+        """
+        Yield the analyze() response word by word, like a streamed completion
+        """
+        rng = self._rng("latency", prompt)
+        if self.latency_ms or self.jitter_ms:
+            time.sleep(self._first_token_delay(rng))
+        
+        for word in re.findall(r"\S+\s*", self._respond(prompt)):
+            if self.token_ms:
+                time.sleep(self.token_ms / 1000)
+            yield word
     
     def get_security_assessment(self, findings: List[Dict]) -> Dict:
-        return {
+        response = {
             "analysis": "Comprehensive security analysis completed. Multiple findings identified across encryption, access control, and network security domains.",
             "recommendations": [
                 "Enable encryption at rest for all storage resources",
@@ -65,12 +118,14 @@ class DemoAIClient:
                 "Implement security automation for continuous compliance"
             ]
         }
+        self._simulate_latency(self._rng("latency", findings), response)
+        return response
     
     def get_cost_optimization(self, resources: List[Dict]) -> Dict:
-        base_cost = len(resources) * 15000 + random.randint(50000, 100000)
+        base_cost = len(resources) * 15000 + self._rng("cost", resources).randint(50000, 100000)
         savings = base_cost * 0.25
         
-        return {
+        response = {
             "analysis": f"Infrastructure analysis reveals opportunities for ${savings:,.0f} in annual savings.",
             "recommendations": [
                 f"Right-size EC2 instances: Save ${savings * 0.4:,.0f}/year",
@@ -79,9 +134,11 @@ class DemoAIClient:
             ],
             "roi_timeline": "Savings achievable within 3-6 months of implementation"
         }
+        self._simulate_latency(self._rng("latency", resources), response)
+        return response
     
     def get_architecture_design(self, infrastructure: Dict) -> Dict:
-        return {
+        response = {
             "analysis": "Modern cloud-native architecture recommended for optimal performance and cost efficiency.",
             "recommendations": [
                 "Migrate to containerized microservices architecture",
@@ -96,12 +153,14 @@ class DemoAIClient:
                 "Improved developer productivity"
             ]
         }
+        self._simulate_latency(self._rng("latency", infrastructure), response)
+        return response
     
     def get_migration_strategy(self, complexity: str) -> Dict:
         weeks = {"low": 12, "medium": 20, "high": 28}
         timeline = weeks.get(complexity, 20)
         
-        return {
+        response = {
             "analysis": f"Based on {complexity} complexity assessment, migration timeline is {timeline} weeks.",
             "approach": "Phased migration with continuous validation and rollback capabilities",
             "phases": [
@@ -118,6 +177,8 @@ class DemoAIClient:
                 "Automated deployment and rollback procedures"
             ]
         }
+        self._simulate_latency(self._rng("latency", complexity), response)
+        return response
 
 
 def get_demo_client():
@@ -0,0 +1,194 @@
+import os
+import json
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from .serialization import json_default
+from .task_context import PipelineCancelledError
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """
+    Raised when the analysis queue has no free slots
+    """
+
+
+class AnalysisStore:
+    """
+    Persistent store for analysis status records and results.
+
+    Status records are kept in memory and mirrored to disk; full results
+    live only on disk so a long-running server does not accumulate them.
+    """
+
+    def __init__(self, store_dir: Optional[str] = None):
+        self.store_dir = store_dir or os.getenv("ANALYSIS_STORE_DIR", "/tmp/analyses")
+        os.makedirs(self.store_dir, exist_ok=True)
+        self._records: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def create(self, analysis_id: str, project_name: Optional[str], target_cloud: str, **fields) -> Dict:
+        record = {
+            "analysis_id": analysis_id,
+            "status": "queued",
+            "project_name": project_name,
+            "target_cloud": target_cloud,
+            "created_at": datetime.utcnow().isoformat()
+        }
+        record.update(fields)
+        with self._lock:
+            self._records[analysis_id] = record
+        self._write(analysis_id, record)
+        return dict(record)
+
+    def update(self, analysis_id: str, **fields) -> Dict:
+        with self._lock:
+            record = self._records.setdefault(analysis_id, {"analysis_id": analysis_id})
+            record.update(fields)
+            snapshot = dict(record)
+        self._write(analysis_id, snapshot)
+        return snapshot
+
+    def complete(self, analysis_id: str, result: Dict, summary: Dict) -> Dict:
+        with self._lock:
+            record = self._records.setdefault(analysis_id, {"analysis_id": analysis_id})
+            record.update(summary)
+            record["status"] = "completed"
+            record["completed_at"] = datetime.utcnow().isoformat()
+            snapshot = dict(record)
+        self._write(analysis_id, dict(snapshot, result=result))
+        return snapshot
+
+    def fail(self, analysis_id: str, error: str) -> Dict:
+        return self.update(
+            analysis_id,
+            status="failed",
+            error=error,
+            completed_at=datetime.utcnow().isoformat()
+        )
+
+    def cancel(self, analysis_id: str) -> Dict:
+        return self.update(analysis_id, status="cancelled", completed_at=datetime.utcnow().isoformat())
+
+    def get(self, analysis_id: str, include_result: bool = True) -> Optional[Dict]:
+        with self._lock:
+            record = self._records.get(analysis_id)
+            record = dict(record) if record else None
+
+        if record is not None and (not include_result or record.get("status") != "completed"):
+            return record
+
+        stored = self._read(analysis_id)
+        if stored is None:
+            return record
+        if not include_result:
+            stored.pop("result", None)
+        return stored
+
+    def save_profile(self, analysis_id: str, profile: Dict):
+        """
+        Persist a profiler report next to the analysis record
+        """
+        self._write(analysis_id, profile, path=self._path(analysis_id, "profile"))
+        self.update(analysis_id, profiled=True)
+
+    def get_profile(self, analysis_id: str) -> Optional[Dict]:
+        return self._read(analysis_id, path=self._path(analysis_id, "profile"))
+
+    def _path(self, analysis_id: str, kind: Optional[str] = None) -> str:
+        suffix = f".{kind}.json" if kind else ".json"
+        return os.path.join(self.store_dir, f"{os.path.basename(analysis_id)}{suffix}")
+
+    def _write(self, analysis_id: str, data: Dict, path: Optional[str] = None):
+        path = path or self._path(analysis_id)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(data, f, default=json_default)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Error persisting analysis {analysis_id}: {e}")
+
+    def _read(self, analysis_id: str, path: Optional[str] = None) -> Optional[Dict]:
+        try:
+            with open(path or self._path(analysis_id), "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Error loading analysis {analysis_id}: {e}")
+            return None
+
+
+class AnalysisJobQueue:
+    """
+    Bounded worker pool that runs analyses and records their outcome
+    """
+
+    def __init__(self, store: AnalysisStore, max_workers: Optional[int] = None,
+                 max_pending: Optional[int] = None):
+        self.store = store
+        self.max_workers = max_workers or int(os.getenv("ANALYSIS_WORKERS", min(4, os.cpu_count() or 1)))
+        self.max_pending = max_pending or int(os.getenv("ANALYSIS_QUEUE_SIZE", 100))
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="analysis")
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_pending)
+        self._futures: Dict[str, Future] = {}
+
+    def submit(self, analysis_id: str, fn: Callable[..., Dict], *args,
+               summarize: Callable[[Dict], Dict] = lambda result: {},
+               cleanup_path: Optional[str] = None, **kwargs) -> Future:
+        if not self._slots.acquire(blocking=False):
+            raise QueueFullError("Analysis queue is full, retry later")
+
+        try:
+            future = self.executor.submit(self._run, analysis_id, fn, args, kwargs, summarize)
+        except Exception:
+            self._slots.release()
+            raise
+
+        self._futures[analysis_id] = future
+        future.add_done_callback(lambda done: self._finished(analysis_id, cleanup_path, done))
+        return future
+
+    def cancel(self, analysis_id: str) -> bool:
+        """
+        Cancel an analysis that is still waiting for a worker; False once
+        it has started
+        """
+        future = self._futures.get(analysis_id)
+        return future is not None and future.cancel()
+
+    def _run(self, analysis_id: str, fn: Callable[..., Dict], args: tuple, kwargs: Dict,
+             summarize: Callable[[Dict], Dict]) -> Dict:
+        self.store.update(analysis_id, status="running", started_at=datetime.utcnow().isoformat())
+        try:
+            result = fn(*args, **kwargs)
+            self.store.complete(analysis_id, result, summarize(result))
+            return result
+        except PipelineCancelledError:
+            logger.info(f"Analysis {analysis_id} cancelled")
+            self.store.cancel(analysis_id)
+            raise
+        except Exception as e:
+            logger.error(f"Analysis {analysis_id} failed: {e}")
+            self.store.fail(analysis_id, str(e))
+            raise
+
+    def _finished(self, analysis_id: str, cleanup_path: Optional[str], future: Future):
+        self._futures.pop(analysis_id, None)
+        self._slots.release()
+        if future.cancelled():
+            self.store.cancel(analysis_id)
+        if cleanup_path:
+            try:
+                os.unlink(cleanup_path)
+            except OSError:
+                pass
+
+    def shutdown(self, wait: bool = False):
+        self.executor.shutdown(wait=wait, cancel_futures=True)
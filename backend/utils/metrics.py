@@ -0,0 +1,177 @@
+import os
+import time
+import logging
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from .task_context import PipelineCancelledError, PipelineTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# Longest suffix first so "x.tar.gz" is not reported as "gz"
+FILE_TYPES = ("tar.gz", "tar.bz2", "tgz", "tbz2", "tar", "zip", "tf", "json", "yaml", "yml")
+
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+SIZE_BUCKETS = tuple(1024 * 4 ** exponent for exponent in range(11))  # 1 KiB .. 1 GiB
+
+STAGE_DURATION = Histogram(
+    "migrationgpt_stage_duration_seconds",
+    "Wall time of each pipeline stage",
+    ["stage"],
+    buckets=STAGE_BUCKETS
+)
+ANALYSIS_DURATION = Histogram(
+    "migrationgpt_analysis_duration_seconds",
+    "End-to-end pipeline time per analysis",
+    ["file_type"],
+    buckets=STAGE_BUCKETS
+)
+ANALYSES = Counter(
+    "migrationgpt_analyses_total",
+    "Analyses by input file type and outcome (completed, failed, cancelled, timed_out, cached)",
+    ["file_type", "outcome"]
+)
+ANALYSES_IN_FLIGHT = Gauge(
+    "migrationgpt_analyses_in_flight",
+    "Analyses currently running the pipeline",
+    multiprocess_mode="livesum"
+)
+INPUT_BYTES = Histogram(
+    "migrationgpt_input_bytes",
+    "Size of analysis inputs",
+    ["file_type"],
+    buckets=SIZE_BUCKETS
+)
+BEDROCK_DURATION = Histogram(
+    "migrationgpt_bedrock_request_duration_seconds",
+    "Bedrock invocation time, cache misses only",
+    ["operation", "outcome"],
+    buckets=STAGE_BUCKETS
+)
+BEDROCK_IN_FLIGHT = Gauge(
+    "migrationgpt_bedrock_requests_in_flight",
+    "Bedrock invocations currently waiting on the model",
+    ["operation"],
+    multiprocess_mode="livesum"
+)
+
+
+def file_type_label(filename: str) -> str:
+    """
+    Bounded label value for an input file name; anything unrecognised is
+    "other" so client-chosen names cannot blow up series cardinality
+    """
+    lowered = (filename or "").lower()
+    for suffix in FILE_TYPES:
+        if lowered.endswith("." + suffix) or lowered == suffix:
+            return "yaml" if suffix == "yml" else suffix
+    return "other"
+
+
+def stage_timer(stage: str):
+    """
+    Time a pipeline stage; usable as a context manager or a decorator
+    """
+    return STAGE_DURATION.labels(stage=stage).time()
+
+
+@contextmanager
+def track_analysis(file_type: str) -> Iterator[None]:
+    ANALYSES_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    outcome = "failed"
+    try:
+        yield
+        outcome = "completed"
+    except (GeneratorExit, PipelineCancelledError):
+        # A client went away mid-analysis
+        outcome = "cancelled"
+        raise
+    except PipelineTimeoutError:
+        outcome = "timed_out"
+        raise
+    finally:
+        ANALYSES_IN_FLIGHT.dec()
+        ANALYSES.labels(file_type=file_type, outcome=outcome).inc()
+        if outcome == "completed":
+            ANALYSIS_DURATION.labels(file_type=file_type).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def track_bedrock_call(operation: str) -> Iterator[None]:
+    in_flight = BEDROCK_IN_FLIGHT.labels(operation=operation)
+    in_flight.inc()
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        in_flight.dec()
+        BEDROCK_DURATION.labels(operation=operation, outcome=outcome).observe(time.perf_counter() - start)
+
+
+class CacheStatsCollector:
+    """
+    Exposes ResultCache.stats() of each registered cache at scrape time; a
+    source returning None has nothing to report yet and is left out
+    """
+
+    def __init__(self):
+        self.sources: Dict[str, Callable[[], Optional[Dict]]] = {}
+
+    def register(self, name: str, stats: Callable[[], Optional[Dict]]):
+        self.sources[name] = stats
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        hits = CounterMetricFamily("migrationgpt_cache_hits", "Cache hits", labels=["cache", "tier"])
+        misses = CounterMetricFamily("migrationgpt_cache_misses", "Cache misses", labels=["cache"])
+        evictions = CounterMetricFamily("migrationgpt_cache_evictions", "Cache evictions", labels=["cache"])
+        entries = GaugeMetricFamily("migrationgpt_cache_entries", "Entries in the in-process tier",
+                                    labels=["cache"])
+        ratio = GaugeMetricFamily("migrationgpt_cache_hit_ratio", "Hits over lookups since start",
+                                  labels=["cache"])
+
+        for name, source in self.sources.items():
+            try:
+                stats = source()
+            except Exception as e:
+                logger.warning(f"Could not read {name} cache stats: {e}")
+                continue
+            if stats is None:
+                continue
+            hits.add_metric([name, "memory"], stats.get("memory_hits", 0))
+            hits.add_metric([name, "backend"], stats.get("backend_hits", 0))
+            misses.add_metric([name], stats.get("misses", 0))
+            evictions.add_metric([name], stats.get("evictions", 0))
+            entries.add_metric([name], stats.get("entries", 0))
+            ratio.add_metric([name], stats.get("hit_ratio", 0))
+
+        yield from (hits, misses, evictions, entries, ratio)
+
+
+cache_stats = CacheStatsCollector()
+REGISTRY.register(cache_stats)
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """
+    Prometheus text exposition of every metric; aggregates across worker
+    processes when PROMETHEUS_MULTIPROC_DIR is set
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(cache_stats)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,248 @@
+import os
+import sys
+import time
+import random
+import logging
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+TRUTHY = ("1", "true", "yes", "on")
+TOP_ALLOCATION_SITES = 25
+TRACEMALLOC_FRAMES = 1
+
+_local = threading.local()
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+
+
+def _acquire_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            _tracemalloc_owned = True
+        _tracemalloc_users += 1
+
+
+def _release_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        # Leave tracing alone if someone else (PYTHONTRACEMALLOC) started it
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            tracemalloc.stop()
+            _tracemalloc_owned = False
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class ProfilePolicy:
+    """
+    Decides whether a request is profiled: explicitly via the X-Profile
+    header or ?profile=true, or at random at PROFILE_SAMPLE_RATE
+    """
+
+    def __init__(self, enabled: Optional[bool] = None, sample_rate: Optional[float] = None):
+        if enabled is None:
+            enabled = os.getenv("PROFILING_ENABLED", "false").lower() in TRUTHY
+        self.enabled = enabled
+        self.sample_rate = sample_rate if sample_rate is not None else float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+
+    def should_profile(self, headers: Mapping[str, str], requested: bool = False) -> bool:
+        if not self.enabled:
+            return False
+        if requested or headers.get(PROFILE_HEADER, "").lower() in TRUTHY:
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+
+class _Attachment:
+    def __init__(self, profiler: "PipelineProfiler"):
+        self.profiler = profiler
+
+    def __enter__(self):
+        # Samples are trimmed to start at the frame that attached, dropping
+        # the web server and worker pool frames beneath it
+        depth = 0
+        frame = sys._getframe(1)
+        while frame is not None:
+            depth += 1
+            frame = frame.f_back
+        self.previous = getattr(_local, "profiler", None)
+        _local.profiler = self.profiler
+        self.profiler._targets[threading.get_ident()] = depth
+        return self.profiler
+
+    def __exit__(self, *exc_info):
+        self.profiler._targets.pop(threading.get_ident(), None)
+        _local.profiler = self.previous
+        return False
+
+
+class PipelineProfiler:
+    """
+    Sampling profiler for one analysis: a background thread snapshots the
+    stacks of the threads attached to it every interval_ms and aggregates
+    them into collapsed stacks (flamegraph.pl / speedscope input). Spans
+    record wall time and tracemalloc allocation figures per pipeline stage.
+    """
+
+    def __init__(self, interval_ms: Optional[float] = None, trace_allocations: Optional[bool] = None):
+        self.interval = (interval_ms or float(os.getenv("PROFILE_INTERVAL_MS", 5))) / 1000
+        if trace_allocations is None:
+            trace_allocations = os.getenv("PROFILE_TRACE_ALLOCATIONS", "true").lower() in TRUTHY
+        self.trace_allocations = trace_allocations
+        self.stacks: Counter = Counter()
+        self.spans: List[Dict] = []
+        self.samples = 0
+        self._targets: Dict[int, int] = {}
+        self._absorbed_sites: List[Dict] = []
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at = 0.0
+
+    def start(self) -> "PipelineProfiler":
+        if self.trace_allocations:
+            _acquire_tracemalloc()
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def attach(self) -> _Attachment:
+        return _Attachment(self)
+
+    def _sample_loop(self):
+        while not self._stopped.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id, depth in list(self._targets.items()):
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.reverse()
+                self.stacks[";".join(stack[depth - 1:])] += 1
+                self.samples += 1
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        tracing = self.trace_allocations and tracemalloc.is_tracing()
+        if tracing:
+            # The peak is process-wide; concurrent analyses inflate it
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            span = {
+                "name": name,
+                "start_seconds": round(start - self._started_at, 6),
+                "duration_seconds": round(time.perf_counter() - start, 6)
+            }
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                span["allocated_bytes"] = current - before
+                span["peak_bytes"] = peak - before
+            self.spans.append(span)
+
+    def absorb(self, report: Dict):
+        """
+        Merge the report of a profiler that ran in a pipeline worker process,
+        treating it as having just finished
+        """
+        offset = time.perf_counter() - self._started_at - report["duration_seconds"]
+        for span in report["spans"]:
+            self.spans.append(dict(span, start_seconds=round(span["start_seconds"] + offset, 6)))
+        for line in report["collapsed"].splitlines():
+            stack, _, count = line.rpartition(" ")
+            self.stacks[stack] += int(count)
+        self.samples += report["samples"]
+        self._absorbed_sites.extend(report["allocation_sites"])
+
+    def _allocation_sites(self) -> List[Dict]:
+        sites = list(self._absorbed_sites)
+        if self.trace_allocations and tracemalloc.is_tracing():
+            statistics = tracemalloc.take_snapshot().statistics("lineno")[:TOP_ALLOCATION_SITES]
+            sites.extend(
+                {"location": str(stat.traceback[0]), "size_bytes": stat.size, "count": stat.count}
+                for stat in statistics
+            )
+        return sorted(sites, key=lambda site: site["size_bytes"], reverse=True)[:TOP_ALLOCATION_SITES]
+
+    def stop(self) -> Dict:
+        """
+        Stop sampling and return the profile report
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        duration = time.perf_counter() - self._started_at
+        allocation_sites = self._allocation_sites()
+        if self.trace_allocations:
+            _release_tracemalloc()
+
+        return {
+            "duration_seconds": round(duration, 6),
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "spans": self.spans,
+            "allocation_sites": allocation_sites,
+            "collapsed": self.collapsed()
+        }
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def profile_span(name: str):
+    """
+    Span on the profiler attached to the current thread; a no-op when the
+    analysis is not being profiled
+    """
+    profiler = getattr(_local, "profiler", None)
+    if profiler is None:
+        return _NULL_SPAN
+    return profiler.span(name)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def profiled_iter(profiler: Optional[PipelineProfiler], iterator: Iterable) -> Iterator:
+    """
+    Attach the profiler around each step of a generator, for pipelines
+    that are resumed from whichever worker thread is free
+    """
+    iterator = iter(iterator)
+    if profiler is None:
+        yield from iterator
+        return
+    while True:
+        with profiler.attach():
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
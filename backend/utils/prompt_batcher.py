@@ -0,0 +1,168 @@
+import os
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .serialization import json_default
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio for English text and JSON under the
+# Claude tokenizer; deliberately conservative so chunks stay under budget
+CHARS_PER_TOKEN = 3.5
+
+# Oversized fields are halved down to at most this many characters before an
+# item is given up on
+MIN_TRUNCATED_CHARS = 64
+TRUNCATION_MARKER = "...[truncated]"
+
+FINDING_GROUP_FIELDS = ("id", "type", "severity", "description", "remediation")
+RESOURCE_GROUP_FIELDS = ("type", "category", "properties")
+
+
+def estimate_tokens(text: str) -> int:
+    return int(len(text) / CHARS_PER_TOKEN) + 1
+
+
+def _compact(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=json_default)
+
+
+def group_items(items: Iterable[Dict], fields: Sequence[str], member_field: str = "name",
+                members_key: str = "resources") -> List[Dict]:
+    """
+    Collapse items that agree on `fields` into one entry listing the
+    differing member names, e.g. one finding per rule with every resource
+    it fired on
+    """
+    groups: Dict[str, Dict] = {}
+
+    for item in items:
+        key = _compact([item.get(field) for field in fields])
+        group = groups.get(key)
+        if group is None:
+            group = {field: item[field] for field in fields if field in item}
+            group[members_key] = []
+            group["count"] = 0
+            groups[key] = group
+        group["count"] += 1
+        member = item.get(member_field, item.get("resource"))
+        if member is not None:
+            group[members_key].append(member)
+
+    return list(groups.values())
+
+
+def group_findings(findings: Iterable[Dict]) -> List[Dict]:
+    return group_items(findings, FINDING_GROUP_FIELDS, member_field="resource")
+
+
+def group_resources(resources: Iterable[Dict]) -> List[Dict]:
+    return group_items(resources, RESOURCE_GROUP_FIELDS, member_field="name", members_key="names")
+
+
+class PromptBatcher:
+    """
+    Packs items into prompt-sized chunks under a token budget and sizes the
+    response budget of each chunk to its input
+    """
+
+    def __init__(self, max_prompt_tokens: Optional[int] = None, max_response_tokens: Optional[int] = None,
+                 min_response_tokens: int = 512, response_ratio: float = 0.5):
+        self.max_prompt_tokens = max_prompt_tokens or int(os.getenv("AI_PROMPT_TOKENS", 24000))
+        self.max_response_tokens = max_response_tokens or int(os.getenv("BEDROCK_MAX_TOKENS", 4096))
+        self.min_response_tokens = min(min_response_tokens, self.max_response_tokens)
+        self.response_ratio = response_ratio
+
+    def pack(self, items: List[Dict], overhead_tokens: int = 0) -> List[List[Dict]]:
+        """
+        Greedy first-fit in input order; an item larger than the budget gets
+        a chunk of its own, trimmed to fit (or left out if it cannot be)
+        """
+        budget = max(self.max_prompt_tokens - overhead_tokens, 1)
+        chunks: List[List[Dict]] = []
+        current: List[Dict] = []
+        used = 0
+
+        for item in items:
+            cost = estimate_tokens(_compact(item)) + 1
+            if cost > budget:
+                item = self._trim(item, budget)
+                if item is None:
+                    continue
+                cost = estimate_tokens(_compact(item)) + 1
+
+            if current and used + cost > budget:
+                chunks.append(current)
+                current, used = [], 0
+            current.append(item)
+            used += cost
+
+        return chunks + [current] if current else chunks
+
+    def _trim(self, item: Dict, budget: int) -> Optional[Dict]:
+        """
+        Fit one item into budget: halve its member list first, then cut the
+        largest remaining field down to a truncated JSON excerpt
+        """
+        def over(candidate: Dict) -> bool:
+            return estimate_tokens(_compact(candidate)) + 1 > budget
+
+        trimmed = dict(item)
+        changes = []
+        for key in ("resources", "names"):
+            members = trimmed.get(key)
+            if not isinstance(members, list):
+                continue
+            while members and over(trimmed):
+                members = members[:len(members) // 2]
+                trimmed[key] = members
+            if len(members) < len(item[key]):
+                changes.append(f"{key} cut to {len(members)} of {len(item[key])}")
+
+        while over(trimmed):
+            field = max(trimmed, key=lambda key: len(_compact(trimmed[key])))
+            text = trimmed[field]
+            if not isinstance(text, str):
+                text = _compact(text)
+            elif text.endswith(TRUNCATION_MARKER):
+                text = text[:-len(TRUNCATION_MARKER)]
+            if len(text) <= MIN_TRUNCATED_CHARS:
+                logger.warning(f"Prompt item exceeds {budget} tokens even after trimming; left out")
+                return None
+            trimmed[field] = text[:len(text) // 2] + TRUNCATION_MARKER
+            if field not in changes:
+                changes.append(field)
+
+        logger.warning(f"Prompt item exceeds {budget} tokens; trimmed: {', '.join(changes)}")
+        return trimmed
+
+    def response_tokens(self, prompt: str) -> int:
+        wanted = int(estimate_tokens(prompt) * self.response_ratio)
+        return max(self.min_response_tokens, min(self.max_response_tokens, wanted))
+
+    def build_chunks(self, instruction: str, items: List[Dict]) -> List[Tuple[str, List[Dict]]]:
+        """
+        One (prompt, chunk) pair per chunk: the prompt is the instruction,
+        a part marker when there is more than one chunk, and the chunk as
+        compact JSON
+        """
+        chunks = self.pack(items, overhead_tokens=estimate_tokens(instruction) + 16)
+        if len(chunks) <= 1:
+            chunk = chunks[0] if chunks else []
+            return [(f"{instruction}: {_compact(chunk)}", chunk)]
+
+        return [
+            (f"{instruction} (part {position} of {len(chunks)}): {_compact(chunk)}", chunk)
+            for position, chunk in enumerate(chunks, start=1)
+        ]
+
+    def build_prompts(self, instruction: str, items: List[Dict]) -> List[str]:
+        return [prompt for prompt, _ in self.build_chunks(instruction, items)]
+
+
+def merge_responses(responses: List[str]) -> str:
+    responses = [response.strip() for response in responses if response and response.strip()]
+    if len(responses) <= 1:
+        return responses[0] if responses else ""
+    return "\n\n".join(responses)
@@ -0,0 +1,187 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from .serialization import json_default
+
+logger = logging.getLogger(__name__)
+
+
+class _DiskTier:
+    """
+    JSON files in a directory, evicted oldest-first once the directory
+    grows past max_bytes
+    """
+
+    def __init__(self, directory: str, ttl_seconds: int, max_bytes: int):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def get(self, key: str) -> Optional[Dict]:
+        path = os.path.join(self.directory, f"{key}.json")
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                os.unlink(path)
+                return None
+            with open(path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def set(self, key: str, value: Dict):
+        path = os.path.join(self.directory, f"{key}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(value, f, default=json_default)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+
+
+class _RedisTier:
+    """
+    Redis-backed tier; eviction beyond TTL is left to the server's maxmemory policy
+    """
+
+    def __init__(self, url: str, ttl_seconds: int, prefix: str = "migrationgpt:result:"):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Dict]:
+        payload = self.client.get(self.prefix + key)
+        return json.loads(payload) if payload else None
+
+    def set(self, key: str, value: Dict):
+        self.client.setex(self.prefix + key, self.ttl_seconds, json.dumps(value, default=json_default))
+
+
+class ResultCache:
+    """
+    Two-tier cache of analysis results: an in-process LRU in front of an
+    optional disk or Redis tier, both with TTL expiry
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[int] = None,
+                 backend: Optional[str] = None, namespace: str = "results"):
+        self.max_entries = max_entries or int(os.getenv("RESULT_CACHE_SIZE", 256))
+        self.ttl_seconds = ttl_seconds or int(os.getenv("RESULT_CACHE_TTL", 3600))
+        self.backend_name = (backend or os.getenv("RESULT_CACHE_BACKEND", "memory")).lower()
+        self.namespace = namespace
+
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "memory_hits": 0, "backend_hits": 0, "evictions": 0}
+        self.backend = self._init_backend()
+
+    def _init_backend(self):
+        try:
+            if self.backend_name == "disk":
+                directory = os.path.join(os.getenv("RESULT_CACHE_DIR", "/tmp/cache"), self.namespace)
+                max_bytes = int(os.getenv("RESULT_CACHE_DISK_BYTES", 512 * 1024 * 1024))
+                return _DiskTier(directory, self.ttl_seconds, max_bytes)
+            if self.backend_name == "redis":
+                return _RedisTier(
+                    os.getenv("REDIS_URL", "redis://localhost:6379"),
+                    self.ttl_seconds,
+                    prefix=f"migrationgpt:{self.namespace}:"
+                )
+        except Exception as e:
+            logger.warning(f"Failed to initialize {self.backend_name} cache tier: {e}")
+            logger.info("Falling back to in-memory cache only")
+        return None
+
+    @staticmethod
+    def make_key(*parts: Iterable) -> str:
+        """
+        Build a cache key from hashable input parts (content digest,
+        target cloud, options); list parts are order-insensitive
+        """
+        normalized = [sorted(str(p) for p in part) if isinstance(part, (list, tuple, set)) else part
+                      for part in parts]
+        return hashlib.sha256(json.dumps(normalized, default=str).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    self._counters["memory_hits"] += 1
+                    return entry[1]
+                del self._entries[key]
+
+        value = None
+        if self.backend is not None:
+            try:
+                value = self.backend.get(key)
+            except Exception as e:
+                logger.warning(f"Cache backend read failed: {e}")
+
+        with self._lock:
+            if value is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["hits"] += 1
+            self._counters["backend_hits"] += 1
+            self._store(key, value, now)
+        return value
+
+    def set(self, key: str, value: Dict):
+        with self._lock:
+            self._store(key, value, time.monotonic())
+
+        if self.backend is not None:
+            try:
+                self.backend.set(key, value)
+            except Exception as e:
+                logger.warning(f"Cache backend write failed: {e}")
+
+    def _store(self, key: str, value: Dict, now: float):
+        self._entries[key] = (now + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["backend"] = self.backend_name if self.backend is not None else "memory"
+        return stats
@@ -0,0 +1,26 @@
+from collections.abc import Mapping
+from types import MappingProxyType
+
+
+def json_default(value):
+    """
+    json.dump fallback: read-only mappings (such as lazily decoded resource
+    properties) serialize as objects, anything else as its string form
+    """
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
+
+
+def freeze(value):
+    """
+    Deep read-only copy of a literal table: dicts become mapping proxies,
+    lists tuples and sets frozensets
+    """
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    return value
@@ -0,0 +1,58 @@
+import time
+import threading
+from typing import Callable, Optional
+
+_local = threading.local()
+
+
+class PipelineCancelledError(Exception):
+    """
+    Raised inside a pipeline task once its analysis has been cancelled
+    """
+
+
+class PipelineTimeoutError(Exception):
+    """
+    Raised inside a pipeline task once it runs past PIPELINE_TASK_TIMEOUT
+    """
+
+
+class TaskContext:
+    """
+    Cancellation flag and deadline of the pipeline task running on the
+    current thread, checked by checkpoint() at every stage boundary
+    """
+
+    def __init__(self, task_id: str, timeout: Optional[float], is_cancelled: Callable[[], bool]):
+        self.task_id = task_id
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.is_cancelled = is_cancelled
+
+    def timed_out(self) -> PipelineTimeoutError:
+        return PipelineTimeoutError(f"Analysis {self.task_id} exceeded the {self.timeout:g}s task timeout")
+
+    def check(self):
+        if self.is_cancelled():
+            raise PipelineCancelledError(f"Analysis {self.task_id} was cancelled")
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise self.timed_out()
+
+    def __enter__(self) -> "TaskContext":
+        self.previous = getattr(_local, "task", None)
+        _local.task = self
+        return self
+
+    def __exit__(self, *exc_info):
+        _local.task = self.previous
+        return False
+
+
+def checkpoint():
+    """
+    Stop the current pipeline task if it was cancelled or is out of time;
+    a no-op outside pipeline tasks
+    """
+    task = getattr(_local, "task", None)
+    if task is not None:
+        task.check()
@@ -0,0 +1,118 @@
+import os
+import re
+import hashlib
+import logging
+import tempfile
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+_SIZE_UNITS = {"": 1, "B": 1, "K": 1024, "KB": 1024, "M": 1024 ** 2, "MB": 1024 ** 2,
+               "G": 1024 ** 3, "GB": 1024 ** 3}
+
+
+class UploadTooLargeError(Exception):
+    """
+    Raised when an upload exceeds the configured size limit
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        super().__init__(f"Upload exceeds the {limit} byte limit")
+
+
+def parse_size(value) -> int:
+    """
+    Parse sizes such as "100MB", "512K" or "1048576" into bytes
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*([KMG]?B?)\s*", str(value).upper())
+    if match is None:
+        raise ValueError(f"Invalid size: {value!r}")
+    return int(match.group(1)) * _SIZE_UNITS[match.group(2)]
+
+
+class UploadSpooler:
+    """
+    Streams analysis inputs to disk in fixed-size chunks, hashing as it
+    goes and rejecting anything over max_bytes, so no input is ever held
+    in memory whole
+    """
+
+    def __init__(self, upload_dir: Optional[str] = None, max_bytes: Optional[int] = None,
+                 chunk_size: int = CHUNK_SIZE):
+        self.upload_dir = upload_dir or os.getenv("UPLOAD_DIR", "/tmp/uploads")
+        self.max_bytes = max_bytes or parse_size(os.getenv("MAX_UPLOAD_SIZE", "100MB"))
+        self.chunk_size = chunk_size
+
+    def check_declared_size(self, size: Optional[int]):
+        if size is not None and size > self.max_bytes:
+            raise UploadTooLargeError(self.max_bytes)
+
+    async def spool_upload(self, analysis_id: str, file) -> Dict:
+        """
+        Copy an UploadFile to UPLOAD_DIR chunk by chunk. The file is kept
+        after the analysis, as uploads always have been
+        """
+        self.check_declared_size(getattr(file, "size", None))
+
+        os.makedirs(self.upload_dir, exist_ok=True)
+        filename = os.path.basename(file.filename or "") or "upload"
+        path = os.path.join(self.upload_dir, f"{analysis_id}_{filename}")
+        digest = hashlib.sha256()
+        size = 0
+
+        try:
+            with open(path, "wb") as out:
+                while True:
+                    chunk = await file.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise UploadTooLargeError(self.max_bytes)
+                    digest.update(chunk)
+                    out.write(chunk)
+        except BaseException:
+            self.discard(path)
+            raise
+
+        return {"path": path, "size": size, "sha256": digest.hexdigest(), "cleanup_path": None}
+
+    def spool_text(self, text: str, suffix: str = ".tf") -> Dict:
+        """
+        Write inline file content to a temporary file, encoding it a slice
+        at a time; the file is removed once the analysis finishes
+        """
+        # Every character encodes to at least one byte
+        self.check_declared_size(len(text))
+
+        digest = hashlib.sha256()
+        size = 0
+
+        with tempfile.NamedTemporaryFile(mode="wb", suffix=suffix, delete=False) as out:
+            path = out.name
+            try:
+                for start in range(0, len(text), self.chunk_size):
+                    chunk = text[start:start + self.chunk_size].encode()
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise UploadTooLargeError(self.max_bytes)
+                    digest.update(chunk)
+                    out.write(chunk)
+            except BaseException:
+                out.close()
+                self.discard(path)
+                raise
+
+        return {"path": path, "size": size, "sha256": digest.hexdigest(), "cleanup_path": path}
+
+    @staticmethod
+    def discard(path: Optional[str]):
+        if not path:
+            return
+        try:
+            os.unlink(path)
+        except OSError:
+            pass